@@ -0,0 +1,97 @@
+"""
+Backtest Events for NAS100 Backtesters
+Trade and bar callbacks for logging, UIs and analysis
+
+Backtester (and PortfolioBacktester) notify the subscribers of their
+`events` while they run:
+- on_open(backtester, idx, trade, box_range): a trade opened at bar idx;
+  trade is the open position (type, entry_price, take_profit, stop_loss, ...)
+- on_close(backtester, idx, trade): a trade closed at bar idx; trade is its
+  record, as in backtester.trades (exit_reason 'END_OF_DATA' for a trade
+  still open on the last bar)
+- on_bar(backtester, idx, time, balance, in_position): bar idx is done,
+  after any exit on it and before any entry (as in the equity curve)
+
+A subscriber implements any of these methods. Events without subscribers
+cost nothing: the engines skip straight from one trade to the next and
+only walk every bar when something listens to on_bar.
+
+    class TradeCounter:
+        def __init__(self):
+            self.closed = 0
+
+        def on_close(self, backtester, idx, trade):
+            self.closed += 1
+
+    backtester.events.subscribe(TradeCounter())
+    backtester.run_backtest(df, verbose=False)
+
+run_backtest(verbose=True) prints through a ConsoleReporter subscribed for
+that run only.
+"""
+
+
+EVENTS = ('on_open', 'on_close', 'on_bar')
+
+
+class BacktestEvents:
+    """Subscriber callbacks per event"""
+
+    def __init__(self):
+        # One list of bound methods per event, empty when nobody listens
+        self.on_open = []
+        self.on_close = []
+        self.on_bar = []
+
+    def subscribe(self, subscriber):
+        """
+        Register a subscriber's on_open/on_close/on_bar methods
+
+        Returns: The subscriber (so it can be created inline)
+        """
+        callbacks = [(event, getattr(subscriber, event, None)) for event in EVENTS]
+        callbacks = [(event, callback) for event, callback in callbacks if callable(callback)]
+
+        if not callbacks:
+            raise TypeError(f"{type(subscriber).__name__} has none of the methods {', '.join(EVENTS)}")
+
+        for event, callback in callbacks:
+            getattr(self, event).append(callback)
+
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """Remove a subscriber registered with subscribe()"""
+        for event in EVENTS:
+            callback = getattr(subscriber, event, None)
+            callbacks = getattr(self, event)
+            if callback is not None and callback in callbacks:
+                callbacks.remove(callback)
+
+    def emit(self, event, *args):
+        """Call every subscriber of one event"""
+        for callback in getattr(self, event):
+            callback(*args)
+
+
+class ConsoleReporter:
+    """Prints each trade as it opens and closes (except closes at the end of the data)"""
+
+    def on_open(self, backtester, idx, trade, box_range):
+        symbol = f"{trade['symbol']} | " if 'symbol' in trade else ""
+        print(f"📍 {symbol}{trade['type']} | Entry: {trade['entry_price']:.2f} | "
+              f"TP: {trade['take_profit']:.2f} | SL: {trade['stop_loss']:.2f} | "
+              f"Box Range: {box_range:.2f}")
+
+    def on_close(self, backtester, idx, trade):
+        # The engines never printed the forced close of a trade left open
+        if trade['exit_reason'] == 'END_OF_DATA':
+            return
+
+        symbol = f"{trade['symbol']} | " if 'symbol' in trade else ""
+        win_indicator = "✅ WIN" if trade['win'] else "❌ LOSS"
+        print(f"{win_indicator} | {symbol}{trade['type']} | "
+              f"Entry: {trade['entry_price']:.2f} | "
+              f"Exit: {trade['exit_price']:.2f} | "
+              f"P&L: ${trade['profit']:.2f} | "
+              f"Balance: ${trade['balance']:,.2f}")
@@ -5,16 +5,22 @@ Simulates the strategy on historical data without needing MT5
 
 import pandas as pd
 import numpy as np
-from datetime import datetime
 import json
 
+from backtest_events import BacktestEvents, ConsoleReporter
+from equity_tracker import EquityTracker
+from indicator_cache import IndicatorCache
+from result_cache import dataset_fingerprint
+from shared_dataset import as_frame
+from trade_log import TradeLog
+
 
 class Backtester:
     """Backtest the breakout strategy on historical data"""
 
     def __init__(self, initial_balance=10000, lot_size=0.01,
                  risk_reward_ratio=2.0, consolidation_periods=20,
-                 breakout_threshold=0.0015, max_daily_trades=5):
+                 breakout_threshold=0.0015, max_daily_trades=5, intrabar=None):
         """
         Initialize backtester
 
@@ -25,6 +31,8 @@ class Backtester:
         - consolidation_periods: Bars to identify consolidation
         - breakout_threshold: Price range threshold for consolidation
         - max_daily_trades: Maximum trades per day
+        - intrabar: Optional IntrabarResolver (intrabar.py) deciding whether
+          TP or SL came first on bars that touch both
         """
         self.initial_balance = initial_balance
         self.balance = initial_balance
@@ -33,6 +41,7 @@ class Backtester:
         self.consolidation_periods = consolidation_periods
         self.breakout_threshold = breakout_threshold
         self.max_daily_trades = max_daily_trades
+        self.intrabar = intrabar
 
         # For NAS100, 1 lot = $1 per point (approximate)
         self.point_value = 1.0
@@ -42,10 +51,13 @@ class Backtester:
         self.current_trade = None
 
         # Performance tracking
-        self.trades = []
-        self.equity_curve = []
+        self.trades = TradeLog()
+        self.equity = None  # EquityTracker of the last run
         self.daily_trades_count = {}
 
+        # Trade/bar callbacks (see backtest_events.py)
+        self.events = BacktestEvents()
+
     def identify_consolidation(self, df, current_idx):
         """
         Identify if market is in consolidation
@@ -56,21 +68,12 @@ class Backtester:
         if current_idx < self.consolidation_periods:
             return False, None, None, None
 
-        # Get recent data up to current bar
-        start_idx = current_idx - self.consolidation_periods
-        recent_data = df.iloc[start_idx:current_idx]
-
-        high_level = recent_data['high'].max()
-        low_level = recent_data['low'].min()
-        box_range = high_level - low_level
-
-        # Calculate if consolidating
-        avg_price = recent_data['close'].mean()
-        price_range_ratio = box_range / avg_price
-
-        is_consolidating = price_range_ratio < self.breakout_threshold
+        # Box of the bars before the current one, shared by every bar of df
+        box_high, box_low, box_range, is_consolidating = IndicatorCache.for_frame(df).consolidation(
+            self.consolidation_periods, self.breakout_threshold)
 
-        return is_consolidating, high_level, low_level, box_range
+        return (is_consolidating[current_idx], box_high[current_idx],
+                box_low[current_idx], box_range[current_idx])
 
     def detect_breakout(self, df, current_idx, high_level, low_level):
         """
@@ -103,6 +106,46 @@ class Backtester:
 
         return None
 
+    def compute_signals(self, df):
+        """
+        Compute consolidation boxes and breakout signals for every bar at once
+
+        Vectorized equivalent of calling identify_consolidation() and
+        detect_breakout() on each bar. The box for bar i covers bars
+        [i - consolidation_periods, i), exactly like the per-bar methods.
+
+        Returns:
+        - Dictionary of arrays: box_high, box_low, box_range,
+          is_consolidating and signal (1 = BUY, -1 = SELL, 0 = none)
+        """
+        df = as_frame(df)
+        indicators = IndicatorCache.for_frame(df)
+        close = indicators.close
+        n = len(close)
+
+        box_high, box_low, box_range, is_consolidating = indicators.consolidation(
+            self.consolidation_periods, self.breakout_threshold)
+
+        previous_close = np.empty(n)
+        previous_close[0] = np.nan
+        previous_close[1:] = close[:-1]
+
+        buy = is_consolidating & (previous_close <= box_high) & (close > box_high)
+        sell = (is_consolidating & ~buy &
+                (previous_close >= box_low) & (close < box_low))
+
+        signal = np.zeros(n, dtype=np.int8)
+        signal[buy] = 1
+        signal[sell] = -1
+
+        return {
+            'box_high': box_high,
+            'box_low': box_low,
+            'box_range': box_range,
+            'is_consolidating': is_consolidating,
+            'signal': signal
+        }
+
     def calculate_tp_sl(self, entry_price, signal_type, box_range):
         """Calculate Take Profit and Stop Loss"""
         sl_multiplier = 1.2
@@ -130,10 +173,13 @@ class Backtester:
         }
         self.in_position = True
 
-    def check_trade_exit(self, current_bar):
+    def check_trade_exit(self, current_bar, idx=None):
         """
         Check if current trade should be closed
 
+        idx is the bar's index, used by self.intrabar to resolve bars that
+        touch both TP and SL
+
         Returns: (should_close, exit_price, exit_reason)
         """
         if not self.in_position or self.current_trade is None:
@@ -141,28 +187,59 @@ class Backtester:
 
         high = current_bar['high']
         low = current_bar['low']
-        close = current_bar['close']
 
         tp = self.current_trade['take_profit']
         sl = self.current_trade['stop_loss']
+        is_buy = self.current_trade['type'] == 'BUY'
 
-        if self.current_trade['type'] == 'BUY':
-            # Check if TP hit
-            if high >= tp:
-                return True, tp, 'TP'
-            # Check if SL hit
-            if low <= sl:
-                return True, sl, 'SL'
+        if is_buy:
+            tp_hit, sl_hit = high >= tp, low <= sl
         else:  # SELL
-            # Check if TP hit
-            if low <= tp:
-                return True, tp, 'TP'
-            # Check if SL hit
-            if high >= sl:
-                return True, sl, 'SL'
+            tp_hit, sl_hit = low <= tp, high >= sl
+
+        # Both touched: TP counts first unless lower-timeframe bars say otherwise
+        if tp_hit and sl_hit and self.intrabar is not None and idx is not None:
+            tp_hit = self.intrabar.first_touch(idx, is_buy, tp, sl) != 'SL'
+
+        if tp_hit:
+            return True, tp, 'TP'
+        if sl_hit:
+            return True, sl, 'SL'
 
         return False, None, None
 
+    def find_exit_bar(self, high, low, start_idx, end_idx):
+        """
+        Find the first bar in [start_idx, end_idx) that touches TP or SL
+
+        Scans the open trade's levels against the high/low arrays in
+        growing chunks, so short trades only look at a few bars.
+
+        Returns: bar index, or None if the trade is still open at end_idx
+        """
+        tp = self.current_trade['take_profit']
+        sl = self.current_trade['stop_loss']
+        is_buy = self.current_trade['type'] == 'BUY'
+
+        chunk = 64
+        while start_idx < end_idx:
+            stop_idx = min(start_idx + chunk, end_idx)
+            highs = high[start_idx:stop_idx]
+            lows = low[start_idx:stop_idx]
+
+            if is_buy:
+                hit = (highs >= tp) | (lows <= sl)
+            else:
+                hit = (lows <= tp) | (highs >= sl)
+
+            if hit.any():
+                return start_idx + int(hit.argmax())
+
+            start_idx = stop_idx
+            chunk *= 2
+
+        return None
+
     def close_trade(self, exit_price, exit_time, exit_reason):
         """Close current trade and calculate P&L"""
         if not self.in_position:
@@ -184,22 +261,9 @@ class Backtester:
         self.balance += profit
 
         # Record trade
-        trade_record = {
-            'entry_time': trade['entry_time'],
-            'exit_time': exit_time,
-            'type': trade['type'],
-            'entry_price': trade['entry_price'],
-            'exit_price': exit_price,
-            'take_profit': trade['take_profit'],
-            'stop_loss': trade['stop_loss'],
-            'points': points,
-            'profit': profit,
-            'balance': self.balance,
-            'exit_reason': exit_reason,
-            'win': profit > 0
-        }
-
-        self.trades.append(trade_record)
+        self.trades.add(trade['entry_time'], exit_time, trade['type'], trade['entry_price'],
+                        exit_price, trade['take_profit'], trade['stop_loss'], points, profit,
+                        self.balance, exit_reason)
 
         # Reset position
         self.in_position = False
@@ -216,21 +280,40 @@ class Backtester:
         date_str = current_time.strftime('%Y-%m-%d')
         self.daily_trades_count[date_str] = self.daily_trades_count.get(date_str, 0) + 1
 
-    def run_backtest(self, df, start_idx=None, end_idx=None):
+    def warmup_bars(self):
+        """Bars before a signal bar that the consolidation box looks back at"""
+        return self.consolidation_periods
+
+    def lookahead_bars(self):
+        """Bars after a signal bar that the signals look ahead at"""
+        return 0
+
+    def carried_indicators(self):
+        """IndicatorCache series that depend on every earlier bar (none here)"""
+        return []
+
+    def run_backtest(self, df, start_idx=None, end_idx=None, verbose=True, resume=False,
+                     close_open_trade=True):
         """
         Run backtest on historical data
 
         Parameters:
-        - df: DataFrame with OHLCV data
+        - df: DataFrame with OHLCV data, or a SharedDataset
         - start_idx: Starting index (default: consolidation_periods)
         - end_idx: Ending index (default: len(df))
+        - verbose: Print a header and every trade (a ConsoleReporter on
+          self.events for this run); False runs silently
+        - resume: Continue from the balance, trades and open position of the
+          previous call instead of starting fresh
+        - close_open_trade: Close a trade still open at end_idx (False leaves
+          it open for a resumed call; see streaming_backtest.py)
 
         Returns:
         - Dictionary with backtest results
         """
-        print("=" * 70)
-        print("🔬 STARTING BACKTEST")
-        print("=" * 70)
+        df = as_frame(df)
+        if self.intrabar is not None:
+            self.intrabar.prepare(df)
 
         if start_idx is None:
             start_idx = self.consolidation_periods
@@ -238,85 +321,258 @@ class Backtester:
         if end_idx is None:
             end_idx = len(df)
 
-        total_bars = end_idx - start_idx
-        print(f"Initial Balance: ${self.initial_balance:,.2f}")
-        print(f"Lot Size: {self.lot_size}")
-        print(f"Risk:Reward: 1:{self.risk_reward_ratio}")
-        print(f"Backtesting {total_bars} bars from {df.iloc[start_idx]['time']} to {df.iloc[end_idx-1]['time']}")
-        print("-" * 70)
+        if verbose:
+            print("=" * 70)
+            print("🔬 STARTING BACKTEST")
+            print("=" * 70)
+            print(f"Initial Balance: ${self.initial_balance:,.2f}")
+            print(f"Lot Size: {self.lot_size}")
+            print(f"Risk:Reward: 1:{self.risk_reward_ratio}")
+            print(f"Backtesting {end_idx - start_idx} bars from {df.iloc[start_idx]['time']} to {df.iloc[end_idx-1]['time']}")
+            print("-" * 70)
+
+        reporter = self.events.subscribe(ConsoleReporter()) if verbose else None
+        try:
+            self._simulate(df, start_idx, end_idx, resume, close_open_trade)
+        finally:
+            if reporter is not None:
+                self.events.unsubscribe(reporter)
+
+        if verbose:
+            print("-" * 70)
+            print("✅ BACKTEST COMPLETE")
+            print("=" * 70)
 
-        # Reset state
-        self.balance = self.initial_balance
-        self.in_position = False
-        self.current_trade = None
-        self.trades = []
-        self.equity_curve = []
-        self.daily_trades_count = {}
+        return self.get_results()
 
-        # Main backtest loop
-        for i in range(start_idx, end_idx):
-            current_bar = df.iloc[i]
-            current_time = current_bar['time']
-            current_price = current_bar['close']
-
-            # Check if we need to close existing trade
-            if self.in_position:
-                should_close, exit_price, exit_reason = self.check_trade_exit(current_bar)
-                if should_close:
-                    self.close_trade(exit_price, current_time, exit_reason)
-
-                    # Print trade result
-                    last_trade = self.trades[-1]
-                    win_indicator = "✅ WIN" if last_trade['win'] else "❌ LOSS"
-                    print(f"{win_indicator} | {last_trade['type']} | "
-                          f"Entry: {last_trade['entry_price']:.2f} | "
-                          f"Exit: {last_trade['exit_price']:.2f} | "
-                          f"P&L: ${last_trade['profit']:.2f} | "
-                          f"Balance: ${self.balance:,.2f}")
-
-            # Record equity
-            self.equity_curve.append({
-                'time': current_time,
-                'balance': self.balance,
-                'in_position': self.in_position
-            })
-
-            # Skip if already in position
-            if self.in_position:
-                continue
+    def _emit_bars(self, times, start, stop, in_position):
+        """on_bar for bars [start, stop), all at the current balance"""
+        for idx in range(start, stop):
+            self.events.emit('on_bar', self, idx, times.iat[idx], self.balance, in_position)
+
+    def _simulate(self, df, start_idx, end_idx, resume, close_open_trade):
+        """Trade bars [start_idx, end_idx) of df (see run_backtest)"""
+        # Reset state (the equity tracker always covers just this call)
+        self.equity = EquityTracker(df['time'].iloc[start_idx:end_idx])
+        if not resume:
+            self.balance = self.initial_balance
+            self.in_position = False
+            self.current_trade = None
+            self.trades = TradeLog()
+            self.daily_trades_count = {}
+
+        start_balance = self.balance
+        first_trade = len(self.trades)
+
+        signals = self.compute_signals(df)
+        signal = signals['signal']
+        box_range = signals['box_range']
+
+        indicators = IndicatorCache.for_frame(df)
+        times = df['time']
+        high = indicators.high
+        low = indicators.low
+        close = indicators.close
+
+        # Only bars with a breakout signal can open a trade
+        candidates = np.flatnonzero(signal[start_idx:end_idx]) + start_idx
+
+        # Calendar day of each candidate, to skip the rest of a day at its trade limit
+        candidate_times = pd.DatetimeIndex(times.iloc[candidates])
+        if candidate_times.tz is not None:
+            candidate_times = candidate_times.tz_localize(None)
+        candidate_days = candidate_times.values.astype('datetime64[D]')
+        days_sorted = bool(np.all(candidate_days[1:] >= candidate_days[:-1]))
+
+        # (entry_idx, exit_idx) per trade, exit_idx is None if still open
+        positions = []
+
+        # A trade resumed from the previous call counts as entered just before start_idx
+        carried = self.in_position
+
+        # Bars are only visited one by one for on_bar subscribers
+        events = self.events
+        emit_bars = bool(events.on_bar)
+        next_bar = start_idx
+
+        # Main backtest loop: jump from one tradable signal to the exit of its trade
+        i = start_idx
+        while True:
+            if carried:
+                entry_idx = start_idx - 1
+                carried = False
+            else:
+                c = np.searchsorted(candidates, i)
+                while c < len(candidates) and not self.can_trade_today(times.iat[candidates[c]]):
+                    if days_sorted:
+                        c = np.searchsorted(candidate_days, candidate_days[c], side='right')
+                    else:
+                        c += 1
+
+                if c >= len(candidates):
+                    break
+
+                entry_idx = int(candidates[c])
+                current_time = times.iat[entry_idx]
+                current_price = close[entry_idx]
+                signal_type = 'BUY' if signal[entry_idx] > 0 else 'SELL'
+
+                if emit_bars:
+                    self._emit_bars(times, next_bar, entry_idx + 1, False)
+                    next_bar = entry_idx + 1
+
+                # Calculate TP and SL
+                tp, sl = self.calculate_tp_sl(current_price, signal_type, box_range[entry_idx])
+
+                # Open trade
+                self.open_trade(signal_type, current_price, current_time, tp, sl)
+                self.increment_daily_trades(current_time)
+
+                if events.on_open:
+                    events.emit('on_open', self, entry_idx, self.current_trade, box_range[entry_idx])
+
+            exit_idx = self.find_exit_bar(high, low, entry_idx + 1, end_idx)
+            positions.append((entry_idx, exit_idx))
+
+            if exit_idx is None:
+                break
+
+            if emit_bars:
+                self._emit_bars(times, next_bar, exit_idx, True)
+
+            exit_bar = {'high': high[exit_idx], 'low': low[exit_idx], 'close': close[exit_idx]}
+            should_close, exit_price, exit_reason = self.check_trade_exit(exit_bar, exit_idx)
+            self.close_trade(exit_price, times.iat[exit_idx], exit_reason)
+
+            if events.on_close:
+                events.emit('on_close', self, exit_idx, self.trades[-1])
+
+            if emit_bars:
+                self._emit_bars(times, exit_idx, exit_idx + 1, False)
+                next_bar = exit_idx + 1
+
+            # A new trade may open on the same bar the previous one closed
+            i = exit_idx
+
+        if emit_bars:
+            self._emit_bars(times, next_bar, end_idx, self.in_position)
+
+        self._record_equity(start_idx, end_idx, positions, start_balance,
+                            self.trades.column('balance')[first_trade:])
 
-            # Skip if daily limit reached
-            if not self.can_trade_today(current_time):
-                continue
+        # Close any remaining open trades
+        if self.in_position and close_open_trade:
+            last_bar = df.iloc[end_idx - 1]
+            self.close_trade(last_bar['close'], last_bar['time'], 'END_OF_DATA')
 
-            # Look for new trade opportunities
-            is_consolidating, high_level, low_level, box_range = self.identify_consolidation(df, i)
+            if events.on_close:
+                events.emit('on_close', self, end_idx - 1, self.trades[-1])
 
-            if is_consolidating:
-                signal = self.detect_breakout(df, i, high_level, low_level)
+    def run_multi(self, df, param_sets, start_idx=None, end_idx=None, cache=None):
+        """
+        Run one backtest per parameter set, sharing the rolling statistics
 
-                if signal:
-                    # Calculate TP and SL
-                    tp, sl = self.calculate_tp_sl(current_price, signal, box_range)
+        The rolling high/low/mean of each distinct consolidation window is
+        computed once, and all breakout thresholds of that window are
+        evaluated together as a 2-D mask. Only the position loop runs per
+        parameter set. Console output of the individual runs is suppressed.
 
-                    # Open trade
-                    self.open_trade(signal, current_price, current_time, tp, sl)
-                    self.increment_daily_trades(current_time)
+        Parameters:
+        - df: DataFrame with OHLCV data, or a SharedDataset
+        - param_sets: List of (consolidation_periods, breakout_threshold)
+          pairs, or of dicts of constructor overrides (e.g. also
+          risk_reward_ratio); unspecified values come from this backtester
+        - start_idx, end_idx: As for run_backtest
+        - cache: Optional ResultCache; only parameter sets missing from it run
 
-                    print(f"📍 {signal} | Entry: {current_price:.2f} | "
-                          f"TP: {tp:.2f} | SL: {sl:.2f} | "
-                          f"Box Range: {box_range:.2f}")
+        Returns:
+        - List of results dictionaries, in the order of param_sets
+        """
+        df = as_frame(df)
+
+        base_params = {
+            'initial_balance': self.initial_balance,
+            'lot_size': self.lot_size,
+            'risk_reward_ratio': self.risk_reward_ratio,
+            'consolidation_periods': self.consolidation_periods,
+            'breakout_threshold': self.breakout_threshold,
+            'max_daily_trades': self.max_daily_trades,
+            'intrabar': self.intrabar
+        }
 
-        # Close any remaining open trades
-        if self.in_position:
-            last_bar = df.iloc[end_idx - 1]
-            self.close_trade(last_bar['close'], last_bar['time'], 'END_OF_DATA')
+        runs = []
+        for params in param_sets:
+            if not isinstance(params, dict):
+                consolidation_periods, breakout_threshold = params
+                params = {'consolidation_periods': consolidation_periods,
+                          'breakout_threshold': breakout_threshold}
+            runs.append({**base_params, **params})
+
+        results = [None] * len(runs)
+        pending = list(range(len(runs)))
+        run_kwargs = {'start_idx': start_idx, 'end_idx': end_idx}
+
+        if cache is not None:
+            fingerprint = dataset_fingerprint(df)
+            keys = [cache.key(Backtester, fingerprint, params, run_kwargs) for params in runs]
+            pending = []
+            for index, key in enumerate(keys):
+                payload = cache.get(key)
+                if payload is None:
+                    pending.append(index)
+                else:
+                    results[index] = payload['results']
+
+        # One rolling pass per window, one mask row per threshold
+        thresholds_by_window = {}
+        for params in (runs[index] for index in pending):
+            thresholds_by_window.setdefault(params['consolidation_periods'], []).append(
+                params['breakout_threshold'])
+
+        indicators = IndicatorCache.for_frame(df)
+        for period, thresholds in thresholds_by_window.items():
+            indicators.prepare_consolidation(period, thresholds)
+
+        for index in pending:
+            backtester = Backtester(**runs[index])
+            results[index] = backtester.run_backtest(df, start_idx, end_idx, verbose=False)
+
+            if cache is not None:
+                cache.put(keys[index], {'results': results[index], 'trades': backtester.trades})
 
-        print("-" * 70)
-        print("✅ BACKTEST COMPLETE")
-        print("=" * 70)
+        return results
 
-        return self.get_results()
+    def _record_equity(self, start_idx, end_idx, positions, balance, closed_balances):
+        """
+        Fill self.equity from trade entry/exit bars
+
+        Balance is recorded after any exit on a bar and before any entry,
+        so a trade counts as open strictly between its entry and exit bars.
+        Balance is constant between exits, so each stretch is one record.
+
+        Parameters:
+        - balance: Balance at start_idx
+        - closed_balances: Balance after each trade closed in this range, in order
+        """
+        last_idx = start_idx
+        closed_balances = iter(closed_balances)
+
+        for entry_idx, exit_idx in positions:
+            if exit_idx is None:
+                self.equity.mark_in_position(entry_idx + 1 - start_idx, end_idx - start_idx)
+                continue
+
+            self.equity.mark_in_position(entry_idx + 1 - start_idx, exit_idx - start_idx)
+            self.equity.record(balance, count=exit_idx - last_idx)
+            balance = next(closed_balances)
+            last_idx = exit_idx
+
+        self.equity.record(balance, count=end_idx - last_idx)
+
+    @property
+    def equity_curve(self):
+        """Per-bar equity as a list of dicts (built on demand from self.equity)"""
+        return self.equity.to_records() if self.equity is not None else []
 
     def get_results(self):
         """Calculate and return backtest results"""
@@ -341,39 +597,31 @@ class Backtester:
                 'initial_balance': self.initial_balance
             }
 
-        trades_df = pd.DataFrame(self.trades)
-
-        winning_trades = trades_df[trades_df['win'] == True]
-        losing_trades = trades_df[trades_df['win'] == False]
-
-        total_profit = winning_trades['profit'].sum() if len(winning_trades) > 0 else 0
-        total_loss = abs(losing_trades['profit'].sum()) if len(losing_trades) > 0 else 0
-
-        # Calculate drawdown
-        equity_df = pd.DataFrame(self.equity_curve)
-        equity_df['peak'] = equity_df['balance'].cummax()
-        equity_df['drawdown'] = equity_df['peak'] - equity_df['balance']
-        equity_df['drawdown_pct'] = (equity_df['drawdown'] / equity_df['peak']) * 100
+        # Win/loss aggregates are reductions over the trade log's columns
+        summary = self.trades.summary()
+        total_profit = summary['total_profit']
+        total_loss = summary['total_loss']
 
-        max_drawdown = equity_df['drawdown'].max()
-        max_drawdown_pct = equity_df['drawdown_pct'].max()
+        # Drawdown is tracked online while the equity curve is recorded
+        max_drawdown = self.equity.max_drawdown
+        max_drawdown_pct = self.equity.max_drawdown_pct
 
         results = {
             'total_trades': len(self.trades),
-            'winning_trades': len(winning_trades),
-            'losing_trades': len(losing_trades),
-            'win_rate': (len(winning_trades) / len(self.trades) * 100) if len(self.trades) > 0 else 0,
+            'winning_trades': summary['winning_trades'],
+            'losing_trades': summary['losing_trades'],
+            'win_rate': (summary['winning_trades'] / len(self.trades) * 100) if len(self.trades) > 0 else 0,
             'total_profit': total_profit,
             'total_loss': total_loss,
             'net_profit': total_profit - total_loss,
             'return_pct': ((self.balance - self.initial_balance) / self.initial_balance) * 100,
             'max_drawdown': max_drawdown,
             'max_drawdown_pct': max_drawdown_pct,
-            'avg_win': winning_trades['profit'].mean() if len(winning_trades) > 0 else 0,
-            'avg_loss': losing_trades['profit'].mean() if len(losing_trades) > 0 else 0,
+            'avg_win': summary['avg_win'],
+            'avg_loss': summary['avg_loss'],
             'profit_factor': total_profit / total_loss if total_loss > 0 else float('inf'),
-            'largest_win': winning_trades['profit'].max() if len(winning_trades) > 0 else 0,
-            'largest_loss': losing_trades['profit'].min() if len(losing_trades) > 0 else 0,
+            'largest_win': summary['largest_win'],
+            'largest_loss': summary['largest_loss'],
             'final_balance': self.balance,
             'initial_balance': self.initial_balance
         }
@@ -436,7 +684,7 @@ class Backtester:
         results = self.get_results()
 
         # Also save trade history
-        results['trades'] = self.trades
+        results['trades'] = self.trades.to_records()
         results['equity_curve'] = self.equity_curve
 
         with open(filename, 'w') as f:
@@ -450,6 +698,6 @@ class Backtester:
             print("No trades to export")
             return
 
-        trades_df = pd.DataFrame(self.trades)
+        trades_df = self.trades.to_frame()
         trades_df.to_csv(filename, index=False)
         print(f"💾 Trades exported to: {filename}")
@@ -0,0 +1,266 @@
+"""
+Benchmark Suite for the NAS100 Backtesting Engines
+Times Backtester, EnhancedBacktester and UltraBacktester on synthetic M1 data
+
+Every (engine, dataset size) case runs in a fresh process so peak RSS is not
+polluted by earlier cases. Results are written as JSON so runs from different
+commits can be compared:
+
+    python benchmark.py --output bench_before.json
+    python benchmark.py --output bench_after.json --compare bench_before.json
+"""
+
+import argparse
+import gc
+import json
+import multiprocessing
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from data_fetcher import DataFetcher
+from backtester import Backtester
+from enhanced_backtester import EnhancedBacktester
+from ultra_backtester import UltraBacktester
+from indicator_cache import IndicatorCache
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+
+# Same settings as test_all_versions.run_all_three()
+BASE_PARAMS = {
+    'initial_balance': 10000,
+    'lot_size': 0.01,
+    'risk_reward_ratio': 2.0,
+    'consolidation_periods': 25,
+    'breakout_threshold': 0.003,
+    'max_daily_trades': 5
+}
+
+ENGINES = {
+    'basic': (Backtester, BASE_PARAMS),
+    'enhanced': (EnhancedBacktester, {
+        **BASE_PARAMS,
+        'trend_period': 30,
+        'min_breakout_strength': 0.2,
+        'volume_multiplier': 1.1
+    }),
+    'ultra': (UltraBacktester, {
+        **BASE_PARAMS,
+        'trend_period': 30,
+        'min_breakout_strength': 0.2,
+        'volume_multiplier': 1.1,
+        'higher_tf_period': 200
+    })
+}
+
+DEFAULT_SIZES = [1, 30, 365]  # Days of M1 bars
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None if unavailable)"""
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_quiet(engine_cls, params, df):
+    """
+    Run one cold backtest without console output
+
+    Indicator arrays are cached per frame, so the cache is cleared first:
+    otherwise every run after the first would skip computing them.
+
+    Returns:
+    - (backtester, get_results() dictionary)
+    """
+    IndicatorCache.clear()
+    backtester = engine_cls(**params)
+    return backtester, backtester.run_backtest(df, verbose=False)
+
+
+def run_case(engine_name, days, repeat, measure_allocations, seed):
+    """
+    Benchmark one engine on one dataset size (runs in a child process)
+
+    Returns:
+    - Dictionary of metrics for this case
+    """
+    engine_cls, params = ENGINES[engine_name]
+
+    fetcher = DataFetcher()
+    df = fetcher.path_to_frame(fetcher.generate_price_paths(days=days, seed=seed))
+    bars = len(df)
+
+    gc.collect()
+    rss_before = peak_rss_mb()
+
+    timings = []
+    results = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _, results = run_quiet(engine_cls, params, df)
+        timings.append(time.perf_counter() - start)
+
+    rss_after = peak_rss_mb()
+    best = min(timings)
+
+    case = {
+        'engine': engine_name,
+        'days': days,
+        'bars': bars,
+        'repeat': repeat,
+        'seconds': best,
+        'seconds_all': timings,
+        'bars_per_sec': bars / best if best > 0 else None,
+        'peak_rss_mb': rss_after,
+        'rss_growth_mb': (rss_after - rss_before) if rss_after is not None else None,
+        'total_trades': results['total_trades']
+    }
+
+    if measure_allocations:
+        # Separate pass: tracemalloc slows the run down, so it is not timed.
+        # Retained blocks are the memory blocks allocated during the run and
+        # still held when it ends (trades, equity curve, indicator arrays), not
+        # every allocation: CPython does not count short-lived ones. The peak
+        # is the most traced memory held at once, temporaries included.
+        IndicatorCache.clear()
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        backtester, _ = run_quiet(engine_cls, params, df)
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        blocks = sum(stat.count_diff for stat in after.compare_to(before, 'lineno') if stat.count_diff > 0)
+        del backtester
+
+        case['retained_blocks'] = blocks
+        case['retained_blocks_per_bar'] = blocks / bars
+        case['traced_peak_bytes'] = peak
+        case['traced_peak_bytes_per_bar'] = peak / bars
+
+    return case
+
+
+def git_commit():
+    """Current git commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(engines=None, sizes=None, repeat=1, measure_allocations=True, seed=42):
+    """
+    Run every (engine, size) case in its own process
+
+    Returns:
+    - Report dictionary (environment info plus one entry per case)
+    """
+    engines = engines or list(ENGINES)
+    sizes = sizes or DEFAULT_SIZES
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'seed': seed,
+        'results': []
+    }
+
+    context = multiprocessing.get_context('spawn')
+
+    for days in sizes:
+        for engine_name in engines:
+            print(f"⏱️  {engine_name:<9} {days:>4} days ...", end=" ", flush=True)
+
+            with context.Pool(1) as pool:
+                case = pool.apply(run_case, (engine_name, days, repeat, measure_allocations, seed))
+
+            report['results'].append(case)
+
+            line = f"{case['bars_per_sec']:>12,.0f} bars/s  {case['seconds']:>8.2f}s"
+            if case['peak_rss_mb'] is not None:
+                line += f"  peak RSS {case['peak_rss_mb']:>7.1f} MB"
+            if 'retained_blocks_per_bar' in case:
+                line += (f"  {case['retained_blocks_per_bar']:>6.2f} retained blocks/bar"
+                         f"  {case['traced_peak_bytes_per_bar']:>8.1f} peak B/bar")
+            print(line)
+
+    return report
+
+
+def compare_reports(current, previous):
+    """Print bars/second change per case against an earlier report"""
+    previous_cases = {(c['engine'], c['days']): c for c in previous['results']}
+
+    print()
+    print("=" * 70)
+    print(f"📊 COMPARISON vs {(previous.get('git_commit') or 'unknown')[:10]} ({previous.get('timestamp')})")
+    print("=" * 70)
+    print(f"{'ENGINE':<10} {'DAYS':>5} {'BEFORE bars/s':>15} {'AFTER bars/s':>15} {'CHANGE':>10}")
+    print("-" * 70)
+
+    for case in current['results']:
+        before = previous_cases.get((case['engine'], case['days']))
+        if before is None or not before.get('bars_per_sec'):
+            continue
+
+        change = (case['bars_per_sec'] / before['bars_per_sec'] - 1) * 100
+        symbol = "📈" if change >= 0 else "📉"
+        print(f"{case['engine']:<10} {case['days']:>5} {before['bars_per_sec']:>15,.0f} "
+              f"{case['bars_per_sec']:>15,.0f} {symbol} {change:+.1f}%")
+
+    print("=" * 70)
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the NAS100 backtesting engines")
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES,
+                        help="Dataset sizes in days of M1 bars (default: 1 30 365)")
+    parser.add_argument('--repeat', type=int, default=1, help="Timed runs per case (best is kept)")
+    parser.add_argument('--no-alloc', action='store_true', help="Skip the tracemalloc pass")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("🏁 BACKTEST ENGINE BENCHMARK")
+    print("=" * 70)
+
+    report = run_benchmarks(engines=args.engines, sizes=args.sizes, repeat=args.repeat,
+                            measure_allocations=not args.no_alloc, seed=args.seed)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Benchmark saved to: {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare_reports(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
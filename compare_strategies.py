@@ -6,6 +6,9 @@ Shows the impact of advanced filters on win rate and profitability
 from data_fetcher import DataFetcher
 from backtester import Backtester
 from enhanced_backtester import EnhancedBacktester
+from parameter_sweep import run_sweep, successive_halving
+from result_cache import ResultCache, cached_backtest, dataset_fingerprint
+from walk_forward import walk_forward, print_walk_forward
 import pandas as pd
 
 
@@ -99,8 +102,13 @@ def print_comparison(basic_results, enhanced_results):
     print("=" * 90 + "\n")
 
 
-def run_comparison():
-    """Run comparison between basic and enhanced strategies"""
+def run_comparison(use_cache=True):
+    """
+    Run comparison between basic and enhanced strategies
+
+    Parameters:
+    - use_cache: Reuse results of identical earlier runs (see result_cache.py)
+    """
     print("=" * 90)
     print(" " * 20 + "🔬 BASIC vs ENHANCED STRATEGY COMPARISON")
     print("=" * 90)
@@ -130,11 +138,17 @@ def run_comparison():
         'max_daily_trades': 5
     }
 
+    cache = ResultCache() if use_cache else None
+    fingerprint = dataset_fingerprint(df)
+
     print("Step 2: Running BASIC strategy backtest...")
     print("-" * 90)
 
     basic_bt = Backtester(**best_params)
-    basic_results = basic_bt.run_backtest(df)
+    if cache is not None:
+        basic_results = cached_backtest(basic_bt, df, cache, fingerprint)
+    else:
+        basic_results = basic_bt.run_backtest(df)
 
     print()
     print("Step 3: Running ENHANCED strategy backtest...")
@@ -152,7 +166,10 @@ def run_comparison():
         atr_multiplier=2.0,
         volume_multiplier=1.1  # More lenient for synthetic data
     )
-    enhanced_results = enhanced_bt.run_backtest(df)
+    if cache is not None:
+        enhanced_results = cached_backtest(enhanced_bt, df, cache, fingerprint)
+    else:
+        enhanced_results = enhanced_bt.run_backtest(df)
 
     # Print comparison
     print_comparison(basic_results, enhanced_results)
@@ -164,8 +181,22 @@ def run_comparison():
     return basic_results, enhanced_results
 
 
-def optimize_enhanced():
-    """Find best parameters for enhanced strategy"""
+def optimize_enhanced(workers=None, use_cache=True, search='grid'):
+    """
+    Find best parameters for enhanced strategy
+
+    Parameters:
+    - workers: Number of worker processes (default: CPU count)
+    - use_cache: Reuse results of combinations already run on the same data
+      (see result_cache.py), so only new combinations are computed
+    - search: 'grid' runs every combination on all the data; 'halving'
+      starts every combination on 1/16 of the bars and keeps the best
+      quarter each round on twice the data (successive halving) until the
+      last 10 run on all of it, which needs about 15% of the bar evaluations
+    """
+    if search not in ('grid', 'halving'):
+        raise ValueError("search must be 'grid' or 'halving'")
+
     print("=" * 90)
     print(" " * 25 + "🔬 ENHANCED STRATEGY OPTIMIZATION")
     print("=" * 90)
@@ -178,75 +209,101 @@ def optimize_enhanced():
         df = fetcher.generate_sample_data(days=30)
 
     # Parameter ranges (adjusted for synthetic data)
-    risk_rewards = [2.0, 2.5, 3.0]
-    consolidation_periods_list = [15, 20, 25]
-    breakout_thresholds = [0.003, 0.004, 0.005]
-    trend_periods = [30, 50, 100]
-    breakout_strengths = [0.1, 0.15, 0.2]  # Lower for synthetic data
+    param_grid = {
+        'risk_reward_ratio': [2.0, 2.5, 3.0],
+        'consolidation_periods': [15, 20, 25],
+        'breakout_threshold': [0.003, 0.004, 0.005],
+        'trend_period': [30, 50, 100],
+        'min_breakout_strength': [0.1, 0.15, 0.2]  # Lower for synthetic data
+    }
+
+    base_params = {
+        'initial_balance': 10000,
+        'lot_size': 0.01,
+        'max_daily_trades': 5,
+        'use_trend_filter': True,
+        'use_breakout_strength': True,
+        'use_atr_stops': True,
+        'atr_period': 14,
+        'atr_multiplier': 2.0,
+        'volume_multiplier': 1.1  # Adjusted for synthetic data
+    }
 
     best_score = -float('inf')
     best_params = None
-    all_results = []
+    latest = {}
 
-    total_tests = len(risk_rewards) * len(consolidation_periods_list) * len(breakout_thresholds) * len(trend_periods) * len(breakout_strengths)
+    total_tests = 1
+    for values in param_grid.values():
+        total_tests *= len(values)
     current_test = 0
 
     print(f"Testing {total_tests} parameter combinations...")
-    print("(This may take a few minutes)")
+    if search == 'halving':
+        print("(Successive halving: weak combinations are dropped on a prefix of the data)")
+    else:
+        print("(This may take a few minutes)")
     print()
 
-    for rr in risk_rewards:
-        for cp in consolidation_periods_list:
-            for bt in breakout_thresholds:
-                for tp in trend_periods:
-                    for bs in breakout_strengths:
-                        current_test += 1
-
-                        backtester = EnhancedBacktester(
-                            initial_balance=10000,
-                            lot_size=0.01,
-                            risk_reward_ratio=rr,
-                            consolidation_periods=cp,
-                            breakout_threshold=bt,
-                            max_daily_trades=5,
-                            use_trend_filter=True,
-                            trend_period=tp,
-                            use_breakout_strength=True,
-                            min_breakout_strength=bs,
-                            use_atr_stops=True,
-                            atr_period=14,
-                            atr_multiplier=2.0,
-                            volume_multiplier=1.1  # Adjusted for synthetic data
-                        )
-
-                        print(f"[{current_test}/{total_tests}] Testing: RR={rr}, CP={cp}, BT={bt}, TP={tp}, BS={bs}...", end=" ")
-
-                        results = backtester.run_backtest(df, verbose=False)
-
-                        # Score based on win rate AND profitability
-                        # Prioritize win rate but also consider returns
-                        score = results['win_rate'] * 2 + results['return_pct']
-
-                        params = {
-                            'risk_reward': rr,
-                            'consolidation_periods': cp,
-                            'breakout_threshold': bt,
-                            'trend_period': tp,
-                            'breakout_strength': bs,
-                            'return_pct': results['return_pct'],
-                            'win_rate': results['win_rate'],
-                            'total_trades': results['total_trades'],
-                            'profit_factor': results['profit_factor'],
-                            'score': score
-                        }
-
-                        all_results.append(params)
-
-                        print(f"WinRate: {results['win_rate']:.1f}%, Return: {results['return_pct']:.1f}%, Score: {score:.2f}")
-
-                        if score > best_score and results['total_trades'] >= 20:
-                            best_score = score
-                            best_params = params
+    cache = ResultCache() if use_cache else None
+
+    # Score based on win rate AND profitability
+    # Prioritize win rate but also consider returns
+    def score_results(results):
+        return results['win_rate'] * 2 + results['return_pct']
+
+    if search == 'halving':
+        runs = successive_halving(EnhancedBacktester, df, param_grid, score_results, workers=workers,
+                                  base_params=base_params, keep_fraction=0.25, min_survivors=10,
+                                  min_trades=20, cache=cache)
+    else:
+        runs = ((index, combo, results, None) for index, combo, results in
+                run_sweep(EnhancedBacktester, df, param_grid, workers=workers,
+                          base_params=base_params, cache=cache))
+
+    # Results arrive as workers finish, not in grid order
+    for index, combo, results, end_idx in runs:
+        current_test += 1
+        rr = combo['risk_reward_ratio']
+        cp = combo['consolidation_periods']
+        bt = combo['breakout_threshold']
+        tp = combo['trend_period']
+        bs = combo['min_breakout_strength']
+
+        score = score_results(results)
+        bars = end_idx or len(df)
+
+        params = {
+            'risk_reward': rr,
+            'consolidation_periods': cp,
+            'breakout_threshold': bt,
+            'trend_period': tp,
+            'breakout_strength': bs,
+            'return_pct': results['return_pct'],
+            'win_rate': results['win_rate'],
+            'total_trades': results['total_trades'],
+            'profit_factor': results['profit_factor'],
+            'score': score,
+            'bars': bars
+        }
+
+        # Later halving rounds replace a combination's earlier, shorter run
+        latest[index] = params
+
+        progress = f"[{current_test}/{total_tests}]" if search == 'grid' else f"[{bars} bars]"
+        print(f"{progress} RR={rr}, CP={cp}, BT={bt}, TP={tp}, BS={bs} → "
+              f"WinRate: {results['win_rate']:.1f}%, Return: {results['return_pct']:.1f}%, Score: {score:.2f}")
+
+    # Restore grid order so ties resolve the same way as a serial run
+    all_results = [latest[index] for index in sorted(latest)]
+
+    for params in all_results:
+        # Only runs on the full dataset are comparable
+        if params['bars'] < len(df):
+            continue
+        if params['score'] > best_score and params['total_trades'] >= 20:
+            best_score = params['score']
+            best_params = params
 
     print()
     print("=" * 90)
@@ -276,9 +333,14 @@ def optimize_enhanced():
 
     # Show top 10 results sorted by score
     print()
-    print("Top 10 Parameter Combinations (by combined score):")
+    if search == 'halving':
+        print("Top 10 Parameter Combinations (by combined score, full-dataset finalists only):")
+    else:
+        print("Top 10 Parameter Combinations (by combined score):")
     print()
-    sorted_results = sorted(all_results, key=lambda x: x['score'], reverse=True)[:10]
+    # Scores on a prefix of the data are not comparable with full runs
+    full_results = [result for result in all_results if result['bars'] == len(df)]
+    sorted_results = sorted(full_results, key=lambda x: x['score'], reverse=True)[:10]
 
     for i, result in enumerate(sorted_results, 1):
         print(f"{i}. RR={result['risk_reward']}, CP={result['consolidation_periods']}, "
@@ -291,6 +353,61 @@ def optimize_enhanced():
     return best_params
 
 
+def walk_forward_enhanced(workers=None, use_cache=True):
+    """
+    Walk-forward test of the enhanced strategy
+
+    Picks the best parameters on 10 days of data, trades them on the next
+    5 days, then rolls forward by 5 days. Only the out-of-sample days count
+    towards the reported result.
+
+    Parameters:
+    - workers: Number of worker processes (default: CPU count)
+    - use_cache: Reuse in-sample results already computed on the same data
+    """
+    print("=" * 90)
+    print(" " * 25 + "🚶 ENHANCED STRATEGY WALK-FORWARD")
+    print("=" * 90)
+    print()
+
+    fetcher = DataFetcher()
+    df = fetcher.load_data("NAS100_synthetic_30days.csv")
+    if df is None:
+        df = fetcher.generate_sample_data(days=30)
+
+    param_grid = {
+        'risk_reward_ratio': [2.0, 2.5, 3.0],
+        'consolidation_periods': [15, 20, 25],
+        'breakout_threshold': [0.003, 0.004, 0.005]
+    }
+
+    base_params = {
+        'initial_balance': 10000,
+        'lot_size': 0.01,
+        'max_daily_trades': 5,
+        'use_trend_filter': True,
+        'trend_period': 50,
+        'use_breakout_strength': True,
+        'min_breakout_strength': 0.15,
+        'use_atr_stops': True,
+        'atr_period': 14,
+        'atr_multiplier': 2.0,
+        'volume_multiplier': 1.1
+    }
+
+    bars_per_day = 24 * 60
+    print("In-sample: 10 days, out-of-sample: 5 days, step: 5 days")
+    print("(This may take a few minutes)")
+
+    report = walk_forward(EnhancedBacktester, df, param_grid,
+                          in_sample_bars=10 * bars_per_day, out_of_sample_bars=5 * bars_per_day,
+                          base_params=base_params, workers=workers,
+                          cache=ResultCache() if use_cache else None)
+
+    print_walk_forward(report)
+    return report
+
+
 def main():
     """Main menu"""
     print()
@@ -303,10 +420,11 @@ def main():
     print("1. Compare Basic vs Enhanced (with best known parameters)")
     print("2. Optimize Enhanced Strategy (find best parameters for high win rate)")
     print("3. Quick Test Enhanced Strategy (default parameters)")
-    print("4. Exit")
+    print("4. Walk-Forward Test Enhanced Strategy (optimize, then trade unseen data)")
+    print("5. Exit")
     print()
 
-    choice = input("Enter your choice (1-4): ").strip()
+    choice = input("Enter your choice (1-5): ").strip()
 
     if choice == "1":
         run_comparison()
@@ -338,6 +456,8 @@ def main():
         enhanced_bt.run_backtest(df)
         enhanced_bt.print_results()
     elif choice == "4":
+        walk_forward_enhanced()
+    elif choice == "5":
         print("\n👋 Goodbye!")
         return
     else:
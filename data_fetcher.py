@@ -6,7 +6,9 @@ Downloads free historical data for backtesting
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import json
 import os
+import shutil
 
 try:
     import yfinance as yf
@@ -16,6 +18,20 @@ except ImportError:
     print("yfinance not installed. Install with: pip install yfinance")
 
 
+# Columns stored in the columnar cache and their on-disk dtypes
+COLUMNAR_COLUMNS = {
+    'time': np.int64,  # Epoch nanoseconds (UTC for timezone-aware data)
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'tick_volume': np.int64
+}
+
+# Bump when the on-disk layout changes so old conversions are rebuilt
+COLUMNAR_VERSION = 1
+
+
 class DataFetcher:
     """Fetch historical market data for backtesting"""
 
@@ -122,14 +138,29 @@ class DataFetcher:
             print(f"❌ Error saving data: {e}")
             return False
 
-    def load_data(self, filename):
-        """Load data from CSV file"""
+    def load_data(self, filename, use_columnar=True):
+        """
+        Load data from CSV file
+
+        Parameters:
+        - filename: CSV file name inside data_dir
+        - use_columnar: Load through the memory-mapped columnar cache
+          (converted once, rebuilt automatically when the CSV changes)
+        """
         filepath = os.path.join(self.data_dir, filename)
 
         if not os.path.exists(filepath):
             print(f"❌ File not found: {filepath}")
             return None
 
+        if use_columnar:
+            try:
+                df = self.columns_to_frame(self.load_columns(filename))
+                print(f"✅ Loaded {len(df)} bars from {filename}")
+                return df
+            except Exception as e:
+                print(f"⚠️  Columnar load failed ({e}), reading CSV instead")
+
         try:
             df = pd.read_csv(filepath)
             df['time'] = pd.to_datetime(df['time'])
@@ -139,6 +170,141 @@ class DataFetcher:
             print(f"❌ Error loading data: {e}")
             return None
 
+    def iter_chunks(self, filename, chunksize=100_000):
+        """
+        Read a CSV file in chunks of bars, without loading it whole
+
+        Parameters:
+        - filename: CSV file name inside data_dir
+        - chunksize: Bars per chunk
+
+        Yields:
+        - DataFrame per chunk, with parsed times (same columns as load_data)
+        """
+        filepath = os.path.join(self.data_dir, filename)
+
+        for chunk in pd.read_csv(filepath, chunksize=chunksize):
+            chunk['time'] = pd.to_datetime(chunk['time'])
+            yield chunk
+
+    def columnar_path(self, filename):
+        """Directory holding the columnar conversion of a CSV file"""
+        stem = os.path.splitext(filename)[0]
+        return os.path.join(self.data_dir, '.columnar', stem)
+
+    def _source_signature(self, filepath):
+        """Size and modification time used to detect CSV changes"""
+        stat = os.stat(filepath)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def is_columnar_current(self, filename):
+        """Check if the columnar conversion exists and matches the CSV"""
+        meta_path = os.path.join(self.columnar_path(filename), 'meta.json')
+        if not os.path.exists(meta_path):
+            return False
+
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        source = self._source_signature(os.path.join(self.data_dir, filename))
+        return meta.get('version') == COLUMNAR_VERSION and meta.get('source') == source
+
+    def convert_to_columnar(self, filename):
+        """
+        Convert a CSV file into one .npy file per column
+
+        Layout (inside data_dir/.columnar/<name>/):
+        - time.npy: int64 epoch nanoseconds
+        - open.npy, high.npy, low.npy, close.npy: float64
+        - tick_volume.npy: int64
+        - meta.json: row count, timezone and source CSV size/mtime
+
+        Returns:
+        - Path of the columnar directory
+        """
+        filepath = os.path.join(self.data_dir, filename)
+        target = self.columnar_path(filename)
+        source = self._source_signature(filepath)
+
+        df = pd.read_csv(filepath, usecols=list(COLUMNAR_COLUMNS))
+        times = pd.DatetimeIndex(pd.to_datetime(df['time']))
+
+        tz = str(times.tz) if times.tz is not None else None
+        if tz is not None:
+            times = times.tz_convert('UTC').tz_localize(None)
+
+        # Write next to the target and swap in, so readers never see half a conversion
+        staging = target + '.tmp'
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        np.save(os.path.join(staging, 'time.npy'), times.as_unit('ns').asi8.astype(np.int64))
+        for col, dtype in COLUMNAR_COLUMNS.items():
+            if col != 'time':
+                np.save(os.path.join(staging, f'{col}.npy'), df[col].to_numpy(dtype=dtype))
+
+        meta = {
+            'version': COLUMNAR_VERSION,
+            'rows': len(df),
+            'tz': tz,
+            'source': source
+        }
+        with open(os.path.join(staging, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(staging, target)
+
+        print(f"🗜️  Converted {filename} to columnar format ({len(df)} bars)")
+        return target
+
+    def load_columns(self, filename):
+        """
+        Load the time and OHLCV columns of a CSV as memory-mapped arrays
+
+        Converts the CSV first if there is no conversion yet or the CSV
+        changed since the last one.
+
+        Returns:
+        - Dictionary of column name -> read-only numpy.memmap, plus 'tz'
+          (timezone name of the time column, or None)
+        """
+        if not self.is_columnar_current(filename):
+            self.convert_to_columnar(filename)
+
+        target = self.columnar_path(filename)
+        with open(os.path.join(target, 'meta.json')) as f:
+            meta = json.load(f)
+
+        columns = {
+            col: np.load(os.path.join(target, f'{col}.npy'), mmap_mode='r')
+            for col in COLUMNAR_COLUMNS
+        }
+        columns['tz'] = meta['tz']
+        return columns
+
+    def columns_to_frame(self, columns):
+        """
+        Wrap columns from load_columns() in a DataFrame without copying them
+
+        Timezone-aware data is converted back to its original timezone,
+        which needs one copy of the time column.
+        """
+        data = {'time': columns['time'].view('datetime64[ns]')}
+        for col in COLUMNAR_COLUMNS:
+            if col != 'time':
+                data[col] = columns[col]
+
+        df = pd.DataFrame(data, copy=False)
+
+        if columns.get('tz') is not None:
+            df['time'] = df['time'].dt.tz_localize('UTC').dt.tz_convert(columns['tz'])
+
+        return df
+
     def get_available_files(self):
         """List available data files"""
         files = [f for f in os.listdir(self.data_dir) if f.endswith('.csv')]
@@ -179,7 +345,133 @@ class DataFetcher:
 
         return df
 
-    def generate_sample_data(self, days=30, interval_minutes=1):
+    def generate_price_paths(self, days=30, interval_minutes=1, n_paths=1, seed=42,
+                             start_price=16000):
+        """
+        Generate synthetic OHLCV price paths with array operations
+
+        Each path follows the same regime process as generate_sample_data:
+        trending bars with a slight upward bias, tight consolidation boxes of
+        30-100 bars (5% chance to start one on any trending bar) and a strong
+        breakout move when a box ends.
+
+        Parameters:
+        - days: Number of days per path
+        - interval_minutes: Bar size in minutes
+        - n_paths: Number of independent paths (Monte Carlo mode)
+        - seed: Base seed; path i always gets the same stream for a given
+          seed, whatever n_paths is
+        - start_price: First close of every path
+
+        Returns:
+        - Dictionary with 'time' (DatetimeIndex shared by all paths) and
+          'open', 'high', 'low', 'close', 'tick_volume' arrays of shape
+          (n_paths, bars)
+        """
+        bars_per_day = int(24 * 60 / interval_minutes)
+        total_bars = days * bars_per_day
+
+        paths = {
+            'open': np.empty((n_paths, total_bars)),
+            'high': np.empty((n_paths, total_bars)),
+            'low': np.empty((n_paths, total_bars)),
+            'close': np.empty((n_paths, total_bars)),
+            'tick_volume': np.empty((n_paths, total_bars), dtype=np.int64)
+        }
+
+        seeds = np.random.SeedSequence(seed).spawn(n_paths)
+
+        for path, path_seed in enumerate(seeds):
+            rng = np.random.default_rng(path_seed)
+            close = self._generate_closes(rng, total_bars, start_price)
+
+            open_price = np.empty(total_bars)
+            open_price[0] = close[0]
+            open_price[1:] = close[:-1]
+
+            # High/Low based on intra-bar movement
+            volatility = np.abs(rng.standard_normal(total_bars)) * 10
+
+            paths['open'][path] = np.round(open_price, 2)
+            paths['high'][path] = np.round(np.maximum(open_price, close) + volatility, 2)
+            paths['low'][path] = np.round(np.minimum(open_price, close) - volatility, 2)
+            paths['close'][path] = np.round(close, 2)
+            paths['tick_volume'][path] = rng.integers(800, 1200, size=total_bars)
+
+        base_time = pd.Timestamp(datetime.now() - timedelta(days=days))
+        paths['time'] = base_time + pd.to_timedelta(np.arange(total_bars) * interval_minutes, unit='min')
+
+        return paths
+
+    def _generate_closes(self, rng, total_bars, start_price):
+        """
+        Generate one close series from trend / consolidation / breakout regimes
+
+        The regime sequence is drawn as segment lengths: a geometric number of
+        trending bars, then a consolidation of 30-100 bars whose last bar is
+        the breakout. A running "level" carries trends and breakout jumps;
+        consolidation bars scatter around the level they started from.
+        """
+        # Regime codes per bar (bar 0 is the start price)
+        TREND, CONSOLIDATION, BREAKOUT = 0, 1, 2
+        needed = total_bars - 1
+
+        trend_lengths = []
+        consol_lengths = []
+        covered = 0
+        while covered < needed:
+            # Enough segments for the remaining bars on average (~84 bars per cycle)
+            count = needed // 60 + 8
+            trends = rng.geometric(0.05, size=count) - 1  # trending bars before a box starts
+            consols = rng.integers(30, 100, size=count)
+            trend_lengths.append(trends)
+            consol_lengths.append(consols)
+            covered += int(trends.sum() + consols.sum())
+
+        trend_lengths = np.concatenate(trend_lengths)
+        consol_lengths = np.concatenate(consol_lengths)
+
+        codes = np.empty(3 * len(trend_lengths), dtype=np.int8)
+        codes[0::3] = TREND
+        codes[1::3] = CONSOLIDATION
+        codes[2::3] = BREAKOUT
+
+        lengths = np.empty(3 * len(trend_lengths), dtype=np.int64)
+        lengths[0::3] = trend_lengths
+        lengths[1::3] = consol_lengths - 1
+        lengths[2::3] = 1
+
+        regime = np.repeat(codes, lengths)[:needed]
+
+        # Trending / normal movement with slight upward bias
+        increments = np.where(regime == TREND, rng.standard_normal(needed) * 15 + 1, 0.0)
+
+        # Strong move after consolidation
+        is_breakout = regime == BREAKOUT
+        direction = np.where(rng.random(needed) > 0.5, 1, -1)
+        increments[is_breakout] = (50 * direction + rng.standard_normal(needed) * 10)[is_breakout]
+
+        level = start_price + np.concatenate(([0.0], np.cumsum(increments)))
+
+        # Stay in tight range during consolidation
+        close = level.copy()
+        in_consolidation = np.concatenate(([False], regime == CONSOLIDATION))
+        close[in_consolidation] += rng.standard_normal(needed)[in_consolidation[1:]] * 5
+
+        return close
+
+    def path_to_frame(self, paths, path=0):
+        """Build the OHLCV DataFrame of one path from generate_price_paths()"""
+        return pd.DataFrame({
+            'time': paths['time'],
+            'open': paths['open'][path],
+            'high': paths['high'][path],
+            'low': paths['low'][path],
+            'close': paths['close'][path],
+            'tick_volume': paths['tick_volume'][path]
+        })
+
+    def generate_sample_data(self, days=30, interval_minutes=1, seed=42):
         """
         Generate synthetic data for testing when real data unavailable
 
@@ -191,75 +483,10 @@ class DataFetcher:
         """
         print(f"🎲 Generating synthetic data for {days} days...")
 
-        # Calculate number of bars
-        bars_per_day = int(24 * 60 / interval_minutes)
-        total_bars = days * bars_per_day
-
-        # Starting price around NAS100 typical range
-        start_price = 16000
-
-        # Generate base price with clear consolidation/breakout patterns
-        np.random.seed(42)
-
-        # Create price action with consolidation zones
-        prices = [start_price]
-        in_consolidation = False
-        consol_duration = 0
-        consol_price = start_price
-
-        for i in range(1, total_bars):
-            # Decide if we should enter/exit consolidation
-            if not in_consolidation and np.random.rand() < 0.05:  # 5% chance to start consolidation
-                in_consolidation = True
-                consol_duration = np.random.randint(30, 100)  # 30-100 bars
-                consol_price = prices[-1]
-
-            if in_consolidation:
-                # Stay in tight range during consolidation
-                change = np.random.randn() * 5  # Small movement
-                new_price = consol_price + change
-                consol_duration -= 1
-
-                if consol_duration <= 0:
-                    # Breakout!
-                    in_consolidation = False
-                    # Strong move after consolidation
-                    breakout_direction = 1 if np.random.rand() > 0.5 else -1
-                    new_price = consol_price + (50 * breakout_direction) + np.random.randn() * 10
-            else:
-                # Trending / normal movement
-                change = np.random.randn() * 15 + 1  # Slight upward bias
-                new_price = prices[-1] + change
-
-            prices.append(new_price)
-
-        # Generate OHLC data from prices
-        data = []
-        base_time = datetime.now() - timedelta(days=days)
-
-        for i in range(total_bars):
-            close = prices[i]
-
-            # Generate realistic OHLC
-            open_price = prices[i-1] if i > 0 else close
+        paths = self.generate_price_paths(days=days, interval_minutes=interval_minutes,
+                                          n_paths=1, seed=seed)
+        df = self.path_to_frame(paths)
 
-            # High/Low based on intra-bar movement
-            volatility = abs(np.random.randn()) * 10
-            high = max(open_price, close) + volatility
-            low = min(open_price, close) - volatility
-
-            current_time = base_time + timedelta(minutes=i * interval_minutes)
-
-            data.append({
-                'time': current_time,
-                'open': round(open_price, 2),
-                'high': round(high, 2),
-                'low': round(low, 2),
-                'close': round(close, 2),
-                'tick_volume': int(np.random.randint(800, 1200))
-            })
-
-        df = pd.DataFrame(data)
         print(f"✅ Generated {len(df)} bars of synthetic data")
         print(f"   With deliberate consolidation/breakout patterns for testing")
 
@@ -269,6 +496,21 @@ class DataFetcher:
 
         return df
 
+    def generate_monte_carlo_data(self, days=30, n_paths=100, interval_minutes=1, seed=42):
+        """
+        Generate independent synthetic paths for Monte Carlo robustness tests
+
+        Nothing is saved to disk. Use path_to_frame(paths, i) to get the
+        DataFrame of path i for a backtester.
+        """
+        print(f"🎲 Generating {n_paths} synthetic paths of {days} days...")
+
+        paths = self.generate_price_paths(days=days, interval_minutes=interval_minutes,
+                                          n_paths=n_paths, seed=seed)
+
+        print(f"✅ Generated {n_paths} x {len(paths['time'])} bars")
+        return paths
+
 
 def main():
     """Example usage"""
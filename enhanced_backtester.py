@@ -10,11 +10,13 @@ Improvements over basic backtester:
 5. Multi-timeframe Confirmation - Optional higher timeframe filter
 """
 
-import pandas as pd
-import numpy as np
-from datetime import datetime
 import json
 
+from equity_tracker import EquityTracker
+from indicator_cache import IndicatorCache
+from shared_dataset import as_frame
+from trade_log import TradeLog
+
 
 class EnhancedBacktester:
     """Enhanced backtest engine with filters to improve win rate"""
@@ -26,7 +28,7 @@ class EnhancedBacktester:
                  use_trend_filter=True, trend_period=50,
                  use_breakout_strength=True, min_breakout_strength=0.3,
                  use_atr_stops=True, atr_period=14, atr_multiplier=2.0,
-                 volume_multiplier=1.5):
+                 volume_multiplier=1.5, intrabar=None):
         """
         Initialize enhanced backtester
 
@@ -39,6 +41,8 @@ class EnhancedBacktester:
         - atr_period: ATR calculation period
         - atr_multiplier: Multiplier for ATR stops
         - volume_multiplier: Volume must be X times average
+        - intrabar: Optional IntrabarResolver (intrabar.py) deciding whether
+          TP or SL came first on bars that touch both
         """
         # Basic parameters
         self.initial_balance = initial_balance
@@ -59,14 +63,15 @@ class EnhancedBacktester:
         self.atr_period = atr_period
         self.atr_multiplier = atr_multiplier
         self.volume_multiplier = volume_multiplier
+        self.intrabar = intrabar
 
         # Trading state
         self.in_position = False
         self.current_trade = None
 
         # Performance tracking
-        self.trades = []
-        self.equity_curve = []
+        self.trades = TradeLog()
+        self.equity = None  # EquityTracker of the last run
         self.daily_trades_count = {}
         self.rejected_trades = {'trend': 0, 'strength': 0, 'volume': 0}
 
@@ -74,23 +79,13 @@ class EnhancedBacktester:
         """Calculate Simple Moving Average at given index"""
         if idx < period:
             return None
-        return df.iloc[idx-period:idx]['close'].mean()
+        return IndicatorCache.for_frame(df).sma(period)[idx]
 
     def calculate_atr(self, df, period, idx):
         """Calculate Average True Range at given index"""
         if idx < period + 1:
             return None
-
-        recent_data = df.iloc[idx-period:idx]
-
-        high_low = recent_data['high'] - recent_data['low']
-        high_close = abs(recent_data['high'] - recent_data['close'].shift(1))
-        low_close = abs(recent_data['low'] - recent_data['close'].shift(1))
-
-        true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        atr = true_range.mean()
-
-        return atr
+        return IndicatorCache.for_frame(df).atr(period)[idx]
 
     def check_trend(self, df, idx, signal):
         """
@@ -107,7 +102,7 @@ class EnhancedBacktester:
         if fast_ma is None or slow_ma is None:
             return False
 
-        current_price = df.iloc[idx]['close']
+        current_price = IndicatorCache.for_frame(df).close[idx]
 
         # BUY: Price and fast MA should be above slow MA (uptrend)
         if signal == 'BUY':
@@ -150,8 +145,9 @@ class EnhancedBacktester:
         if idx < 20:
             return True
 
-        current_volume = df.iloc[idx]['tick_volume']
-        avg_volume = df.iloc[idx-20:idx]['tick_volume'].mean()
+        indicators = IndicatorCache.for_frame(df)
+        current_volume = indicators.volume[idx]
+        avg_volume = indicators.volume_mean(20)[idx]
 
         return current_volume > (avg_volume * self.volume_multiplier)
 
@@ -160,19 +156,11 @@ class EnhancedBacktester:
         if current_idx < self.consolidation_periods:
             return False, None, None, None
 
-        start_idx = current_idx - self.consolidation_periods
-        recent_data = df.iloc[start_idx:current_idx]
-
-        high_level = recent_data['high'].max()
-        low_level = recent_data['low'].min()
-        box_range = high_level - low_level
-
-        avg_price = recent_data['close'].mean()
-        price_range_ratio = box_range / avg_price
-
-        is_consolidating = price_range_ratio < self.breakout_threshold
+        box_high, box_low, box_range, is_consolidating = IndicatorCache.for_frame(df).consolidation(
+            self.consolidation_periods, self.breakout_threshold)
 
-        return is_consolidating, high_level, low_level, box_range
+        return (is_consolidating[current_idx], box_high[current_idx],
+                box_low[current_idx], box_range[current_idx])
 
     def detect_breakout(self, df, current_idx, high_level, low_level):
         """Detect breakout with enhanced filters"""
@@ -266,8 +254,8 @@ class EnhancedBacktester:
         }
         self.in_position = True
 
-    def check_trade_exit(self, current_bar):
-        """Check if current trade should be closed"""
+    def check_trade_exit(self, current_bar, idx=None):
+        """Check if current trade should be closed (idx: bar index, for self.intrabar)"""
         if not self.in_position or self.current_trade is None:
             return False, None, None
 
@@ -276,17 +264,21 @@ class EnhancedBacktester:
 
         tp = self.current_trade['take_profit']
         sl = self.current_trade['stop_loss']
+        is_buy = self.current_trade['type'] == 'BUY'
 
-        if self.current_trade['type'] == 'BUY':
-            if high >= tp:
-                return True, tp, 'TP'
-            if low <= sl:
-                return True, sl, 'SL'
+        if is_buy:
+            tp_hit, sl_hit = high >= tp, low <= sl
         else:
-            if low <= tp:
-                return True, tp, 'TP'
-            if high >= sl:
-                return True, sl, 'SL'
+            tp_hit, sl_hit = low <= tp, high >= sl
+
+        # Both touched: TP counts first unless lower-timeframe bars say otherwise
+        if tp_hit and sl_hit and self.intrabar is not None and idx is not None:
+            tp_hit = self.intrabar.first_touch(idx, is_buy, tp, sl) != 'SL'
+
+        if tp_hit:
+            return True, tp, 'TP'
+        if sl_hit:
+            return True, sl, 'SL'
 
         return False, None, None
 
@@ -306,22 +298,9 @@ class EnhancedBacktester:
 
         self.balance += profit
 
-        trade_record = {
-            'entry_time': trade['entry_time'],
-            'exit_time': exit_time,
-            'type': trade['type'],
-            'entry_price': trade['entry_price'],
-            'exit_price': exit_price,
-            'take_profit': trade['take_profit'],
-            'stop_loss': trade['stop_loss'],
-            'points': points,
-            'profit': profit,
-            'balance': self.balance,
-            'exit_reason': exit_reason,
-            'win': profit > 0
-        }
-
-        self.trades.append(trade_record)
+        self.trades.add(trade['entry_time'], exit_time, trade['type'], trade['entry_price'],
+                        exit_price, trade['take_profit'], trade['stop_loss'], points, profit,
+                        self.balance, exit_reason)
         self.in_position = False
         self.current_trade = None
 
@@ -336,8 +315,31 @@ class EnhancedBacktester:
         date_str = current_time.strftime('%Y-%m-%d')
         self.daily_trades_count[date_str] = self.daily_trades_count.get(date_str, 0) + 1
 
-    def run_backtest(self, df, start_idx=None, end_idx=None, verbose=True):
-        """Run backtest on historical data"""
+    def warmup_bars(self):
+        """Bars before a signal bar that the indicators look back at"""
+        return max(self.consolidation_periods, self.trend_period, self.atr_period + 1, 20)
+
+    def lookahead_bars(self):
+        """Bars after a signal bar that the filters look ahead at"""
+        return 0
+
+    def carried_indicators(self):
+        """IndicatorCache series that depend on every earlier bar (none here)"""
+        return []
+
+    def run_backtest(self, df, start_idx=None, end_idx=None, verbose=True, resume=False,
+                     close_open_trade=True):
+        """
+        Run backtest on historical data (df may also be a SharedDataset)
+
+        resume=True continues from the balance, trades and open position of
+        the previous call, and close_open_trade=False leaves a trade open at
+        end_idx; streaming_backtest.py uses both to run a file in chunks.
+        """
+        df = as_frame(df)
+        if self.intrabar is not None:
+            self.intrabar.prepare(df)
+
         if verbose:
             print("=" * 70)
             print("🔬 STARTING ENHANCED BACKTEST")
@@ -363,14 +365,15 @@ class EnhancedBacktester:
             print(f"\nBacktesting {total_bars} bars from {df.iloc[start_idx]['time']} to {df.iloc[end_idx-1]['time']}")
             print("-" * 70)
 
-        # Reset state
-        self.balance = self.initial_balance
-        self.in_position = False
-        self.current_trade = None
-        self.trades = []
-        self.equity_curve = []
-        self.daily_trades_count = {}
-        self.rejected_trades = {'trend': 0, 'strength': 0, 'volume': 0}
+        # Reset state (the equity tracker always covers just this call)
+        self.equity = EquityTracker(df['time'].iloc[start_idx:end_idx])
+        if not resume:
+            self.balance = self.initial_balance
+            self.in_position = False
+            self.current_trade = None
+            self.trades = TradeLog()
+            self.daily_trades_count = {}
+            self.rejected_trades = {'trend': 0, 'strength': 0, 'volume': 0}
 
         # Main backtest loop
         for i in range(start_idx, end_idx):
@@ -380,7 +383,7 @@ class EnhancedBacktester:
 
             # Check if we need to close existing trade
             if self.in_position:
-                should_close, exit_price, exit_reason = self.check_trade_exit(current_bar)
+                should_close, exit_price, exit_reason = self.check_trade_exit(current_bar, i)
                 if should_close:
                     self.close_trade(exit_price, current_time, exit_reason)
 
@@ -394,11 +397,7 @@ class EnhancedBacktester:
                               f"Balance: ${self.balance:,.2f}")
 
             # Record equity
-            self.equity_curve.append({
-                'time': current_time,
-                'balance': self.balance,
-                'in_position': self.in_position
-            })
+            self.equity.record(self.balance, self.in_position)
 
             if self.in_position:
                 continue
@@ -423,7 +422,7 @@ class EnhancedBacktester:
                               f"TP: {tp:.2f} | SL: {sl:.2f}")
 
         # Close any remaining trades
-        if self.in_position:
+        if self.in_position and close_open_trade:
             last_bar = df.iloc[end_idx - 1]
             self.close_trade(last_bar['close'], last_bar['time'], 'END_OF_DATA')
 
@@ -434,6 +433,11 @@ class EnhancedBacktester:
 
         return self.get_results()
 
+    @property
+    def equity_curve(self):
+        """Per-bar equity as a list of dicts (built on demand from self.equity)"""
+        return self.equity.to_records() if self.equity is not None else []
+
     def get_results(self):
         """Calculate and return backtest results"""
         if len(self.trades) == 0:
@@ -460,39 +464,31 @@ class EnhancedBacktester:
                 'rejected_by_volume': self.rejected_trades['volume']
             }
 
-        trades_df = pd.DataFrame(self.trades)
-
-        winning_trades = trades_df[trades_df['win'] == True]
-        losing_trades = trades_df[trades_df['win'] == False]
-
-        total_profit = winning_trades['profit'].sum() if len(winning_trades) > 0 else 0
-        total_loss = abs(losing_trades['profit'].sum()) if len(losing_trades) > 0 else 0
-
-        # Calculate drawdown
-        equity_df = pd.DataFrame(self.equity_curve)
-        equity_df['peak'] = equity_df['balance'].cummax()
-        equity_df['drawdown'] = equity_df['peak'] - equity_df['balance']
-        equity_df['drawdown_pct'] = (equity_df['drawdown'] / equity_df['peak']) * 100
+        # Win/loss aggregates are reductions over the trade log's columns
+        summary = self.trades.summary()
+        total_profit = summary['total_profit']
+        total_loss = summary['total_loss']
 
-        max_drawdown = equity_df['drawdown'].max()
-        max_drawdown_pct = equity_df['drawdown_pct'].max()
+        # Drawdown is tracked online while the equity curve is recorded
+        max_drawdown = self.equity.max_drawdown
+        max_drawdown_pct = self.equity.max_drawdown_pct
 
         results = {
             'total_trades': len(self.trades),
-            'winning_trades': len(winning_trades),
-            'losing_trades': len(losing_trades),
-            'win_rate': (len(winning_trades) / len(self.trades) * 100) if len(self.trades) > 0 else 0,
+            'winning_trades': summary['winning_trades'],
+            'losing_trades': summary['losing_trades'],
+            'win_rate': (summary['winning_trades'] / len(self.trades) * 100) if len(self.trades) > 0 else 0,
             'total_profit': total_profit,
             'total_loss': total_loss,
             'net_profit': total_profit - total_loss,
             'return_pct': ((self.balance - self.initial_balance) / self.initial_balance) * 100,
             'max_drawdown': max_drawdown,
             'max_drawdown_pct': max_drawdown_pct,
-            'avg_win': winning_trades['profit'].mean() if len(winning_trades) > 0 else 0,
-            'avg_loss': losing_trades['profit'].mean() if len(losing_trades) > 0 else 0,
+            'avg_win': summary['avg_win'],
+            'avg_loss': summary['avg_loss'],
             'profit_factor': total_profit / total_loss if total_loss > 0 else float('inf'),
-            'largest_win': winning_trades['profit'].max() if len(winning_trades) > 0 else 0,
-            'largest_loss': losing_trades['profit'].min() if len(losing_trades) > 0 else 0,
+            'largest_win': summary['largest_win'],
+            'largest_loss': summary['largest_loss'],
             'final_balance': self.balance,
             'initial_balance': self.initial_balance,
             'rejected_by_trend': self.rejected_trades['trend'],
@@ -563,7 +559,7 @@ class EnhancedBacktester:
     def save_results(self, filename='enhanced_backtest_results.json'):
         """Save backtest results to file"""
         results = self.get_results()
-        results['trades'] = self.trades
+        results['trades'] = self.trades.to_records()
         results['equity_curve'] = self.equity_curve
 
         with open(filename, 'w') as f:
@@ -577,6 +573,6 @@ class EnhancedBacktester:
             print("No trades to export")
             return
 
-        trades_df = pd.DataFrame(self.trades)
+        trades_df = self.trades.to_frame()
         trades_df.to_csv(filename, index=False)
         print(f"💾 Trades exported to: {filename}")
@@ -6,12 +6,14 @@ With backtesting, notifications, and advanced risk management
 import MetaTrader5 as mt5
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import time
 import logging
 from typing import Optional, Tuple
 import json
 
+from rolling_window import LiveBarWindow
+
 # Try importing optional dependencies
 try:
     import requests
@@ -30,6 +32,10 @@ class EnhancedNAS100Bot:
         self.consolidation_periods = config.get('CONSOLIDATION_PERIODS', 20)
         self.breakout_threshold = config.get('BREAKOUT_THRESHOLD', 0.0015)
         
+        # Recent bars, updated incrementally from the broker feed
+        self.market = LiveBarWindow(self.consolidation_periods, volume_periods=20,
+                                    capacity=config.get('BAR_BUFFER_SIZE', 100))
+        
         self.in_position = False
         self.daily_trades = 0
         self.total_trades = 0
@@ -172,8 +178,46 @@ class EnhancedNAS100Bot:
         df['time'] = pd.to_datetime(df['time'], unit='s')
         return df
     
-    def identify_consolidation(self, df):
-        """Identify consolidation zones"""
+    def update_market_data(self):
+        """
+        Bring the live bar window up to date
+        
+        The first call loads the full buffer; later calls only request
+        bars from the last known bar onwards.
+        
+        Returns: True if the window holds data
+        """
+        if self.market.last_time is None:
+            rates = mt5.copy_rates_from_pos(self.symbol, self.timeframe, 0, self.market.capacity + 1)
+        else:
+            date_from = datetime.fromtimestamp(self.market.last_time, tz=timezone.utc)
+            # Bar times are broker server time, so look well past "now"
+            date_to = datetime.now(timezone.utc) + timedelta(days=1)
+            rates = mt5.copy_rates_range(self.symbol, self.timeframe, date_from, date_to)
+        
+        if rates is None:
+            self.logger.error(f"Failed to get rates for {self.symbol}")
+            return self.market.last_time is not None
+        
+        self.market.update(rates)
+        return self.market.last_time is not None
+    
+    def identify_consolidation(self, df=None):
+        """
+        Identify consolidation zones
+        
+        Uses the live bar window when no DataFrame is given.
+        """
+        if df is None:
+            box = self.market.box()
+            if box is None:
+                return False, None, None, None
+            
+            high_level, low_level, avg_close = box
+            box_range = high_level - low_level
+            is_consolidating = box_range / avg_close < self.breakout_threshold
+            return is_consolidating, high_level, low_level, box_range
+        
         if len(df) < self.consolidation_periods:
             return False, None, None, None
         
@@ -190,11 +234,23 @@ class EnhancedNAS100Bot:
         return is_consolidating, high_level, low_level, box_range
     
     def detect_breakout(self, df, high_level, low_level):
-        """Detect breakout from consolidation"""
-        current_price = df['close'].iloc[-1]
-        previous_price = df['close'].iloc[-2]
-        current_volume = df['tick_volume'].iloc[-1]
-        avg_volume = df['tick_volume'].tail(20).mean()
+        """
+        Detect breakout from consolidation
+        
+        Pass df=None to use the live bar window.
+        """
+        if df is None:
+            current_price = self.market.close(-1)
+            previous_price = self.market.close(-2)
+            current_volume = self.market.forming['tick_volume']
+            avg_volume = self.market.average_volume()
+            if previous_price is None:
+                return None
+        else:
+            current_price = df['close'].iloc[-1]
+            previous_price = df['close'].iloc[-2]
+            current_volume = df['tick_volume'].iloc[-1]
+            avg_volume = df['tick_volume'].tail(20).mean()
         
         # Volume confirmation (optional but recommended)
         volume_confirmed = current_volume > avg_volume * 1.2
@@ -363,23 +419,21 @@ class EnhancedNAS100Bot:
                     time.sleep(self.config.get('CHECK_INTERVAL', 10))
                     continue
                 
-                # Get market data
-                df = self.get_market_data(bars=100)
-                if df is None:
+                # Get new bars since the last check
+                if not self.update_market_data():
                     time.sleep(5)
                     continue
                 
                 # Analyze market
-                is_consolidating, high_level, low_level, box_range = self.identify_consolidation(df)
+                is_consolidating, high_level, low_level, box_range = self.identify_consolidation()
                 
-                current_price = df['close'].iloc[-1]
-                current_time = df['time'].iloc[-1]
+                current_price = self.market.close(-1)
                 
                 if iteration % 6 == 0:  # Log every minute (if checking every 10 sec)
                     self.logger.info(f"Price: {current_price:.2f} | Consolidating: {is_consolidating}")
                 
                 if is_consolidating:
-                    signal = self.detect_breakout(df, high_level, low_level)
+                    signal = self.detect_breakout(None, high_level, low_level)
                     
                     if signal:
                         self.logger.info(f"🔥 BREAKOUT DETECTED: {signal}")
@@ -0,0 +1,109 @@
+"""
+Equity Tracking for NAS100 Backtesters
+Per-bar balance in preallocated arrays with online drawdown statistics
+
+Peak balance and maximum drawdown are updated as bars are recorded, so
+get_results never has to build a DataFrame of the whole curve. The curve
+is only turned into a list of dicts when it is saved.
+"""
+
+import numpy as np
+
+
+class EquityTracker:
+    """Preallocated per-bar equity curve with running peak and max drawdown"""
+
+    def __init__(self, times):
+        """
+        Initialize tracker
+
+        Parameters:
+        - times: Series of bar times for the backtest range (one slot per bar)
+        """
+        self.times = times
+        self.capacity = len(times)
+
+        self.balance = np.empty(self.capacity, dtype=np.float64)
+        self.in_position = np.zeros(self.capacity, dtype=bool)
+        self.length = 0
+
+        self.peak = None
+        self.max_drawdown = 0.0
+        self.max_drawdown_pct = 0.0
+
+    def __len__(self):
+        return self.length
+
+    def record(self, balance, in_position=False, count=1):
+        """
+        Record the balance for the next count bars
+
+        Parameters:
+        - balance: Balance after any exit on these bars
+        - in_position: Whether a trade is open on these bars
+        - count: Number of consecutive bars with this balance
+        """
+        if count <= 0:
+            return
+
+        start = self.length
+        self.balance[start:start + count] = balance
+        if in_position:
+            self.in_position[start:start + count] = True
+        self.length += count
+
+        # Same arithmetic as cummax/drawdown on the full curve
+        if self.peak is None or balance > self.peak:
+            self.peak = balance
+        drawdown = self.peak - balance
+        drawdown_pct = (drawdown / self.peak) * 100
+
+        if drawdown > self.max_drawdown:
+            self.max_drawdown = drawdown
+        if drawdown_pct > self.max_drawdown_pct:
+            self.max_drawdown_pct = drawdown_pct
+
+    def extend(self, balances, in_position=None):
+        """
+        Record one balance per bar for a run of bars
+
+        Parameters:
+        - balances: Balance per bar
+        - in_position: Optional open-trade flag per bar
+        """
+        balances = np.asarray(balances, dtype=np.float64)
+        count = len(balances)
+        if count == 0:
+            return
+
+        start = self.length
+        self.balance[start:start + count] = balances
+        if in_position is not None:
+            self.in_position[start:start + count] = in_position
+        self.length += count
+
+        peaks = np.maximum.accumulate(balances)
+        if self.peak is not None:
+            peaks = np.maximum(peaks, self.peak)
+        drawdown = peaks - balances
+        drawdown_pct = (drawdown / peaks) * 100
+
+        self.peak = float(peaks[-1])
+        self.max_drawdown = max(self.max_drawdown, float(drawdown.max()))
+        self.max_drawdown_pct = max(self.max_drawdown_pct, float(drawdown_pct.max()))
+
+    def mark_in_position(self, start, stop):
+        """Flag bars [start, stop) of the range as having an open trade"""
+        self.in_position[start:stop] = True
+
+    def to_records(self):
+        """
+        Materialize the recorded curve
+
+        Returns: List of {'time', 'balance', 'in_position'} dicts, one per bar
+        """
+        n = self.length
+        return [
+            {'time': t, 'balance': b, 'in_position': p}
+            for t, b, p in zip(self.times.iloc[:n], self.balance[:n].tolist(), self.in_position[:n].tolist())
+        ]
@@ -0,0 +1,345 @@
+"""
+Indicator Cache for NAS100 Backtesters
+Computes each indicator series once per dataset and serves O(1) lookups by bar index
+
+The values reproduce the per-bar window calculations of EnhancedBacktester
+and UltraBacktester exactly: the value stored at index idx is computed from
+bars [idx - period, idx), never from the bar at idx itself. The one
+exception is forward_close_range(), the look-ahead used by UltraBacktester's
+false breakout filter.
+"""
+
+import copy
+import weakref
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from indicators import ATR, RSI, SMA
+from rolling_window import consolidation_box, consolidation_masks, rolling_max, rolling_min
+from shared_dataset import as_frame
+
+
+# Rows per block when reducing sliding windows (bounds temporary memory)
+WINDOW_CHUNK_ROWS = 65536
+
+# Series that depend on every earlier bar: name -> (indicator class, input columns)
+STATEFUL_SERIES = {
+    'wilder_rsi': (RSI, ('close',)),
+    'wilder_atr': (ATR, ('high', 'low', 'close'))
+}
+
+
+def window_mean(values, period, first_column=None):
+    """
+    Mean of every trailing window of `period` values
+
+    Parameters:
+    - values: 1-D float64 array
+    - period: Window length
+    - first_column: Optional replacement for the first value of each window
+      (window j gets first_column[j] instead of values[j])
+
+    Returns:
+    - Array of length len(values); index idx holds the mean of
+      values[idx - period:idx], NaN where fewer than `period` bars exist
+    """
+    n = len(values)
+    result = np.full(n, np.nan)
+
+    if period <= 0 or n <= period:
+        return result
+
+    windows = sliding_window_view(values, period)[:-1]
+
+    for start in range(0, len(windows), WINDOW_CHUNK_ROWS):
+        stop = min(start + WINDOW_CHUNK_ROWS, len(windows))
+        block = windows[start:stop]
+
+        if first_column is not None:
+            block = block.copy()
+            block[:, 0] = first_column[start:stop]
+
+        result[period + start:period + stop] = block.mean(axis=1)
+
+    return result
+
+
+def previous_bar(values):
+    """Shift a per-bar series one bar later, so index idx holds the value after bar idx - 1"""
+    shifted = np.full(len(values), np.nan)
+    shifted[1:] = values[:-1]
+    return shifted
+
+
+class IndicatorCache:
+    """Precomputed indicator arrays for one OHLCV dataset"""
+
+    # id(df) -> (weak reference to df, cache)
+    _registry = {}
+
+    @classmethod
+    def for_frame(cls, df):
+        """
+        Get the shared cache for a DataFrame, creating it on first use
+
+        Backtests that run on the same frame object reuse the same cache,
+        whatever their strategy parameters are. A SharedDataset shares the
+        cache of its frame().
+        """
+        df = as_frame(df)
+        key = id(df)
+        entry = cls._registry.get(key)
+
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+
+        cache = cls(df)
+        cls._registry[key] = (weakref.ref(df, lambda _, key=key: cls._registry.pop(key, None)), cache)
+        return cache
+
+    @classmethod
+    def clear(cls):
+        """Drop all cached datasets (e.g. after mutating a frame in place)"""
+        cls._registry.clear()
+
+    def __init__(self, df):
+        """
+        Initialize cache
+
+        Parameters:
+        - df: DataFrame with OHLCV data
+        """
+        self.high = np.ascontiguousarray(df['high'].to_numpy(dtype=np.float64))
+        self.low = np.ascontiguousarray(df['low'].to_numpy(dtype=np.float64))
+        self.close = np.ascontiguousarray(df['close'].to_numpy(dtype=np.float64))
+        self.volume = np.ascontiguousarray(df['tick_volume'].to_numpy(dtype=np.float64))
+
+        # (indicator, period[, ...]) -> float64 array (or tuple of arrays)
+        self._series = {}
+
+        # (name, period) -> STATEFUL_SERIES indicator as of the bar before
+        # this frame, when the frame continues an earlier one (continue_from)
+        self.history = {}
+
+    def __len__(self):
+        return len(self.close)
+
+    def _get(self, key, compute):
+        """Return a cached series, computing it on first request"""
+        series = self._series.get(key)
+        if series is None:
+            series = compute()
+            self._series[key] = series
+        return series
+
+    def sma(self, period):
+        """Simple moving average of close over the previous `period` bars (indicators.SMA)"""
+        return self._get(('sma', period), lambda: previous_bar(SMA.compute(period, self.close)))
+
+    def volume_mean(self, period):
+        """Average tick volume over the previous `period` bars"""
+        return self._get(('volume_mean', period), lambda: window_mean(self.volume, period))
+
+    def true_range(self):
+        """True range per bar (high - low on the first bar)"""
+        def compute():
+            high_low = self.high - self.low
+            true_range = high_low.copy()
+            previous_close = self.close[:-1]
+            high_close = np.abs(self.high[1:] - previous_close)
+            low_close = np.abs(self.low[1:] - previous_close)
+            true_range[1:] = np.maximum(np.maximum(high_low[1:], high_close), low_close)
+            return true_range
+
+        return self._get(('true_range', None), compute)
+
+    def atr(self, period):
+        """
+        Average True Range over the previous `period` bars
+
+        The first bar of each window has no previous close inside the
+        window, so its true range is just high - low.
+        """
+        def compute():
+            atr = window_mean(self.true_range(), period, first_column=self.high - self.low)
+            atr[:period + 1] = np.nan
+            return atr
+
+        return self._get(('atr', period), compute)
+
+    def rsi(self, period):
+        """
+        RSI over the previous `period` bars using simple average gain/loss
+
+        Returns 100 where the window has no losses.
+        """
+        def compute():
+            deltas = np.zeros(len(self.close))
+            deltas[1:] = np.diff(self.close)
+
+            gains = np.where(deltas > 0, deltas, 0.0)
+            losses = np.where(deltas < 0, -deltas, 0.0)
+
+            # The first delta of each window falls outside it
+            zeros = np.zeros(len(self.close))
+            avg_gain = window_mean(gains, period, first_column=zeros)
+            avg_loss = window_mean(losses, period, first_column=zeros)
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rs = avg_gain / avg_loss
+                rsi = 100 - (100 / (1 + rs))
+
+            rsi[avg_loss == 0] = 100
+            rsi[:period + 1] = np.nan
+            return rsi
+
+        return self._get(('rsi', period), compute)
+
+    def _start_state(self, key):
+        """Copy of the indicator a stateful series continues from (fresh without history)"""
+        indicator = self.history.get(key)
+        if indicator is None:
+            return STATEFUL_SERIES[key[0]][0](key[1])
+        return copy.deepcopy(indicator)
+
+    def _stateful(self, key):
+        """A STATEFUL_SERIES series up to the previous bar, continuing self.history"""
+        def compute():
+            indicator = self._start_state(key)
+            before = indicator.value
+            columns = [getattr(self, name) for name in STATEFUL_SERIES[key[0]][1]]
+            shifted = previous_bar(indicator.extend(*columns))
+            if before is not None:
+                shifted[0] = before
+            return shifted
+
+        return self._get(key, compute)
+
+    def wilder_rsi(self, period):
+        """RSI with Wilder smoothing (indicators.RSI) up to the previous bar"""
+        return self._stateful(('wilder_rsi', period))
+
+    def wilder_atr(self, period):
+        """ATR with Wilder smoothing (indicators.ATR) up to the previous bar"""
+        return self._stateful(('wilder_atr', period))
+
+    def carry_state(self, stop, keys=()):
+        """
+        Stateful indicators advanced through bars [0, stop) of this frame
+
+        For a backtest that reads its data in chunks: pass the result to
+        continue_from() on the frame of the next chunk, whose first bar is
+        bar `stop` of this one.
+
+        Parameters:
+        - stop: First bar of the next frame, as an index into this one
+        - keys: STATEFUL_SERIES keys (name, period) to carry besides the ones
+          this frame continued or computed
+
+        Returns:
+        - Dict of (name, period) -> indicator
+        """
+        keys = set(keys) | set(self.history) | {key for key in self._series if key[0] in STATEFUL_SERIES}
+
+        carried = {}
+        for key in keys:
+            indicator = self._start_state(key)
+            indicator.extend(*(getattr(self, name)[:stop] for name in STATEFUL_SERIES[key[0]][1]))
+            carried[key] = indicator
+
+        return carried
+
+    def continue_from(self, history):
+        """Continue the stateful series from an earlier frame's carry_state()"""
+        self.history = dict(history)
+        for key in self.history:
+            self._series.pop(key, None)
+
+    def forward_close_range(self, bars):
+        """
+        Lowest and highest close of the next `bars` bars for every bar
+
+        Index idx covers bars (idx, idx + bars]: the trailing window of bar
+        idx + bars + 1 (one past the end for the last full window). NaN where
+        fewer than `bars` bars follow.
+
+        Returns: (lowest_close, highest_close) arrays
+        """
+        def compute():
+            n = len(self.close)
+            lowest = np.full(n, np.nan)
+            highest = np.full(n, np.nan)
+
+            if bars > 0 and n > bars:
+                # Trailing windows never include their own bar, so the
+                # appended placeholder bar is never part of a window
+                padded = np.append(self.close, self.close[-1])
+                lowest[:n - bars] = rolling_min(padded, bars)[bars + 1:]
+                highest[:n - bars] = rolling_max(padded, bars)[bars + 1:]
+
+            return lowest, highest
+
+        return self._get(('forward_close_range', bars), compute)
+
+    def box_touches(self, period):
+        """
+        Touches of the consolidation box edges for every bar
+
+        Over the box of bars [idx - period, idx), counts the highs within 10%
+        of the box range of its high plus the lows within 10% of its low.
+        The box edges do not depend on the consolidation threshold, so one
+        array serves every threshold and min_touches setting.
+        """
+        def compute():
+            n = len(self.close)
+            touches = np.zeros(n, dtype=np.int64)
+
+            if period <= 0 or n <= period:
+                return touches
+
+            box_high = rolling_max(self.high, period)
+            box_low = rolling_min(self.low, period)
+            touch_threshold = (box_high - box_low) * 0.1
+
+            highs = sliding_window_view(self.high, period)[:-1]
+            lows = sliding_window_view(self.low, period)[:-1]
+
+            for start in range(0, len(highs), WINDOW_CHUNK_ROWS):
+                stop = min(start + WINDOW_CHUNK_ROWS, len(highs))
+                bars = slice(period + start, period + stop)
+                threshold = touch_threshold[bars, np.newaxis]
+
+                upper = np.abs(highs[start:stop] - box_high[bars, np.newaxis]) < threshold
+                lower = np.abs(lows[start:stop] - box_low[bars, np.newaxis]) < threshold
+                touches[bars] = upper.sum(axis=1) + lower.sum(axis=1)
+
+            return touches
+
+        return self._get(('box_touches', period), compute)
+
+    def consolidation(self, period, threshold):
+        """
+        Consolidation box of the previous `period` bars for every bar
+
+        Returns: (box_high, box_low, box_range, is_consolidating) arrays
+        """
+        return self._get(('consolidation', period, threshold),
+                         lambda: consolidation_box(self.high, self.low, self.close, period, threshold))
+
+    def prepare_consolidation(self, period, thresholds):
+        """
+        Fill the consolidation cache for one window and many thresholds
+
+        The rolling high/low/mean of the window are computed once and all
+        thresholds are evaluated together as a 2-D mask.
+        """
+        missing = [t for t in dict.fromkeys(thresholds) if ('consolidation', period, t) not in self._series]
+        if not missing:
+            return
+
+        box_high, box_low, box_range, masks = consolidation_masks(
+            self.high, self.low, self.close, period, missing)
+
+        for threshold, mask in zip(missing, masks):
+            self._series[('consolidation', period, threshold)] = (box_high, box_low, box_range, mask)
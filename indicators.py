@@ -0,0 +1,347 @@
+"""
+Stateful Indicators for NAS100 Bots and Backtesters
+SMA, EMA and Wilder-smoothed RSI/ATR with one update per bar
+
+Each indicator is an object fed one completed bar at a time with
+update(bar), which returns the value including that bar (None until enough
+bars have been seen), or a whole array of bars at once with extend(), which
+continues from the same state. compute() is extend() on a fresh indicator,
+the path the backtesters use. Every path does the same float operations in
+the same order, so they agree bit for bit:
+- gains, losses, true ranges, the RSI formula and the SMA's running sum
+  are NumPy array operations in extend()/compute(), the same IEEE
+  operations update() does on floats (np.cumsum adds strictly in order)
+- the EMA and Wilder recursions stay a scalar loop, because each value
+  depends on the previous one and only the same sequence of float
+  operations reproduces the per-bar values exactly
+
+The SMA keeps a running sum of its window (O(1) per bar), re-summed exactly
+with math.fsum every max(period, RESUM_BARS) bars so rounding error cannot
+build up.
+
+RSI and ATR use Wilder's smoothing, as MT5 and most charting packages do:
+the first value is the mean of the first `period` values, then
+avg = (avg * (period - 1) + value) / period. A smoothed value depends on
+every earlier bar, not just the last `period`, so a series only matches
+another one when both start from the same bar; extend() lets a backtest
+that reads its data in chunks carry the state from one chunk to the next.
+
+    rsi = RSI(14)
+    for bar in new_bars:
+        value = rsi.update(bar)
+
+    rsi_values = RSI.compute(14, df['close'])
+"""
+
+from collections import deque
+import math
+
+import numpy as np
+
+
+# The SMA's running sum is recomputed exactly at least this often (in bars)
+RESUM_BARS = 1000
+
+
+def _check_period(period):
+    """Reject window lengths that cannot produce a value"""
+    if period < 1:
+        raise ValueError(f"period must be at least 1, got {period!r}")
+
+
+def _as_array(values):
+    return np.asarray(values, dtype=np.float64)
+
+
+class WilderAverage:
+    """Wilder's smoothed moving average (seeded with a simple mean)"""
+
+    def __init__(self, period):
+        """
+        Initialize average
+
+        Parameters:
+        - period: Smoothing period
+        """
+        _check_period(period)
+        self.period = period
+        self.value = None
+        self._seed = []
+
+    def push(self, value):
+        """Add the next value and return the average (None while seeding)"""
+        if self.value is None:
+            self._seed.append(value)
+            if len(self._seed) == self.period:
+                self.value = math.fsum(self._seed) / self.period
+                self._seed = None
+            return self.value
+
+        self.value = (self.value * (self.period - 1) + value) / self.period
+        return self.value
+
+    def extend(self, values):
+        """
+        push() every value of an array
+
+        Returns: float64 array of the average after each value, NaN while seeding
+        """
+        values = _as_array(values)
+        averages = np.full(len(values), np.nan)
+        i = 0
+
+        if self.value is None:
+            seed = values[:self.period - len(self._seed)].tolist()
+            self._seed.extend(seed)
+            i = len(seed)
+            if len(self._seed) < self.period:
+                return averages
+
+            self.value = math.fsum(self._seed) / self.period
+            self._seed = None
+            averages[i - 1] = self.value
+
+        # Recursive, so a scalar loop: see the module docstring
+        average = self.value
+        period = self.period
+        for j, value in enumerate(values[i:].tolist(), i):
+            average = (average * (period - 1) + value) / period
+            averages[j] = average
+
+        self.value = average
+        return averages
+
+
+class SMA:
+    """Simple moving average of close"""
+
+    def __init__(self, period):
+        """
+        Initialize SMA
+
+        Parameters:
+        - period: Bars in the average
+        """
+        _check_period(period)
+        self.period = period
+        self.value = None
+        self._window = deque(maxlen=period)
+        self._total = 0.0
+        self._bars = 0
+
+    def update(self, bar):
+        """Add a completed bar and return the SMA (None until `period` bars)"""
+        close = float(bar['close'])
+        oldest = self._window[0] if len(self._window) == self.period else None
+        self._window.append(close)
+        self._bars += 1
+
+        if self._bars < self.period:
+            return None
+
+        if (self._bars - self.period) % max(self.period, RESUM_BARS) == 0:
+            self._total = math.fsum(self._window)
+        else:
+            self._total += close - oldest
+
+        self.value = self._total / self.period
+        return self.value
+
+    @classmethod
+    def compute(cls, period, close):
+        """SMA after every bar of a close array (NaN before the first value)"""
+        _check_period(period)
+        close = _as_array(close)
+        values = np.full(len(close), np.nan)
+
+        # Bar i adds close[i] - close[i - period] to the sum of bar i - 1,
+        # except on the bars where update() re-sums the window exactly
+        changes = close[period:] - close[:-period]
+        interval = max(period, RESUM_BARS)
+
+        for start in range(period - 1, len(close), interval):
+            stop = min(start + interval, len(close))
+            total = math.fsum(close[start - period + 1:start + 1].tolist())
+            totals = np.cumsum(np.concatenate(([total], changes[start - period + 1:stop - period])))
+            values[start:stop] = totals / period
+
+        return values
+
+
+class EMA:
+    """Exponential moving average of close, seeded with the SMA of the first `period` bars"""
+
+    def __init__(self, period):
+        """
+        Initialize EMA
+
+        Parameters:
+        - period: EMA period (alpha = 2 / (period + 1))
+        """
+        _check_period(period)
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.value = None
+        self._seed = []
+
+    def update(self, bar):
+        """Add a completed bar and return the EMA (None until `period` bars)"""
+        close = float(bar['close'])
+
+        if self.value is None:
+            self._seed.append(close)
+            if len(self._seed) == self.period:
+                self.value = math.fsum(self._seed) / self.period
+                self._seed = None
+            return self.value
+
+        self.value += self.alpha * (close - self.value)
+        return self.value
+
+    def extend(self, close):
+        """update() with every bar of a close array; returns the EMA after each (NaN before the first)"""
+        close = _as_array(close)
+        values = np.full(len(close), np.nan)
+        i = 0
+
+        if self.value is None:
+            seed = close[:self.period - len(self._seed)].tolist()
+            self._seed.extend(seed)
+            i = len(seed)
+            if len(self._seed) < self.period:
+                return values
+
+            self.value = math.fsum(self._seed) / self.period
+            self._seed = None
+            values[i - 1] = self.value
+
+        # Recursive, so a scalar loop: see the module docstring
+        value = self.value
+        alpha = self.alpha
+        for j, price in enumerate(close[i:].tolist(), i):
+            value += alpha * (price - value)
+            values[j] = value
+
+        self.value = value
+        return values
+
+    @classmethod
+    def compute(cls, period, close):
+        """EMA after every bar of a close array (NaN before the first value)"""
+        return cls(period).extend(close)
+
+
+class RSI:
+    """Relative Strength Index with Wilder smoothing"""
+
+    def __init__(self, period=14):
+        """
+        Initialize RSI
+
+        Parameters:
+        - period: RSI period
+        """
+        self.period = period
+        self.value = None
+        self._gain = WilderAverage(period)
+        self._loss = WilderAverage(period)
+        self._previous_close = None
+
+    def update(self, bar):
+        """Add a completed bar and return the RSI (None until `period` + 1 bars)"""
+        close = float(bar['close'])
+        previous_close, self._previous_close = self._previous_close, close
+        if previous_close is None:
+            return None
+
+        delta = close - previous_close
+        gain = self._gain.push(delta if delta > 0 else 0.0)
+        loss = self._loss.push(-delta if delta < 0 else 0.0)
+
+        if loss is None:
+            return None
+
+        # No losses in the smoothed window counts as fully overbought
+        self.value = 100.0 if loss == 0 else 100.0 - 100.0 / (1.0 + gain / loss)
+        return self.value
+
+    def extend(self, close):
+        """update() with every bar of a close array; returns the RSI after each (NaN before the first)"""
+        close = _as_array(close)
+        values = np.full(len(close), np.nan)
+        if len(close) == 0:
+            return values
+
+        # The first bar of all has no previous close, so no change
+        first = 1 if self._previous_close is None else 0
+        previous = close[:-1] if first else np.concatenate(([self._previous_close], close[:-1]))
+        self._previous_close = float(close[-1])
+
+        delta = close[first:] - previous
+        avg_gain = self._gain.extend(np.where(delta > 0, delta, 0.0))
+        avg_loss = self._loss.extend(np.where(delta < 0, -delta, 0.0))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values[first:] = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+
+        if not np.isnan(values[-1]):
+            self.value = float(values[-1])
+        return values
+
+    @classmethod
+    def compute(cls, period, close):
+        """RSI after every bar of a close array (NaN before the first value)"""
+        return cls(period).extend(close)
+
+
+class ATR:
+    """Average True Range with Wilder smoothing"""
+
+    def __init__(self, period=14):
+        """
+        Initialize ATR
+
+        Parameters:
+        - period: ATR period
+        """
+        self.period = period
+        self.value = None
+        self._true_range = WilderAverage(period)
+        self._previous_close = None
+
+    def update(self, bar):
+        """Add a completed bar and return the ATR (None until `period` + 1 bars)"""
+        high, low, close = float(bar['high']), float(bar['low']), float(bar['close'])
+        previous_close, self._previous_close = self._previous_close, close
+
+        # The first bar has no previous close, so it has no true range
+        if previous_close is None:
+            return None
+
+        true_range = max(high - low, abs(high - previous_close), abs(low - previous_close))
+        self.value = self._true_range.push(true_range)
+        return self.value
+
+    def extend(self, high, low, close):
+        """update() with every bar of high/low/close arrays; returns the ATR after each (NaN before the first)"""
+        high, low, close = _as_array(high), _as_array(low), _as_array(close)
+        values = np.full(len(close), np.nan)
+        if len(close) == 0:
+            return values
+
+        first = 1 if self._previous_close is None else 0
+        previous = close[:-1] if first else np.concatenate(([self._previous_close], close[:-1]))
+        self._previous_close = float(close[-1])
+
+        high, low = high[first:], low[first:]
+        true_range = np.maximum(high - low, np.maximum(np.abs(high - previous), np.abs(low - previous)))
+        values[first:] = self._true_range.extend(true_range)
+
+        if self._true_range.value is not None:
+            self.value = self._true_range.value
+        return values
+
+    @classmethod
+    def compute(cls, period, high, low, close):
+        """ATR after every bar of high/low/close arrays (NaN before the first value)"""
+        return cls(period).extend(high, low, close)
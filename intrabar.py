@@ -0,0 +1,113 @@
+"""
+Intrabar Exit Resolution for NAS100 Backtesters
+Decides whether TP or SL was hit first on bars that touch both
+
+A bar's high/low says that both levels were reached, not in which order;
+the engines assume TP. Given lower-timeframe bars of the same instrument
+(e.g. M1 inside M15), IntrabarResolver looks at the lower bars inside that
+one bar and finds the first to touch either level. A per-bar offset index
+into the lower bars is built once per dataset, so resolving a bar only
+scans its own few lower bars, and only ambiguous bars are resolved.
+
+    resolver = IntrabarResolver(m1_df)
+    backtester = EnhancedBacktester(intrabar=resolver)
+    backtester.run_backtest(m15_df)
+"""
+
+import numpy as np
+import pandas as pd
+
+from result_cache import dataset_fingerprint
+from shared_dataset import as_frame
+
+
+def _time_ns(times):
+    """Bar times as int64 nanoseconds (UTC for timezone-aware times)"""
+    return pd.DatetimeIndex(times).as_unit('ns').asi8
+
+
+class IntrabarResolver:
+    """First-touch lookup of TP vs SL in lower-timeframe bars"""
+
+    def __init__(self, lower_df):
+        """
+        Initialize resolver
+
+        Parameters:
+        - lower_df: Lower-timeframe DataFrame (or SharedDataset) with
+          'time', 'high' and 'low' columns covering the backtest period
+        """
+        lower_df = as_frame(lower_df)
+        self.lower_df = lower_df
+        self.lower_times = _time_ns(lower_df['time'])
+        self.high = lower_df['high'].to_numpy(dtype=np.float64)
+        self.low = lower_df['low'].to_numpy(dtype=np.float64)
+
+        # Per-bar [start, end) offsets into the lower bars, set by prepare()
+        self.starts = None
+        self.ends = None
+
+        # Counts over every backtest that used this resolver
+        self.stats = {'ambiguous': 0, 'tp_first': 0, 'sl_first': 0, 'unresolved': 0}
+        self._fingerprint = None
+
+    def __repr__(self):
+        # Stable across runs, so result cache keys stay valid
+        if self._fingerprint is None:
+            self._fingerprint = dataset_fingerprint(self.lower_df)
+        return f"IntrabarResolver({self._fingerprint})"
+
+    def prepare(self, df):
+        """
+        Build the offset index for the bars of a backtest DataFrame
+
+        Lower bar j belongs to bar i if times[i] <= time[j] < times[i + 1];
+        the last bar (and a bar before a gap) spans the typical bar length.
+        """
+        times = _time_ns(df['time'])
+        self.starts = np.searchsorted(self.lower_times, times, side='left')
+
+        if len(times) > 1:
+            bar_length = int(np.median(np.diff(times)))
+            self.ends = np.searchsorted(self.lower_times, times + bar_length, side='left')
+            self.ends[:-1] = np.minimum(self.ends[:-1], self.starts[1:])
+        else:
+            self.ends = np.full(len(times), len(self.lower_times))
+
+    def first_touch(self, idx, is_buy, take_profit, stop_loss):
+        """
+        Which level bar idx reached first
+
+        Parameters:
+        - idx: Bar index in the DataFrame passed to prepare()
+        - is_buy: Direction of the trade
+        - take_profit, stop_loss: Exit levels
+
+        Returns:
+        - 'TP', 'SL', or None if the lower bars cannot tell (no lower bars,
+          or the first touching lower bar reaches both levels too)
+        """
+        self.stats['ambiguous'] += 1
+
+        start, end = self.starts[idx], self.ends[idx]
+        high = self.high[start:end]
+        low = self.low[start:end]
+
+        if is_buy:
+            tp_hit = high >= take_profit
+            sl_hit = low <= stop_loss
+        else:
+            tp_hit = low <= take_profit
+            sl_hit = high >= stop_loss
+
+        touched = np.flatnonzero(tp_hit | sl_hit)
+        if len(touched) == 0 or (tp_hit[touched[0]] and sl_hit[touched[0]]):
+            self.stats['unresolved'] += 1
+            return None
+
+        if tp_hit[touched[0]]:
+            self.stats['tp_first'] += 1
+            return 'TP'
+
+        self.stats['sl_first'] += 1
+        return 'SL'
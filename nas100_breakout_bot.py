@@ -7,9 +7,11 @@ Strategy: Identify consolidation zones, trade breakouts with defined TP/SL level
 import MetaTrader5 as mt5
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import time
 
+from rolling_window import LiveBarWindow
+
 class NAS100BreakoutBot:
     def __init__(self, symbol="NAS100", timeframe=mt5.TIMEFRAME_M1, 
                  lot_size=0.01, risk_reward_ratio=2.0):
@@ -30,6 +32,9 @@ class NAS100BreakoutBot:
         self.breakout_threshold = 0.0015  # 0.15% breakout threshold
         self.in_position = False
         
+        # Recent bars with O(1) box high/low and close average per update
+        self.market = LiveBarWindow(self.consolidation_periods, capacity=100)
+        
     def initialize_mt5(self):
         """Initialize MT5 connection"""
         if not mt5.initialize():
@@ -49,11 +54,46 @@ class NAS100BreakoutBot:
         df['time'] = pd.to_datetime(df['time'], unit='s')
         return df
     
-    def identify_consolidation(self, df):
+    def update_market_data(self):
+        """
+        Bring the live bar window up to date
+        
+        The first call loads the full buffer; later calls only request
+        bars from the last known bar onwards.
+        
+        Returns: True if the window holds data
+        """
+        if self.market.last_time is None:
+            rates = mt5.copy_rates_from_pos(self.symbol, self.timeframe, 0, self.market.capacity + 1)
+        else:
+            date_from = datetime.fromtimestamp(self.market.last_time, tz=timezone.utc)
+            # Bar times are broker server time, so look well past "now"
+            date_to = datetime.now(timezone.utc) + timedelta(days=1)
+            rates = mt5.copy_rates_range(self.symbol, self.timeframe, date_from, date_to)
+        
+        if rates is None:
+            print(f"Failed to get rates for {self.symbol}")
+            return self.market.last_time is not None
+        
+        self.market.update(rates)
+        return self.market.last_time is not None
+    
+    def identify_consolidation(self, df=None):
         """
         Identify consolidation zones (similar to the boxes in the screenshots)
+        Uses the live bar window when no DataFrame is given.
         Returns: (is_consolidating, high_level, low_level, box_range)
         """
+        if df is None:
+            box = self.market.box()
+            if box is None:
+                return False, None, None, None
+            
+            high_level, low_level, avg_close = box
+            box_range = high_level - low_level
+            is_consolidating = box_range / avg_close < self.breakout_threshold
+            return is_consolidating, high_level, low_level, box_range
+        
         if len(df) < self.consolidation_periods:
             return False, None, None, None
         
@@ -77,10 +117,17 @@ class NAS100BreakoutBot:
     def detect_breakout(self, df, high_level, low_level):
         """
         Detect breakout from consolidation zone
+        Pass df=None to use the live bar window.
         Returns: 'BUY', 'SELL', or None
         """
-        current_price = df['close'].iloc[-1]
-        previous_price = df['close'].iloc[-2]
+        if df is None:
+            current_price = self.market.close(-1)
+            previous_price = self.market.close(-2)
+            if previous_price is None:
+                return None
+        else:
+            current_price = df['close'].iloc[-1]
+            previous_price = df['close'].iloc[-2]
         
         # Bullish breakout (like in image 3 - "TPPPP")
         if previous_price <= high_level and current_price > high_level:
@@ -183,17 +230,16 @@ class NAS100BreakoutBot:
                     time.sleep(10)
                     continue
                 
-                # Get market data
-                df = self.get_market_data(bars=100)
-                if df is None:
+                # Get new bars since the last check
+                if not self.update_market_data():
                     time.sleep(5)
                     continue
                 
                 # Identify consolidation
-                is_consolidating, high_level, low_level, box_range = self.identify_consolidation(df)
+                is_consolidating, high_level, low_level, box_range = self.identify_consolidation()
                 
-                current_price = df['close'].iloc[-1]
-                current_time = df['time'].iloc[-1]
+                current_price = self.market.close(-1)
+                current_time = pd.to_datetime(self.market.last_time, unit='s')
                 
                 print(f"\n📊 {current_time.strftime('%Y-%m-%d %H:%M:%S')}")
                 print(f"Current Price: {current_price:.2f}")
@@ -205,7 +251,7 @@ class NAS100BreakoutBot:
                     print(f"   Range: {box_range:.2f}")
                     
                     # Check for breakout
-                    signal = self.detect_breakout(df, high_level, low_level)
+                    signal = self.detect_breakout(None, high_level, low_level)
                     
                     if signal:
                         print(f"\n🔥 BREAKOUT DETECTED: {signal}")
@@ -0,0 +1,298 @@
+"""
+Parallel Parameter Sweep for NAS100 Backtesters
+Fans parameter combinations out over a process pool
+
+The dataset is copied into shared memory once (see shared_dataset.py), or
+reused if a SharedDataset is passed in; every worker attaches to it when it
+starts and keeps one DataFrame for all of its tasks, so only the parameter
+dicts and result dicts travel between processes.
+"""
+
+import itertools
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from result_cache import dataset_fingerprint
+from shared_dataset import SharedDataset
+
+
+# Set in each worker process by _init_worker()
+_worker_data = None
+_worker_df = None
+
+
+def expand_grid(param_grid):
+    """
+    Expand a parameter grid into a list of parameter dicts
+
+    Parameters:
+    - param_grid: Dict of parameter name -> list of values, or a list of
+      parameter dicts (returned unchanged)
+
+    Returns:
+    - List of dicts in itertools.product order (last parameter varies fastest)
+    """
+    if isinstance(param_grid, dict):
+        names = list(param_grid.keys())
+        return [dict(zip(names, values)) for values in itertools.product(*param_grid.values())]
+    return [dict(params) for params in param_grid]
+
+
+def _init_worker(spec):
+    """Process pool initializer: attach to the shared dataset once"""
+    global _worker_data, _worker_df
+    _worker_data = SharedDataset.attach(spec)
+    _worker_df = _worker_data.frame()
+
+
+def run_quiet(backtester, df, run_kwargs=None):
+    """
+    Run an existing engine without console output
+
+    Returns: get_results() dictionary of the engine
+    """
+    return backtester.run_backtest(df, verbose=False, **(run_kwargs or {}))
+
+
+def run_single(engine_cls, df, params, run_kwargs=None, with_trades=False):
+    """
+    Run one backtest without console output
+
+    Returns: get_results() dictionary of the engine, or (results, trades)
+    if with_trades is True
+    """
+    backtester = engine_cls(**params)
+    results = run_quiet(backtester, df, run_kwargs)
+    return (results, backtester.trades) if with_trades else results
+
+
+def _run_task(engine_cls, params, run_kwargs, with_trades):
+    """Worker task: run one parameter set against the shared dataset"""
+    return run_single(engine_cls, _worker_df, params, run_kwargs, with_trades)
+
+
+class BacktestPool:
+    """
+    Process pool for backtests on one shared dataset
+
+    Use as a context manager. submit() returns a Future for the
+    get_results() dictionary; with one worker backtests run in-process
+    when submitted.
+    """
+
+    def __init__(self, engine_cls, df, workers=None):
+        """
+        Initialize pool
+
+        Parameters:
+        - engine_cls: Backtester, EnhancedBacktester or UltraBacktester
+        - df: DataFrame with OHLCV data, or a SharedDataset (reused as is)
+        - workers: Number of worker processes (default: CPU count, 1 = in-process)
+        """
+        self.engine_cls = engine_cls
+        self.df = df
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.executor = None
+        self.shared = None
+        self.spec = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            if isinstance(self.df, SharedDataset):
+                self.spec = self.df.spec
+            else:
+                self.shared = SharedDataset(self.df)
+                self.spec = self.shared.spec
+            self._start_executor()
+        return self
+
+    def _start_executor(self):
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                            initargs=(self.spec,))
+
+    def restart(self):
+        """Replace a broken pool with fresh workers (tasks in flight are lost)"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self._start_executor()
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=exc_type is not None)
+            self.executor = None
+        if self.shared is not None:
+            self.shared.close()
+            self.shared = None
+
+    def submit(self, params, run_kwargs=None, with_trades=False):
+        """
+        Queue one backtest
+
+        Returns: Future for its results (or (results, trades) if with_trades)
+        """
+        if self.executor is not None:
+            return self.executor.submit(_run_task, self.engine_cls, params, run_kwargs, with_trades)
+
+        future = Future()
+        try:
+            future.set_result(run_single(self.engine_cls, self.df, params, run_kwargs, with_trades))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def run_tasks(engine_cls, df, tasks, workers=None, cache=None):
+    """
+    Run a list of backtests on one dataset, in parallel
+
+    Parameters:
+    - engine_cls: Backtester, EnhancedBacktester or UltraBacktester
+    - df: DataFrame with OHLCV data, or a SharedDataset
+    - tasks: List of (params, run_kwargs) pairs; params are full constructor
+      kwargs, run_kwargs extra run_backtest arguments (or None)
+    - workers: Number of worker processes (default: CPU count, 1 = in-process)
+    - cache: Optional ResultCache; cached tasks are yielded first without
+      running, new ones are stored as they finish
+
+    Yields:
+    - (index, results) as each backtest finishes; index is the position of
+      the task in `tasks`
+    """
+    pending = list(range(len(tasks)))
+
+    if cache is not None:
+        fingerprint = dataset_fingerprint(df)
+        keys = [cache.key(engine_cls, fingerprint, params, run_kwargs) for params, run_kwargs in tasks]
+        pending = []
+
+        for index, key in enumerate(keys):
+            payload = cache.get(key)
+            if payload is None:
+                pending.append(index)
+            else:
+                yield index, payload['results']
+
+    def finished(index, output):
+        """Store a fresh result in the cache and return its results dict"""
+        if cache is None:
+            return output
+        results, trades = output
+        cache.put(keys[index], {'results': results, 'trades': trades})
+        return results
+
+    if not pending:
+        return
+
+    with_trades = cache is not None
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(pending)))
+
+    if workers == 1:
+        for index in pending:
+            params, run_kwargs = tasks[index]
+            yield index, finished(index, run_single(engine_cls, df, params, run_kwargs, with_trades))
+        return
+
+    with BacktestPool(engine_cls, df, workers) as pool:
+        futures = {pool.submit(*tasks[index], with_trades): index for index in pending}
+
+        for future in as_completed(futures):
+            index = futures[future]
+            yield index, finished(index, future.result())
+
+
+def run_sweep(engine_cls, df, param_grid, workers=None, base_params=None, run_kwargs=None,
+              cache=None):
+    """
+    Run a backtest for every parameter combination, in parallel
+
+    Parameters:
+    - engine_cls: Backtester, EnhancedBacktester or UltraBacktester
+    - df: DataFrame with OHLCV data, or a SharedDataset
+    - param_grid: Dict of name -> values, or list of parameter dicts
+    - workers: Number of worker processes (default: CPU count, 1 = in-process)
+    - base_params: Constructor kwargs shared by every combination
+    - run_kwargs: Extra keyword arguments for run_backtest (e.g. start_idx)
+    - cache: Optional ResultCache; cached combinations are yielded first
+      without running, new ones are stored as they finish
+
+    Yields:
+    - (index, params, results) as each backtest finishes; index is the
+      position of the combination in the expanded grid
+    """
+    combos = expand_grid(param_grid)
+    base_params = dict(base_params or {})
+    tasks = [({**base_params, **params}, run_kwargs) for params in combos]
+
+    for index, results in run_tasks(engine_cls, df, tasks, workers=workers, cache=cache):
+        yield index, combos[index], results
+
+
+def successive_halving(engine_cls, df, param_grid, score, workers=None, base_params=None,
+                       min_bars=None, keep_fraction=0.5, min_survivors=10, min_trades=0, cache=None):
+    """
+    Successive-halving search: drop weak combinations on a prefix of the data
+
+    Every combination is first run on the first min_bars bars. The best
+    keep_fraction of them (by score) survive into the next round, which
+    runs on twice as many bars. Rounds never keep fewer than min_survivors
+    combinations: once that few are left, they all run on the full dataset,
+    so the final pick is made among several full-length runs. With
+    keep_fraction=0.25 a 243-combination grid runs 243, 60, 15 and finally
+    10 combinations, about 15% of the bar evaluations of the full grid.
+
+    Parameters:
+    - engine_cls: Backtester, EnhancedBacktester or UltraBacktester
+    - df: DataFrame with OHLCV data, or a SharedDataset
+    - param_grid: Dict of name -> values, or list of parameter dicts
+    - score: Function of a results dict; higher is better
+    - workers: Number of worker processes (default: CPU count, 1 = in-process)
+    - base_params: Constructor kwargs shared by every combination
+    - min_bars: Bars in the first round (default: 1/16 of the dataset)
+    - keep_fraction: Share of combinations kept after each round
+    - min_survivors: Combinations kept for the full-dataset round
+    - min_trades: Trades a combination needs on the full dataset to be ranked
+      by score, scaled down by the share of bars on a prefix; combinations
+      below it rank behind every combination that meets it
+    - cache: Optional ResultCache
+
+    Yields:
+    - (index, params, results, end_idx) as each backtest finishes; end_idx
+      is the prefix length it ran on (None for the full dataset). A
+      combination is yielded once per round it takes part in.
+    """
+    if not 0 < keep_fraction < 1:
+        raise ValueError("keep_fraction must be between 0 and 1")
+
+    combos = expand_grid(param_grid)
+    base_params = dict(base_params or {})
+    full_params = [{**base_params, **params} for params in combos]
+
+    budget = min_bars or max(len(df) // 16, 1)
+    survivors = list(range(len(combos)))
+
+    # A small grid goes straight to the full dataset
+    if len(survivors) <= min_survivors:
+        budget = len(df)
+
+    while survivors:
+        end_idx = budget if budget < len(df) else None
+        tasks = [(full_params[index], {'end_idx': end_idx}) for index in survivors]
+
+        scores = {}
+        floor = min_trades * budget / len(df)
+        for position, results in run_tasks(engine_cls, df, tasks, workers=workers, cache=cache):
+            index = survivors[position]
+            scores[index] = (results['total_trades'] >= floor, score(results))
+            yield index, combos[index], results, end_idx
+
+        if end_idx is None:
+            return
+
+        # Stable sort, so grid order breaks ties like a serial run
+        ranked = sorted(survivors, key=lambda index: scores[index], reverse=True)
+        survivors = sorted(ranked[:max(min_survivors, int(len(ranked) * keep_fraction))])
+
+        # The last few survivors go straight to the full dataset
+        budget = budget * 2 if len(survivors) > min_survivors else len(df)
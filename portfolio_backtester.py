@@ -0,0 +1,304 @@
+"""
+Multi-Symbol Portfolio Backtester
+Runs the breakout strategy on several instruments sharing one account
+
+All symbols advance on one clock (their common bar times). Consolidation
+boxes and breakout signals are computed per symbol with
+Backtester.compute_signals() and stacked into (bars x symbols) matrices, so
+each bar's signals for every symbol are one row lookup. Open positions
+are kept in per-symbol arrays; the account balance, the daily trade limit
+and config.MAX_POSITIONS apply across all symbols. Bars that touch both TP
+and SL can be resolved per symbol from lower-timeframe data (intrabar.py).
+"""
+
+import numpy as np
+import pandas as pd
+
+import config
+from backtest_events import ConsoleReporter
+from backtester import Backtester
+from equity_tracker import EquityTracker
+from shared_dataset import as_frame
+from trade_log import TradeLog
+
+
+def align_frames(frames):
+    """
+    Restrict several OHLCV DataFrames to the bar times they all have
+
+    Parameters:
+    - frames: Dict of symbol -> DataFrame (or SharedDataset)
+
+    Returns:
+    - Dict of symbol -> DataFrame with identical 'time' columns
+    """
+    frames = {symbol: as_frame(df) for symbol, df in frames.items()}
+
+    common = None
+    for df in frames.values():
+        times = pd.Index(df['time'])
+        common = times if common is None else common.intersection(times)
+
+    aligned = {}
+    for symbol, df in frames.items():
+        df = df[df['time'].isin(common)]
+        aligned[symbol] = df.sort_values('time').reset_index(drop=True)
+
+    return aligned
+
+
+class PortfolioBacktester(Backtester):
+    """Backtest the breakout strategy on several symbols with a shared balance"""
+
+    def __init__(self, initial_balance=10000, lot_size=0.01,
+                 risk_reward_ratio=2.0, consolidation_periods=20,
+                 breakout_threshold=0.0015, max_daily_trades=5,
+                 max_positions=config.MAX_POSITIONS, intrabar=None):
+        """
+        Initialize portfolio backtester
+
+        Parameters:
+        - initial_balance: Starting balance shared by all symbols
+        - lot_size: Position size in lots (per position)
+        - risk_reward_ratio: TP is X times the SL
+        - consolidation_periods: Bars to identify consolidation
+        - breakout_threshold: Price range threshold for consolidation
+        - max_daily_trades: Maximum trades per day across all symbols
+        - max_positions: Maximum simultaneous positions across all symbols
+        - intrabar: Optional dict of symbol -> IntrabarResolver (intrabar.py)
+          over that symbol's lower-timeframe bars; symbols left out keep the
+          TP-first assumption on bars that touch both levels
+        """
+        if intrabar is not None and not isinstance(intrabar, dict):
+            raise TypeError("intrabar must be a dict of symbol -> IntrabarResolver")
+
+        super().__init__(initial_balance=initial_balance, lot_size=lot_size,
+                         risk_reward_ratio=risk_reward_ratio,
+                         consolidation_periods=consolidation_periods,
+                         breakout_threshold=breakout_threshold,
+                         max_daily_trades=max_daily_trades)
+        self.max_positions = max_positions
+        self.intrabar = dict(intrabar or {})
+        self.symbols = []
+        self.open_trades = {}
+
+    def _check_position_exit(self, symbol, idx, bar):
+        """Backtester.check_trade_exit for one symbol's open position at bar idx"""
+        self.in_position = True
+        self.current_trade = self.open_trades[symbol]
+
+        # check_trade_exit() consults self.intrabar: swap in this symbol's resolver
+        resolvers = self.intrabar
+        self.intrabar = resolvers.get(symbol)
+        try:
+            return self.check_trade_exit(bar, idx)
+        finally:
+            self.intrabar = resolvers
+
+    def _close_position(self, symbol, exit_price, exit_time, exit_reason):
+        """Close one symbol's position with Backtester's P&L logic"""
+        self.in_position = True
+        self.current_trade = self.open_trades.pop(symbol)
+        self.close_trade(exit_price, exit_time, exit_reason)
+        self.trades.set(-1, 'symbol', symbol)
+
+    def run_backtest(self, frames, start_idx=None, end_idx=None, verbose=True):
+        """
+        Run backtest on several symbols
+
+        Parameters:
+        - frames: Dict of symbol -> DataFrame with OHLCV data; bars are
+          aligned on the times all symbols share (see align_frames)
+        - start_idx: Starting index (default: consolidation_periods)
+        - end_idx: Ending index (default: number of common bars)
+        - verbose: Print a header and every trade (a ConsoleReporter on
+          self.events for this run)
+
+        Returns:
+        - Dictionary with backtest results (see get_results)
+        """
+        frames = align_frames(frames)
+        self.symbols = list(frames)
+        times = next(iter(frames.values()))['time']
+
+        unknown = set(self.intrabar) - set(self.symbols)
+        if unknown:
+            raise ValueError(f"intrabar resolvers for symbols not in frames: {', '.join(sorted(unknown))}")
+
+        # Index the lower bars against the aligned clock the loop uses
+        for symbol, resolver in self.intrabar.items():
+            resolver.prepare(frames[symbol])
+
+        if start_idx is None:
+            start_idx = self.consolidation_periods
+
+        if end_idx is None:
+            end_idx = len(times)
+
+        if verbose:
+            print("=" * 70)
+            print("🔬 STARTING PORTFOLIO BACKTEST")
+            print("=" * 70)
+            print(f"Symbols: {', '.join(self.symbols)}")
+            print(f"Initial Balance: ${self.initial_balance:,.2f}")
+            print(f"Lot Size: {self.lot_size} | Max Positions: {self.max_positions}")
+            print(f"Backtesting {end_idx - start_idx} bars from {times.iat[start_idx]} to {times.iat[end_idx - 1]}")
+            print("-" * 70)
+
+        reporter = self.events.subscribe(ConsoleReporter()) if verbose else None
+        try:
+            self._simulate_portfolio(frames, times, start_idx, end_idx)
+        finally:
+            if reporter is not None:
+                self.events.unsubscribe(reporter)
+
+        if verbose:
+            print("-" * 70)
+            print("✅ BACKTEST COMPLETE")
+            print("=" * 70)
+
+        return self.get_results()
+
+    def _simulate_portfolio(self, frames, times, start_idx, end_idx):
+        """Trade bars [start_idx, end_idx) of the aligned frames (see run_backtest)"""
+        n_symbols = len(self.symbols)
+        events = self.events
+
+        # Reset state
+        self.balance = self.initial_balance
+        self.in_position = False
+        self.current_trade = None
+        self.trades = TradeLog()
+        self.equity = EquityTracker(times.iloc[start_idx:end_idx])
+        self.daily_trades_count = {}
+        self.open_trades = {}
+
+        # (bars x symbols) matrices on the shared clock
+        signals = [self.compute_signals(frames[symbol]) for symbol in self.symbols]
+        signal = np.column_stack([s['signal'] for s in signals])
+        box_range = np.column_stack([s['box_range'] for s in signals])
+        high = np.column_stack([frames[symbol]['high'].to_numpy(dtype=np.float64) for symbol in self.symbols])
+        low = np.column_stack([frames[symbol]['low'].to_numpy(dtype=np.float64) for symbol in self.symbols])
+        close = np.column_stack([frames[symbol]['close'].to_numpy(dtype=np.float64) for symbol in self.symbols])
+
+        # Per-symbol position state
+        is_open = np.zeros(n_symbols, dtype=bool)
+        exit_bar = np.full(n_symbols, end_idx, dtype=np.int64)  # end_idx = still open at the end
+
+        signal_bars = np.flatnonzero((signal[start_idx:end_idx] != 0).any(axis=1)) + start_idx
+
+        # Event loop: jump to the next bar where a position exits or a signal can be taken
+        t = start_idx
+        while True:
+            next_exit = exit_bar[is_open].min() if is_open.any() else end_idx
+            next_signal = end_idx
+            if is_open.sum() < self.max_positions:
+                s = np.searchsorted(signal_bars, t)
+                if s < len(signal_bars):
+                    next_signal = signal_bars[s]
+
+            event = int(min(next_exit, next_signal))
+            if event >= end_idx:
+                break
+
+            # Balance is flat between events
+            self.equity.record(self.balance, is_open.any(), count=event - t)
+            if events.on_bar:
+                self._emit_bars(times, t, event, bool(is_open.any()))
+            current_time = times.iat[event]
+
+            # Exits first, so a freed slot can be reused on the same bar
+            for s in np.flatnonzero(is_open & (exit_bar == event)):
+                symbol = self.symbols[s]
+                bar = {'high': high[event, s], 'low': low[event, s], 'close': close[event, s]}
+                should_close, exit_price, exit_reason = self._check_position_exit(symbol, event, bar)
+                self._close_position(symbol, exit_price, current_time, exit_reason)
+                is_open[s] = False
+
+                if events.on_close:
+                    events.emit('on_close', self, event, self.trades[-1])
+
+            self.equity.record(self.balance, is_open.any())
+            if events.on_bar:
+                self._emit_bars(times, event, event + 1, bool(is_open.any()))
+
+            # Entries: breakouts on symbols without a position, in symbol order
+            slots = self.max_positions - int(is_open.sum())
+            for s in np.flatnonzero((signal[event] != 0) & ~is_open):
+                if slots <= 0 or not self.can_trade_today(current_time):
+                    break
+
+                symbol = self.symbols[s]
+                signal_type = 'BUY' if signal[event, s] > 0 else 'SELL'
+                entry_price = close[event, s]
+                tp, sl = self.calculate_tp_sl(entry_price, signal_type, box_range[event, s])
+
+                self.open_trade(signal_type, entry_price, current_time, tp, sl)
+                self.current_trade['symbol'] = symbol
+                self.open_trades[symbol] = self.current_trade
+                self.increment_daily_trades(current_time)
+
+                found = self.find_exit_bar(high[:, s], low[:, s], event + 1, end_idx)
+                exit_bar[s] = end_idx if found is None else found
+                is_open[s] = True
+                slots -= 1
+
+                if events.on_open:
+                    events.emit('on_open', self, event, self.current_trade, box_range[event, s])
+
+            t = event + 1
+
+        self.equity.record(self.balance, is_open.any(), count=end_idx - t)
+        if events.on_bar:
+            self._emit_bars(times, t, end_idx, bool(is_open.any()))
+
+        # Close any remaining open trades
+        for s in np.flatnonzero(is_open):
+            self._close_position(self.symbols[s], close[end_idx - 1, s], times.iat[end_idx - 1],
+                                 'END_OF_DATA')
+            if events.on_close:
+                events.emit('on_close', self, end_idx - 1, self.trades[-1])
+
+        self.in_position = False
+        self.current_trade = None
+
+    def get_results(self):
+        """Backtester results plus a per-symbol breakdown under 'by_symbol'"""
+        results = super().get_results()
+
+        symbols = self.trades.column('symbol') if len(self.trades) else np.array([], dtype=object)
+        profit = self.trades.column('profit')
+        win = self.trades.column('win')
+
+        by_symbol = {}
+        for symbol in self.symbols:
+            mine = symbols == symbol
+            count = int(mine.sum())
+            by_symbol[symbol] = {
+                'total_trades': count,
+                'win_rate': int(win[mine].sum()) / count * 100 if count else 0,
+                'net_profit': float(profit[mine].sum())
+            }
+
+        results['by_symbol'] = by_symbol
+        return results
+
+    def print_results(self):
+        """Print Backtester results followed by a per-symbol table"""
+        super().print_results()
+
+        results = self.get_results()
+        print("\n📊 BY SYMBOL:")
+        print(f"   {'SYMBOL':<10} {'TRADES':>8} {'WIN RATE':>10} {'NET PROFIT':>14}")
+        for symbol, stats in results['by_symbol'].items():
+            print(f"   {symbol:<10} {stats['total_trades']:>8} {stats['win_rate']:>9.1f}% "
+                  f"${stats['net_profit']:>12,.2f}")
+        print()
+
+    def save_results(self, filename='portfolio_backtest_results.json'):
+        """Save results to JSON file"""
+        super().save_results(filename)
+
+    def export_trades_to_csv(self, filename='portfolio_backtest_trades.csv'):
+        """Export trades to CSV file"""
+        super().export_trades_to_csv(filename)
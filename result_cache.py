@@ -0,0 +1,260 @@
+"""
+On-Disk Result Cache for NAS100 Backtesters
+Skips backtests that were already run on the same data with the same settings
+
+Each entry holds the get_results() payload and the trades of one run. It is
+keyed by a content hash of the time/OHLCV arrays, the engine (including a
+hash of its source and the local modules it uses, so code edits invalidate
+its entries) and
+the full constructor kwargs with defaults filled in. Entries are evicted
+least-recently-used first once the cache grows past its size limit.
+"""
+
+import contextlib
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from shared_dataset import as_frame
+
+
+DEFAULT_CACHE_DIR = '.backtest_cache'
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Bump when the payload layout changes
+RESULT_CACHE_VERSION = 2
+
+FINGERPRINT_COLUMNS = ['open', 'high', 'low', 'close', 'tick_volume']
+
+# Run arguments that only affect console output
+OUTPUT_ONLY_ARGS = {'verbose'}
+
+# Engine attributes restored by cached_backtest() so print_results,
+# save_results and export_trades_to_csv work as after a real run
+RESTORED_STATE = ['balance', 'trades', 'equity', 'daily_trades_count',
+                  'rejected_trades', 'profile_stats', '_active_filter_order']
+
+
+def dataset_fingerprint(df):
+    """
+    Content hash of the time and OHLCV columns of a DataFrame
+
+    Returns: Hex digest string
+    """
+    df = as_frame(df)
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(str(len(df)).encode())
+
+    times = pd.DatetimeIndex(df['time'])
+    if times.tz is not None:
+        times = times.tz_convert('UTC')
+    digest.update(b'time')
+    digest.update(np.ascontiguousarray(times.as_unit('ns').asi8).tobytes())
+
+    for col in FINGERPRINT_COLUMNS:
+        values = np.ascontiguousarray(df[col].to_numpy())
+        digest.update(f'{col}:{values.dtype.str}'.encode())
+        digest.update(values.tobytes())
+
+    return digest.hexdigest()
+
+
+def _local_modules(module, directory, seen):
+    """Modules from `directory` that `module` uses, directly or indirectly"""
+    if module is None or module.__name__ in seen:
+        return
+    path = getattr(module, '__file__', None)
+    if path is None or os.path.dirname(os.path.abspath(path)) != directory:
+        return
+
+    seen[module.__name__] = path
+    for value in list(vars(module).values()):
+        used = value if inspect.ismodule(value) else inspect.getmodule(value)
+        _local_modules(used, directory, seen)
+
+
+@functools.lru_cache(maxsize=None)
+def _source_hash(engine_cls):
+    """Hash of the engine's source file and the local modules it uses"""
+    module = inspect.getmodule(engine_cls)
+    path = getattr(module, '__file__', None)
+    if path is None:
+        return None
+
+    seen = {}
+    _local_modules(module, os.path.dirname(os.path.abspath(path)), seen)
+
+    digest = hashlib.blake2b(digest_size=12)
+    try:
+        for name in sorted(seen):
+            with open(seen[name], 'rb') as f:
+                digest.update(name.encode())
+                digest.update(f.read())
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def canonical_params(engine_cls, params):
+    """Constructor kwargs with every default filled in"""
+    bound = inspect.signature(engine_cls).bind(**params)
+    bound.apply_defaults()
+    return dict(bound.arguments)
+
+
+def engine_params(backtester):
+    """Constructor kwargs of an existing engine, read back from its attributes"""
+    names = inspect.signature(type(backtester)).parameters
+    return {name: getattr(backtester, name) for name in names}
+
+
+class ResultCache:
+    """Directory of pickled backtest results with LRU eviction by size"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize cache
+
+        Parameters:
+        - cache_dir: Directory for cache entries (created on first write)
+        - max_bytes: Total size the cache is trimmed to after each write
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, engine_cls, fingerprint, params, run_kwargs=None):
+        """
+        Cache key for one backtest
+
+        Parameters:
+        - engine_cls: Backtester, EnhancedBacktester or UltraBacktester
+        - fingerprint: dataset_fingerprint() of the data
+        - params: Constructor kwargs (defaults may be omitted)
+        - run_kwargs: Extra run_backtest arguments (e.g. start_idx)
+        """
+        # None means the engine default, same as leaving the argument out
+        run_kwargs = {k: v for k, v in (run_kwargs or {}).items()
+                      if k not in OUTPUT_ONLY_ARGS and v is not None}
+
+        description = json.dumps({
+            'version': RESULT_CACHE_VERSION,
+            'engine': f'{engine_cls.__module__}.{engine_cls.__qualname__}',
+            'source': _source_hash(engine_cls),
+            'data': fingerprint,
+            'params': canonical_params(engine_cls, params),
+            'run': run_kwargs
+        }, sort_keys=True, default=repr)
+
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.pkl')
+
+    def get(self, key):
+        """
+        Look up an entry and mark it as recently used
+
+        Returns: Stored payload dict, or None on a miss
+        """
+        path = self._path(key)
+
+        try:
+            with open(path, 'rb') as f:
+                payload = pickle.load(f)
+            os.utime(path)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return payload
+
+    def put(self, key, payload):
+        """Store an entry, then evict old entries beyond max_bytes"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits max_bytes"""
+        try:
+            entries = [entry for entry in os.scandir(self.cache_dir)
+                       if entry.is_file() and entry.name.endswith('.pkl')]
+        except OSError:
+            return
+
+        stats = [(entry.stat().st_mtime_ns, entry.stat().st_size, entry.path) for entry in entries]
+        total = sum(size for _, size, _ in stats)
+
+        for _, size, path in sorted(stats):
+            if total <= self.max_bytes:
+                break
+            with contextlib.suppress(OSError):
+                os.remove(path)
+            total -= size
+
+    def clear(self):
+        """Delete every entry"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(('.pkl', '.tmp')):
+                with contextlib.suppress(OSError):
+                    os.remove(entry.path)
+
+
+def cached_backtest(backtester, df, cache=None, fingerprint=None, **run_kwargs):
+    """
+    backtester.run_backtest(df, **run_kwargs), unless an identical run is cached
+
+    On a hit no backtest runs; the engine's trades, balance,
+    equity curve and filter counters are restored so print_results(),
+    save_results() and export_trades_to_csv() work as after a real run.
+
+    Parameters:
+    - backtester: Configured engine instance
+    - df: DataFrame with OHLCV data, or a SharedDataset
+    - cache: ResultCache (default: one in DEFAULT_CACHE_DIR)
+    - fingerprint: dataset_fingerprint(df), if already known
+
+    Returns:
+    - get_results() dictionary
+    """
+    cache = cache or ResultCache()
+    fingerprint = fingerprint or dataset_fingerprint(df)
+    key = cache.key(type(backtester), fingerprint, engine_params(backtester), run_kwargs)
+
+    payload = cache.get(key)
+    if payload is not None and 'state' in payload:
+        for name, value in payload['state'].items():
+            setattr(backtester, name, value)
+        if run_kwargs.get('verbose', True):
+            print(f"♻️  Using cached result for {type(backtester).__name__}")
+        return payload['results']
+
+    results = backtester.run_backtest(df, **run_kwargs)
+
+    state = {name: getattr(backtester, name) for name in RESTORED_STATE if hasattr(backtester, name)}
+    cache.put(key, {'results': results, 'trades': backtester.trades, 'state': state})
+
+    return results
+
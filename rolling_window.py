@@ -0,0 +1,348 @@
+"""
+Rolling Window Statistics for NAS100 Breakout Strategy
+Box high/low and averages over a stream of bars or a whole dataset
+
+The live bots use the incremental classes so each check only processes the
+bars that arrived since the previous one. The backtesters use the batch
+functions, which cost O(n) for a dataset of n bars whatever the window
+length, so a 200-bar consolidation box is as cheap as a 20-bar one.
+
+Batch results follow the backtester convention: the value at index idx
+covers bars [idx - period, idx), NaN where fewer than `period` bars exist.
+"""
+
+from collections import deque
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _block_scans(values, period, ufunc, identity):
+    """
+    Prefix and suffix scans of `values` within blocks of `period` bars
+
+    Any window of `period` bars starts in one block and ends in the next
+    (or fills exactly one block), so it is the suffix scan at its first bar
+    combined with the prefix scan at its last bar (van Herk/Gil-Werman).
+    """
+    n = len(values)
+    blocks = -(-n // period)
+    padded = np.full(blocks * period, identity, dtype=np.float64)
+    padded[:n] = values
+    padded = padded.reshape(blocks, period)
+
+    prefix = ufunc.accumulate(padded, axis=1).ravel()[:n]
+    suffix = ufunc.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()[:n]
+    return prefix, suffix
+
+
+def _rolling_extreme(values, period, ufunc, identity):
+    """Trailing-window max/min in O(n) (see module docstring)"""
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    result = np.full(n, np.nan)
+
+    if period <= 0 or n <= period:
+        return result
+
+    prefix, suffix = _block_scans(values, period, ufunc, identity)
+
+    # Window j covers bars [j, j + period) and belongs to bar j + period
+    starts = np.arange(n - period)
+    result[period:] = ufunc(suffix[starts], prefix[starts + period - 1])
+    return result
+
+
+def rolling_max(values, period):
+    """Maximum of values[idx - period:idx] for every idx"""
+    return _rolling_extreme(values, period, np.maximum, -np.inf)
+
+
+def rolling_min(values, period):
+    """Minimum of values[idx - period:idx] for every idx"""
+    return _rolling_extreme(values, period, np.minimum, np.inf)
+
+
+def rolling_sum(values, period):
+    """
+    Sum of values[idx - period:idx] for every idx
+
+    Each sum adds at most two partial block sums of under `period` values,
+    so its rounding error stays within about period * eps of the exact sum
+    (unlike a running cumsum, whose error grows with the dataset).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    result = np.full(n, np.nan)
+
+    if period <= 0 or n <= period:
+        return result
+
+    prefix, suffix = _block_scans(values, period, np.add, 0.0)
+
+    starts = np.arange(n - period)
+    sums = suffix[starts].copy()
+    # A window that does not start on a block boundary spills into the next block
+    spill = starts % period != 0
+    sums[spill] += prefix[starts[spill] + period - 1]
+
+    result[period:] = sums
+    return result
+
+
+def consolidation_masks(high, low, close, period, thresholds):
+    """
+    Consolidation box for every bar, flagged against several thresholds
+
+    A bar consolidates when box_range / mean(close) < threshold, where the
+    mean matches pandas Series.mean() over the window bit for bit: bars
+    whose fast ratio lands within rounding distance of a threshold are
+    re-checked with the exact per-window mean.
+
+    Returns: (box_high, box_low, box_range, masks) - masks is a 2-D bool
+    array with one row per threshold
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float64).reshape(-1)
+
+    box_high = rolling_max(high, period)
+    box_low = rolling_min(low, period)
+    box_range = box_high - box_low
+
+    close = np.asarray(close, dtype=np.float64)
+    masks = np.zeros((len(thresholds), len(close)), dtype=bool)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = box_range / (rolling_sum(close, period) / period)
+        masks[:] = ratio[np.newaxis, :] < thresholds[:, np.newaxis]
+
+        tolerance = 4 * (period + 2) * np.finfo(np.float64).eps * np.abs(thresholds)
+        near = np.abs(ratio[np.newaxis, :] - thresholds[:, np.newaxis]) <= tolerance[:, np.newaxis]
+
+    near_bars = np.flatnonzero(near.any(axis=0))
+    if near_bars.size:
+        exact_mean = sliding_window_view(close, period)[near_bars - period].mean(axis=1)
+        exact_ratio = box_range[near_bars] / exact_mean
+        for row, threshold in enumerate(thresholds):
+            masks[row, near_bars] = exact_ratio < threshold
+
+    return box_high, box_low, box_range, masks
+
+
+def consolidation_box(high, low, close, period, threshold):
+    """
+    Consolidation box and flag for every bar (see consolidation_masks)
+
+    Returns: (box_high, box_low, box_range, is_consolidating)
+    """
+    box_high, box_low, box_range, masks = consolidation_masks(high, low, close, period, [threshold])
+    return box_high, box_low, box_range, masks[0]
+
+
+class MonotonicDeque:
+    """Sliding-window maximum or minimum with amortized O(1) updates"""
+
+    def __init__(self, size, mode='max'):
+        """
+        Initialize deque
+
+        Parameters:
+        - size: Number of most recent values in the window
+        - mode: 'max' or 'min'
+        """
+        if mode not in ('max', 'min'):
+            raise ValueError(f"mode must be 'max' or 'min', got {mode!r}")
+
+        self.size = size
+        self.mode = mode
+        self._items = deque()  # (position, value), values monotonic from the left
+        self._count = 0
+
+    def push(self, value):
+        """Add the next value and drop values that left the window"""
+        position = self._count
+        self._count += 1
+
+        if self.size <= 0:
+            return
+
+        items = self._items
+        if self.mode == 'max':
+            while items and items[-1][1] <= value:
+                items.pop()
+        else:
+            while items and items[-1][1] >= value:
+                items.pop()
+        items.append((position, value))
+
+        while items[0][0] <= position - self.size:
+            items.popleft()
+
+    @property
+    def value(self):
+        """Current window maximum/minimum, or None if the window is empty"""
+        return self._items[0][1] if self._items else None
+
+
+class RollingMean:
+    """Sliding-window mean with an O(1) running sum"""
+
+    def __init__(self, size):
+        """
+        Initialize rolling mean
+
+        Parameters:
+        - size: Number of most recent values in the window
+        """
+        self.size = size
+        self._values = deque(maxlen=max(size, 0))
+        self._total = 0.0
+        self._pushes = 0
+
+    def push(self, value):
+        """Add the next value and drop the one that left the window"""
+        if self.size <= 0:
+            return
+
+        if len(self._values) == self.size:
+            self._total -= self._values[0]
+        self._values.append(value)
+        self._total += value
+
+        # Re-sum exactly now and then so rounding error cannot build up
+        self._pushes += 1
+        if self._pushes % max(self.size, 1000) == 0:
+            self._total = math.fsum(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    @property
+    def total(self):
+        """Sum of the values in the window"""
+        return self._total
+
+    @property
+    def mean(self):
+        """Mean of the values in the window, or None if empty"""
+        if not self._values:
+            return None
+        return self._total / len(self._values)
+
+
+class LiveBarWindow:
+    """
+    Ring buffer of recent live bars with incremental consolidation statistics
+
+    The last bar returned by the broker is still forming and changes on every
+    tick, so it is kept apart from the completed bars. Completed bars are fed
+    to the monotonic deques and running sums exactly once.
+    """
+
+    def __init__(self, consolidation_periods, volume_periods=20, capacity=100):
+        """
+        Initialize window
+
+        Parameters:
+        - consolidation_periods: Bars in the consolidation box (forming bar included)
+        - volume_periods: Bars in the average volume (forming bar included)
+        - capacity: Completed bars kept in the ring buffer
+        """
+        self.consolidation_periods = consolidation_periods
+        self.volume_periods = volume_periods
+        self.capacity = capacity
+
+        self.bars = deque(maxlen=capacity)  # Completed bars
+        self.forming = None  # Current bar, still updating
+
+        # Completed-bar part of each window; the forming bar is added on query
+        self._box_high = MonotonicDeque(consolidation_periods - 1, 'max')
+        self._box_low = MonotonicDeque(consolidation_periods - 1, 'min')
+        self._box_close = RollingMean(consolidation_periods - 1)
+        self._volume = RollingMean(volume_periods - 1)
+
+    def __len__(self):
+        return len(self.bars) + (1 if self.forming is not None else 0)
+
+    @property
+    def last_time(self):
+        """Open time (epoch seconds) of the newest known bar, or None"""
+        return self.forming['time'] if self.forming is not None else None
+
+    def _push_completed(self, bar):
+        """Move a finished bar into the ring buffer and rolling statistics"""
+        self.bars.append(bar)
+        self._box_high.push(bar['high'])
+        self._box_low.push(bar['low'])
+        self._box_close.push(bar['close'])
+        self._volume.push(bar['tick_volume'])
+
+    def update(self, rates):
+        """
+        Merge bars from the broker (oldest first)
+
+        Bars older than the forming bar are ignored, a bar with the same time
+        replaces the forming bar, and a newer bar completes it.
+
+        Parameters:
+        - rates: Iterable of bars with time/open/high/low/close/tick_volume
+          (e.g. the structured array from mt5.copy_rates_*)
+
+        Returns:
+        - Number of newly completed bars
+        """
+        completed = 0
+
+        for rate in rates:
+            bar = {
+                'time': int(rate['time']),
+                'open': float(rate['open']),
+                'high': float(rate['high']),
+                'low': float(rate['low']),
+                'close': float(rate['close']),
+                'tick_volume': int(rate['tick_volume'])
+            }
+
+            if self.forming is None or bar['time'] > self.forming['time']:
+                if self.forming is not None:
+                    self._push_completed(self.forming)
+                    completed += 1
+                self.forming = bar
+            elif bar['time'] == self.forming['time']:
+                self.forming = bar
+
+        return completed
+
+    def box(self):
+        """
+        Consolidation box over the last consolidation_periods bars
+
+        Returns: (high_level, low_level, avg_close), or None if not enough bars
+        """
+        if self.forming is None or len(self) < self.consolidation_periods:
+            return None
+
+        high_level = self.forming['high']
+        low_level = self.forming['low']
+
+        if self._box_high.value is not None:
+            high_level = max(high_level, self._box_high.value)
+            low_level = min(low_level, self._box_low.value)
+
+        avg_close = (self._box_close.total + self.forming['close']) / (len(self._box_close) + 1)
+
+        return high_level, low_level, avg_close
+
+    def average_volume(self):
+        """Average tick volume over the last volume_periods bars"""
+        if self.forming is None:
+            return None
+        return (self._volume.total + self.forming['tick_volume']) / (len(self._volume) + 1)
+
+    def close(self, offset=-1):
+        """Close of the forming bar (-1) or the bar before it (-2)"""
+        if offset == -1:
+            return self.forming['close'] if self.forming is not None else None
+        if offset == -2:
+            return self.bars[-1]['close'] if self.bars else None
+        raise ValueError("offset must be -1 or -2")
@@ -5,6 +5,8 @@ No MT5, no broker, no credentials needed!
 
 from data_fetcher import DataFetcher
 from backtester import Backtester
+from parameter_sweep import expand_grid, run_sweep
+from result_cache import ResultCache
 import sys
 
 
@@ -171,8 +173,18 @@ def run_custom_backtest():
     return results
 
 
-def run_optimization():
-    """Test multiple parameter combinations"""
+def run_optimization(workers=1, use_cache=True):
+    """
+    Test multiple parameter combinations
+
+    Parameters:
+    - workers: 1 (default) evaluates every combination in one process with
+      Backtester.run_multi, sharing the rolling statistics of each
+      consolidation window; more than 1 (or None for CPU count) spreads
+      combinations over worker processes instead
+    - use_cache: Reuse results of combinations already run on the same data
+      (see result_cache.py), so only new combinations are computed
+    """
     print("=" * 70)
     print("🔬 PARAMETER OPTIMIZATION")
     print("=" * 70)
@@ -189,60 +201,70 @@ def run_optimization():
         return
 
     # Parameter ranges to test
-    risk_rewards = [1.5, 2.0, 2.5, 3.0]
-    consolidation_periods_list = [15, 20, 25, 30]
-    breakout_thresholds = [0.002, 0.003, 0.004, 0.005]
+    param_grid = {
+        'risk_reward_ratio': [1.5, 2.0, 2.5, 3.0],
+        'consolidation_periods': [15, 20, 25, 30],
+        'breakout_threshold': [0.002, 0.003, 0.004, 0.005]
+    }
+
+    base_params = {
+        'initial_balance': 10000,
+        'lot_size': 0.01,
+        'max_daily_trades': 5
+    }
 
     best_return = -float('inf')
     best_params = None
     all_results = []
 
-    total_tests = len(risk_rewards) * len(consolidation_periods_list) * len(breakout_thresholds)
+    total_tests = len(param_grid['risk_reward_ratio']) * len(param_grid['consolidation_periods']) * len(param_grid['breakout_threshold'])
     current_test = 0
 
     print(f"Running {total_tests} different parameter combinations...")
     print()
 
-    for rr in risk_rewards:
-        for cp in consolidation_periods_list:
-            for bt in breakout_thresholds:
-                current_test += 1
-
-                # Create backtester
-                backtester = Backtester(
-                    initial_balance=10000,
-                    lot_size=0.01,
-                    risk_reward_ratio=rr,
-                    consolidation_periods=cp,
-                    breakout_threshold=bt,
-                    max_daily_trades=5
-                )
-
-                # Run backtest silently
-                print(f"[{current_test}/{total_tests}] Testing: RR={rr}, CP={cp}, BT={bt}...", end=" ")
-
-                results = backtester.run_backtest(df)
-
-                # Store results
-                params = {
-                    'risk_reward': rr,
-                    'consolidation_periods': cp,
-                    'breakout_threshold': bt,
-                    'return_pct': results['return_pct'],
-                    'win_rate': results['win_rate'],
-                    'total_trades': results['total_trades'],
-                    'profit_factor': results['profit_factor'],
-                    'max_drawdown_pct': results['max_drawdown_pct']
-                }
-
-                all_results.append(params)
-
-                print(f"Return: {results['return_pct']:.2f}%")
-
-                # Track best
-                if results['return_pct'] > best_return and results['total_trades'] >= 10:
-                    best_return = results['return_pct']
-                    best_params = params
+    cache = ResultCache() if use_cache else None
+
+    if workers == 1:
+        combos = expand_grid(param_grid)
+        sweep = zip(range(len(combos)), combos,
+                    Backtester(**base_params).run_multi(df, combos, cache=cache))
+    else:
+        sweep = run_sweep(Backtester, df, param_grid, workers=workers, base_params=base_params,
+                          cache=cache)
+
+    # Results arrive as workers finish, not in grid order
+    for index, combo, results in sweep:
+        current_test += 1
+        rr = combo['risk_reward_ratio']
+        cp = combo['consolidation_periods']
+        bt = combo['breakout_threshold']
+
+        # Store results
+        params = {
+            'risk_reward': rr,
+            'consolidation_periods': cp,
+            'breakout_threshold': bt,
+            'return_pct': results['return_pct'],
+            'win_rate': results['win_rate'],
+            'total_trades': results['total_trades'],
+            'profit_factor': results['profit_factor'],
+            'max_drawdown_pct': results['max_drawdown_pct']
+        }
+
+        all_results.append((index, params))
+
+        print(f"[{current_test}/{total_tests}] RR={rr}, CP={cp}, BT={bt} → "
+              f"Return: {results['return_pct']:.2f}%")
+
+    # Restore grid order so ties resolve the same way as a serial run
+    all_results = [params for index, params in sorted(all_results, key=lambda x: x[0])]
+
+    for params in all_results:
+        # Track best
+        if params['return_pct'] > best_return and params['total_trades'] >= 10:
+            best_return = params['return_pct']
+            best_params = params
 
     print()
     print("=" * 70)
@@ -0,0 +1,146 @@
+"""
+Shared-Memory Datasets for NAS100 Backtesters
+Places the time and OHLCV columns in shared memory once for every process
+
+A SharedDataset is created from a DataFrame in one process. Pickling it
+(e.g. passing it to a process pool) only sends the block names; the
+receiving process attaches to the same memory and reads the columns as
+read-only NumPy arrays without copying them. All three backtesters accept
+a SharedDataset wherever they accept a DataFrame.
+
+    with SharedDataset(df) as data:
+        with ProcessPoolExecutor() as executor:
+            executor.submit(run, data)        # run() calls run_backtest(data)
+"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'tick_volume']
+
+
+class SharedDataset:
+    """Read-only time/OHLCV columns in shared memory, attachable from any process"""
+
+    def __init__(self, df):
+        """
+        Copy a DataFrame's time and OHLCV columns into new shared memory blocks
+
+        The creating process owns the blocks: close() (or leaving a with
+        block) frees them, so keep it open until every worker is done.
+
+        Parameters:
+        - df: DataFrame with 'time' and OHLCV columns
+        """
+        times = pd.DatetimeIndex(df['time'])
+        tz = str(times.tz) if times.tz is not None else None
+        if tz is not None:
+            times = times.tz_convert('UTC').tz_localize(None)
+
+        columns = {'time': times.as_unit('ns').asi8}
+        for col in OHLCV_COLUMNS:
+            columns[col] = df[col].to_numpy()
+
+        self.owner = True
+        self.spec = {'length': len(df), 'tz': tz, 'columns': {}}
+        self.blocks = []
+        self.arrays = {}
+        self._frame = None
+
+        for col, values in columns.items():
+            values = np.ascontiguousarray(values)
+            shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+            self.blocks.append(shm)
+            self.spec['columns'][col] = (shm.name, values.dtype.str)
+
+        self._map_arrays()
+
+    @classmethod
+    def attach(cls, spec):
+        """
+        Attach to blocks created by another process
+
+        Parameters:
+        - spec: The creator's `spec` dict (sent automatically when pickled)
+        """
+        data = cls.__new__(cls)
+        data.owner = False
+        data.spec = spec
+        data.blocks = [shared_memory.SharedMemory(name=name) for name, _ in spec['columns'].values()]
+        data.arrays = {}
+        data._frame = None
+        data._map_arrays()
+        return data
+
+    def _map_arrays(self):
+        """Read-only array views over the shared blocks"""
+        for shm, (col, (_, dtype)) in zip(self.blocks, self.spec['columns'].items()):
+            values = np.ndarray((self.spec['length'],), dtype=np.dtype(dtype), buffer=shm.buf)
+            values.flags.writeable = False
+            self.arrays[col] = values
+
+    def __reduce__(self):
+        return (SharedDataset.attach, (self.spec,))
+
+    def __len__(self):
+        return self.spec['length']
+
+    def __getitem__(self, col):
+        """Read-only array of one column ('time' holds int64 nanoseconds)"""
+        return self.arrays[col]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def frame(self):
+        """
+        DataFrame over the shared columns
+
+        OHLCV columns are not copied; a timezone-aware time column is
+        converted once. The same frame object is returned on every call, so
+        IndicatorCache keeps serving its indicators across backtests.
+        """
+        if self._frame is None:
+            times = pd.Series(self.arrays['time'].view('datetime64[ns]'), copy=False)
+            if self.spec['tz'] is not None:
+                times = times.dt.tz_localize('UTC').dt.tz_convert(self.spec['tz'])
+
+            self._frame = pd.DataFrame({
+                'time': times,
+                **{col: self.arrays[col] for col in OHLCV_COLUMNS}
+            }, copy=False)
+
+        return self._frame
+
+    def close(self):
+        """
+        Detach from the blocks; the owner also frees them
+
+        Frames and arrays taken from this dataset must not be used afterwards.
+        """
+        self._frame = None
+        self.arrays = {}
+
+        for shm in self.blocks:
+            try:
+                shm.close()
+            except BufferError:
+                # A frame or array is still referenced; the mapping goes with it
+                pass
+            if self.owner:
+                shm.unlink()
+        self.blocks = []
+
+
+def as_frame(data):
+    """DataFrame for a DataFrame or SharedDataset argument"""
+    if isinstance(data, SharedDataset):
+        return data.frame()
+    return data
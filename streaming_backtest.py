@@ -0,0 +1,107 @@
+"""
+Streaming Backtests for NAS100 Backtesters
+Runs any of the three engines over data read chunk by chunk
+
+Only a window of bars is held in memory: the lookback the indicators need
+(the engine's warmup_bars()), the bars of the current chunk and the few
+bars the false breakout filter looks ahead at. Each chunk is backtested
+with run_backtest(resume=True), so the balance, trades, daily trade counts
+and any open trade carry over from one chunk to the next, and the results
+are identical to a run on the whole file loaded at once. Indicators that
+depend on every earlier bar (UltraBacktester(use_wilder_smoothing=True))
+have their state carried from one window to the next (see
+IndicatorCache.carry_state()), so they match the whole-file run bit for
+bit too. Only the trade list and the per-bar equity curve (17 bytes per
+bar) grow with the data.
+
+    fetcher = DataFetcher()
+    backtester = UltraBacktester()
+    run_streaming(backtester, fetcher.iter_chunks("NAS100_M1_10years.csv"))
+    backtester.print_results()
+"""
+
+import numpy as np
+import pandas as pd
+
+from equity_tracker import EquityTracker
+from indicator_cache import IndicatorCache
+
+
+def run_streaming(backtester, chunks, verbose=True):
+    """
+    Backtest over an iterator of DataFrame chunks
+
+    Parameters:
+    - backtester: Backtester, EnhancedBacktester or UltraBacktester instance
+    - chunks: Iterable of consecutive DataFrames with OHLCV data
+      (e.g. DataFetcher.iter_chunks())
+    - verbose: Print one progress line per chunk
+
+    Returns:
+    - get_results() dictionary, the same as run_backtest() on the whole
+      data; backtester.trades and backtester.equity cover the whole run too
+    """
+    warmup = backtester.warmup_bars()
+    lookahead = backtester.lookahead_bars()
+    carried = backtester.carried_indicators()
+
+    chunks = iter(chunks)
+    pending = next(chunks, None)
+    if pending is None:
+        raise ValueError("No data to backtest")
+
+    window = None       # Bars still needed: lookback plus unprocessed bars
+    history = {}        # Stateful indicators as of the first bar of window
+    next_idx = 0        # First bar of window not backtested yet
+    started = False
+    bars_read = 0
+
+    # Per-chunk equity, stitched into one tracker at the end
+    equity_times = []
+    equity_balance = []
+    equity_in_position = []
+
+    while pending is not None:
+        chunk = pending
+        pending = next(chunks, None)
+        last = pending is None
+        bars_read += len(chunk)
+
+        window = chunk if window is None else pd.concat([window, chunk], ignore_index=True)
+        if history:
+            IndicatorCache.for_frame(window).continue_from(history)
+
+        # The first call needs enough bars for the engine's default start
+        if not started and not last and len(window) <= warmup + lookahead:
+            continue
+
+        end_idx = len(window) - lookahead
+        run_kwargs = {'end_idx': end_idx, 'close_open_trade': last}
+        if started:
+            run_kwargs.update(start_idx=next_idx, resume=True)
+
+        if not started or next_idx < end_idx:
+            backtester.run_backtest(window, verbose=False, **run_kwargs)
+            started = True
+
+            equity = backtester.equity
+            equity_times.append(equity.times)
+            equity_balance.append(equity.balance[:len(equity)])
+            equity_in_position.append(equity.in_position[:len(equity)])
+
+            if verbose:
+                print(f"📦 {bars_read:,} bars read | {len(backtester.trades)} trades | "
+                      f"Balance: ${backtester.balance:,.2f}")
+
+        # Keep only the lookback of the next bar to process
+        keep_from = max(0, end_idx - warmup)
+        if carried and keep_from > 0:
+            history = IndicatorCache.for_frame(window).carry_state(keep_from, carried)
+        window = window.iloc[keep_from:].reset_index(drop=True)
+        next_idx = end_idx - keep_from
+
+    stitched = EquityTracker(pd.concat(equity_times, ignore_index=True))
+    stitched.extend(np.concatenate(equity_balance), np.concatenate(equity_in_position))
+    backtester.equity = stitched
+
+    return backtester.get_results()
@@ -7,6 +7,7 @@ from data_fetcher import DataFetcher
 from backtester import Backtester
 from enhanced_backtester import EnhancedBacktester
 from ultra_backtester import UltraBacktester
+from result_cache import ResultCache, cached_backtest, dataset_fingerprint
 import pandas as pd
 
 
@@ -108,8 +109,13 @@ def print_three_way_comparison(basic_results, enhanced_results, ultra_results):
     print("=" * 110 + "\n")
 
 
-def run_all_three():
-    """Run all three versions and compare"""
+def run_all_three(use_cache=True):
+    """
+    Run all three versions and compare
+
+    Parameters:
+    - use_cache: Reuse results of identical earlier runs (see result_cache.py)
+    """
     print("=" * 110)
     print(" " * 30 + "🔬 TESTING ALL THREE VERSIONS")
     print("=" * 110)
@@ -125,6 +131,15 @@ def run_all_three():
 
     print(f"✅ Loaded {len(df)} bars\n")
 
+    cache = ResultCache() if use_cache else None
+    fingerprint = dataset_fingerprint(df)
+
+    def run(backtester, **run_kwargs):
+        """Run a backtest, or restore it from the result cache"""
+        if cache is None:
+            return backtester.run_backtest(df, **run_kwargs)
+        return cached_backtest(backtester, df, cache, fingerprint, **run_kwargs)
+
     # Best parameters from optimization
     best_params = {
         'initial_balance': 10000,
@@ -140,7 +155,7 @@ def run_all_three():
     print("TEST 1/3: BASIC STRATEGY")
     print("=" * 110)
     basic_bt = Backtester(**best_params)
-    basic_results = basic_bt.run_backtest(df)  # Basic version doesn't have verbose parameter
+    basic_results = run(basic_bt, verbose=False)
     print(f"\n✅ Basic Complete: {basic_results['total_trades']} trades, {basic_results['win_rate']:.1f}% win rate")
 
     # Test 2: Enhanced
@@ -158,7 +173,7 @@ def run_all_three():
         atr_multiplier=2.0,
         volume_multiplier=1.1
     )
-    enhanced_results = enhanced_bt.run_backtest(df, verbose=False)
+    enhanced_results = run(enhanced_bt, verbose=False)
     print(f"\n✅ Enhanced Complete: {enhanced_results['total_trades']} trades, {enhanced_results['win_rate']:.1f}% win rate")
 
     # Test 3: Ultra
@@ -192,7 +207,7 @@ def run_all_three():
         use_mtf_confirmation=True,
         higher_tf_period=200
     )
-    ultra_results = ultra_bt.run_backtest(df, verbose=False)
+    ultra_results = run(ultra_bt, verbose=False)
     print(f"\n✅ Ultra Complete: {ultra_results['total_trades']} trades, {ultra_results['win_rate']:.1f}% win rate")
 
     # Print comparison
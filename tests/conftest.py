@@ -0,0 +1,37 @@
+"""
+Shared fixtures for the NAS100 backtester tests
+Synthetic datasets with fixed seeds and bar times, so runs are reproducible
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# The engines are flat modules in the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from data_fetcher import DataFetcher  # noqa: E402
+
+
+def synthetic_frame(days, seed):
+    """Synthetic M1 bars with bar times starting 2024-01-02 (not today)"""
+    fetcher = DataFetcher()
+    df = fetcher.path_to_frame(fetcher.generate_price_paths(days=days, seed=seed))
+    df['time'] = pd.date_range('2024-01-02', periods=len(df), freq='min')
+    return df
+
+
+@pytest.fixture(scope='session')
+def three_days():
+    """Three days of M1 bars (seed 7)"""
+    return synthetic_frame(3, seed=7)
+
+
+@pytest.fixture(scope='session')
+def ten_days():
+    """Ten days of M1 bars (seed 11)"""
+    return synthetic_frame(10, seed=11)
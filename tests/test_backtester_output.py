@@ -0,0 +1,50 @@
+"""
+Console output of Backtester.run_backtest()
+
+The expected output in data/ was printed by the engine before trades were
+reported through BacktestEvents, so any change to the default output shows
+up here.
+"""
+
+import os
+
+from backtester import Backtester
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+
+def expected_output(name):
+    with open(os.path.join(DATA_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def test_default_output_matches_old_engine(three_days, capsys):
+    # The last trade is still open at end_idx and closes as END_OF_DATA,
+    # which the old engine never printed
+    backtester = Backtester(consolidation_periods=15, breakout_threshold=0.003)
+    backtester.run_backtest(three_days, end_idx=2960)
+
+    assert backtester.trades[-1]['exit_reason'] == 'END_OF_DATA'
+    assert capsys.readouterr().out == expected_output('backtester_verbose_end_of_data.txt')
+
+
+def test_quiet_run_prints_nothing(three_days, capsys):
+    Backtester(consolidation_periods=15, breakout_threshold=0.003).run_backtest(
+        three_days, end_idx=2960, verbose=False)
+
+    assert capsys.readouterr().out == ''
+
+
+def test_end_of_data_close_reaches_subscribers(three_days):
+    class Closes:
+        def __init__(self):
+            self.reasons = []
+
+        def on_close(self, backtester, idx, trade):
+            self.reasons.append(trade['exit_reason'])
+
+    backtester = Backtester(consolidation_periods=15, breakout_threshold=0.003)
+    closes = backtester.events.subscribe(Closes())
+    backtester.run_backtest(three_days, end_idx=2960, verbose=False)
+
+    assert closes.reasons == [trade['exit_reason'] for trade in backtester.trades]
@@ -0,0 +1,45 @@
+"""
+Stateful indicators: bar-by-bar update(), extend() and compute() agree bit for bit
+"""
+
+import numpy as np
+import pytest
+
+from indicators import ATR, EMA, RSI, SMA
+
+PERIODS = [1, 2, 14, 200]
+
+
+def columns(frame, cls):
+    names = ('high', 'low', 'close') if cls is ATR else ('close',)
+    return [frame[name].to_numpy(dtype=np.float64) for name in names]
+
+
+def updated(indicator, frame):
+    values = []
+    for bar in frame[['high', 'low', 'close']].to_dict('records'):
+        value = indicator.update(bar)
+        values.append(np.nan if value is None else value)
+    return np.array(values)
+
+
+@pytest.mark.parametrize('cls', [SMA, EMA, RSI, ATR])
+@pytest.mark.parametrize('period', PERIODS)
+def test_update_matches_compute(three_days, cls, period):
+    # Past RESUM_BARS, so the SMA's exact re-sums are covered too
+    frame = three_days.iloc[:2500]
+    assert np.array_equal(updated(cls(period), frame), cls.compute(period, *columns(frame, cls)),
+                          equal_nan=True)
+
+
+@pytest.mark.parametrize('cls', [EMA, RSI, ATR])
+@pytest.mark.parametrize('period', PERIODS)
+def test_extend_in_pieces_matches_compute(three_days, cls, period):
+    arrays = columns(three_days, cls)
+    indicator = cls(period)
+    bounds = [0, 1, 5, 150, 150, 1000, len(three_days)]
+    pieces = [indicator.extend(*(a[start:stop] for a in arrays)) for start, stop in zip(bounds, bounds[1:])]
+
+    whole = cls.compute(period, *arrays)
+    assert np.array_equal(np.concatenate(pieces), whole, equal_nan=True)
+    assert indicator.value == whole[-1]
@@ -0,0 +1,70 @@
+"""
+Intrabar TP/SL resolution in PortfolioBacktester
+
+A one-symbol portfolio must settle ambiguous bars exactly like Backtester
+given the same lower-timeframe bars.
+"""
+
+import pandas as pd
+import pytest
+
+from backtester import Backtester
+from conftest import synthetic_frame
+from intrabar import IntrabarResolver
+from portfolio_backtester import PortfolioBacktester
+
+# Seed and settings with M15 bars that reach both TP and SL
+PARAMS = {'risk_reward_ratio': 0.3, 'consolidation_periods': 6, 'breakout_threshold': 0.003,
+          'max_daily_trades': 50}
+
+
+def to_m15(m1):
+    bars = m1.set_index('time').resample('15min')
+    return pd.DataFrame({
+        'open': bars['open'].first(),
+        'high': bars['high'].max(),
+        'low': bars['low'].min(),
+        'close': bars['close'].last(),
+        'tick_volume': bars['tick_volume'].sum()
+    }).reset_index()
+
+
+@pytest.fixture(scope='module')
+def m1_and_m15():
+    m1 = synthetic_frame(30, seed=2)
+    return m1, to_m15(m1)
+
+
+def exits(trades):
+    return [(trade['exit_time'], trade['exit_reason'], trade['balance']) for trade in trades]
+
+
+def test_portfolio_resolves_like_backtester(m1_and_m15):
+    m1, m15 = m1_and_m15
+
+    single_resolver = IntrabarResolver(m1)
+    single = Backtester(intrabar=single_resolver, **PARAMS)
+    single.run_backtest(m15, verbose=False)
+
+    portfolio_resolver = IntrabarResolver(m1)
+    portfolio = PortfolioBacktester(intrabar={'NAS100': portfolio_resolver}, max_positions=5, **PARAMS)
+    portfolio.run_backtest({'NAS100': m15}, verbose=False)
+
+    tp_first = PortfolioBacktester(max_positions=5, **PARAMS)
+    tp_first.run_backtest({'NAS100': m15}, verbose=False)
+
+    assert portfolio_resolver.stats['ambiguous'] > 0
+    assert portfolio_resolver.stats == single_resolver.stats
+    assert exits(portfolio.trades) == exits(single.trades)
+    assert exits(portfolio.trades) != exits(tp_first.trades)
+
+
+def test_intrabar_must_be_keyed_by_symbol(m1_and_m15):
+    m1, m15 = m1_and_m15
+
+    with pytest.raises(TypeError):
+        PortfolioBacktester(intrabar=IntrabarResolver(m1))
+
+    with pytest.raises(ValueError):
+        PortfolioBacktester(intrabar={'US30': IntrabarResolver(m1)}).run_backtest(
+            {'NAS100': m15}, verbose=False)
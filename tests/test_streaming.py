@@ -0,0 +1,35 @@
+"""
+Chunked backtests (streaming_backtest.run_streaming) against whole-data runs
+"""
+
+import pytest
+
+from streaming_backtest import run_streaming
+from ultra_backtester import UltraBacktester
+
+ULTRA_PARAMS = {'consolidation_periods': 25, 'breakout_threshold': 0.003, 'trend_period': 30,
+                'min_breakout_strength': 0.2, 'volume_multiplier': 1.1}
+
+
+def chunks(df, size):
+    return (df.iloc[start:start + size] for start in range(0, len(df), size))
+
+
+@pytest.fixture(scope='module')
+def whole_wilder(ten_days):
+    backtester = UltraBacktester(use_wilder_smoothing=True, **ULTRA_PARAMS)
+    results = backtester.run_backtest(ten_days, verbose=False)
+    return backtester, results
+
+
+@pytest.mark.parametrize('chunk_size', [300, 500, 1000])
+def test_wilder_chunked_matches_whole(ten_days, whole_wilder, chunk_size):
+    whole, whole_results = whole_wilder
+    assert whole_results['total_trades'] > 0
+
+    streamed = UltraBacktester(use_wilder_smoothing=True, **ULTRA_PARAMS)
+    results = run_streaming(streamed, chunks(ten_days, chunk_size), verbose=False)
+
+    # Exact equality: prices, points and balances to the last bit
+    assert results == whole_results
+    assert streamed.trades == whole.trades
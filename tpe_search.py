@@ -0,0 +1,380 @@
+"""
+Bayesian (TPE) Parameter Search for the NAS100 Backtesters
+Finds good UltraBacktester settings with a fixed number of backtests
+
+A full grid over UltraBacktester's 20+ parameters is out of reach, so this
+module uses a Tree-structured Parzen Estimator: finished trials are split
+into the best `gamma` share and the rest, each parameter gets a kernel
+density for both groups, and new candidates are drawn where the good
+density is high relative to the bad one. Usage follows an ask/tell loop:
+
+    optimizer = TPEOptimizer(ULTRA_SEARCH_SPACE, history_path='trials.jsonl')
+    trial_id, params = optimizer.ask()
+    optimizer.tell(trial_id, score)
+
+Every told trial is appended to the history file, so an interrupted search
+resumes where it stopped when the same file is passed again.
+"""
+
+import argparse
+import json
+import math
+import os
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from data_fetcher import DataFetcher
+from parameter_sweep import BacktestPool
+from ultra_backtester import UltraBacktester
+
+
+DEFAULT_HISTORY_PATH = 'tpe_trials.jsonl'
+
+# name -> ('float', low, high) | ('log', low, high) | ('int', low, high) | ('choice', [values])
+ULTRA_SEARCH_SPACE = {
+    'risk_reward_ratio': ('float', 1.5, 4.0),
+    'consolidation_periods': ('int', 10, 40),
+    'breakout_threshold': ('log', 0.001, 0.008),
+    'use_trend_filter': ('choice', [True, False]),
+    'trend_period': ('int', 20, 150),
+    'min_breakout_strength': ('float', 0.05, 0.4),
+    'atr_multiplier': ('float', 1.0, 3.0),
+    'volume_multiplier': ('float', 0.8, 1.5),
+    'use_rsi_filter': ('choice', [True, False]),
+    'rsi_period': ('int', 7, 21),
+    'rsi_overbought': ('int', 60, 85),
+    'rsi_oversold': ('int', 15, 40),
+    'use_consolidation_quality': ('choice', [True, False]),
+    'min_touches': ('int', 1, 5),
+    'use_time_filter': ('choice', [True, False]),
+    'trading_start_hour': ('int', 0, 8),
+    'trading_end_hour': ('int', 14, 23),
+    'use_trailing_stop': ('choice', [False, True]),
+    'trailing_stop_pct': ('float', 0.2, 1.5),
+    'use_false_breakout_filter': ('choice', [True, False]),
+    'confirmation_bars': ('int', 1, 4),
+    'use_mtf_confirmation': ('choice', [True, False]),
+    'higher_tf_period': ('int', 100, 400)
+}
+
+# Results fields kept in the trial history
+HISTORY_FIELDS = ['total_trades', 'win_rate', 'return_pct', 'profit_factor', 'max_drawdown_pct']
+
+
+def default_score(results, min_trades=20):
+    """Same ranking as optimize_enhanced; too few trades never wins"""
+    if results['total_trades'] < min_trades:
+        return -float('inf')
+    return results['win_rate'] * 2 + results['return_pct']
+
+
+class TPEOptimizer:
+    """Ask/tell Tree-structured Parzen Estimator over a parameter space"""
+
+    def __init__(self, space, n_startup=10, gamma=0.25, n_candidates=24, seed=None,
+                 history_path=None):
+        """
+        Initialize optimizer
+
+        Parameters:
+        - space: Dict of parameter name -> spec (see ULTRA_SEARCH_SPACE)
+        - n_startup: Random trials before the model is used
+        - gamma: Share of finished trials treated as "good"
+        - n_candidates: Candidates drawn per parameter for each ask()
+        - seed: Random seed (None = nondeterministic)
+        - history_path: JSON Lines file of finished trials; existing trials
+          in it are loaded, new ones appended
+        """
+        for name, spec in space.items():
+            if spec[0] not in ('float', 'log', 'int', 'choice'):
+                raise ValueError(f"Unknown parameter type for {name}: {spec[0]}")
+
+        self.space = space
+        self.n_startup = n_startup
+        self.gamma = gamma
+        self.n_candidates = n_candidates
+        self.history_path = history_path
+
+        self.trials = []
+        self.pending = {}
+        if history_path and os.path.exists(history_path):
+            self.trials = self._load(history_path)
+
+        self.next_id = max((trial['trial'] for trial in self.trials), default=-1) + 1
+        # Offset by the history so a resumed search does not repeat itself
+        self.rng = np.random.default_rng(None if seed is None else [seed, len(self.trials)])
+
+    def _load(self, path):
+        """Read finished trials, skipping a torn last line and foreign parameters"""
+        trials = []
+        with open(path) as f:
+            for line in f:
+                try:
+                    trial = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if set(trial['params']) == set(self.space):
+                    trials.append(trial)
+        return trials
+
+    @property
+    def best(self):
+        """Finished trial with the highest score (None before any tell)"""
+        if not self.trials:
+            return None
+        return max(self.trials, key=lambda trial: trial['score'])
+
+    def ask(self):
+        """
+        Propose the next parameter set
+
+        Returns:
+        - (trial_id, params) - pass trial_id back to tell()
+        """
+        if len(self.trials) < self.n_startup:
+            params = {name: self._sample_prior(spec) for name, spec in self.space.items()}
+        else:
+            ranked = sorted(self.trials, key=lambda trial: trial['score'], reverse=True)
+            n_good = max(1, math.ceil(self.gamma * len(ranked)))
+            good, bad = ranked[:n_good], ranked[n_good:]
+
+            params = {
+                name: self._sample_tpe(spec, [t['params'][name] for t in good],
+                                       [t['params'][name] for t in bad])
+                for name, spec in self.space.items()
+            }
+
+        trial_id = self.next_id
+        self.next_id += 1
+        self.pending[trial_id] = params
+        return trial_id, params
+
+    def tell(self, trial_id, score, results=None):
+        """
+        Record the score of an asked trial
+
+        Parameters:
+        - trial_id: Id returned by ask()
+        - score: Higher is better (-inf for failed or invalid trials)
+        - results: Optional get_results() dictionary; HISTORY_FIELDS are stored
+        """
+        trial = {
+            'trial': trial_id,
+            'params': self.pending.pop(trial_id),
+            'score': float(score),
+            'results': {k: results[k] for k in HISTORY_FIELDS if k in results} if results else None
+        }
+        self.trials.append(trial)
+
+        if self.history_path:
+            with open(self.history_path, 'a') as f:
+                f.write(json.dumps(trial) + '\n')
+
+    def _sample_prior(self, spec):
+        """Uniform draw from a parameter's range"""
+        kind = spec[0]
+        if kind == 'choice':
+            return spec[1][self.rng.integers(len(spec[1]))]
+        if kind == 'int':
+            return int(self.rng.integers(spec[1], spec[2] + 1))
+        if kind == 'log':
+            return float(np.exp(self.rng.uniform(np.log(spec[1]), np.log(spec[2]))))
+        return float(self.rng.uniform(spec[1], spec[2]))
+
+    def _sample_tpe(self, spec, good, bad):
+        """Candidate from the good density with the best good/bad density ratio"""
+        kind = spec[0]
+
+        if kind == 'choice':
+            choices = spec[1]
+            # Add-one smoothing keeps unseen choices possible
+            good_p = np.array([1 + good.count(c) for c in choices]) / (len(good) + len(choices))
+            bad_p = np.array([1 + bad.count(c) for c in choices]) / (len(bad) + len(choices))
+            candidates = self.rng.choice(len(choices), size=self.n_candidates, p=good_p)
+            best = candidates[np.argmax(good_p[candidates] / bad_p[candidates])]
+            return choices[best]
+
+        low, high = spec[1], spec[2]
+        if kind == 'log':
+            low, high = np.log(low), np.log(high)
+            good, bad = np.log(good), np.log(bad)
+        if kind == 'int':
+            # Widen by half a step so both end values are drawn as often as the rest
+            low, high = low - 0.5, high + 0.5
+
+        good_mu, good_sigma = self._parzen(np.asarray(good, dtype=float), low, high)
+        bad_mu, bad_sigma = self._parzen(np.asarray(bad, dtype=float), low, high)
+
+        component = self.rng.integers(len(good_mu), size=self.n_candidates)
+        candidates = np.clip(self.rng.normal(good_mu[component], good_sigma[component]), low, high)
+
+        ratio = self._log_density(candidates, good_mu, good_sigma) - \
+            self._log_density(candidates, bad_mu, bad_sigma)
+        value = candidates[np.argmax(ratio)]
+
+        if kind == 'int':
+            return int(np.clip(np.round(value), spec[1], spec[2]))
+        if kind == 'log':
+            return float(np.exp(value))
+        return float(value)
+
+    @staticmethod
+    def _parzen(values, low, high):
+        """
+        Gaussian kernel mixture for observed values plus a wide prior kernel
+
+        Each kernel is as wide as the larger gap to its neighbours, clipped
+        so it is neither a spike nor wider than the range.
+        """
+        width = high - low
+        mus = np.append(values, (low + high) / 2)
+        order = np.argsort(mus)
+        sorted_mus = mus[order]
+
+        edges = np.concatenate(([low], sorted_mus, [high]))
+        gaps = np.maximum(edges[1:-1] - edges[:-2], edges[2:] - edges[1:-1])
+        sigmas = np.empty_like(mus)
+        sigmas[order] = np.clip(gaps, width / min(100, len(mus) + 1), width)
+        sigmas[-1] = width  # Prior
+
+        return mus, sigmas
+
+    @staticmethod
+    def _log_density(x, mus, sigmas):
+        """Log density of an equally weighted Gaussian mixture at each x"""
+        z = (x[:, None] - mus[None, :]) / sigmas[None, :]
+        log_pdf = -0.5 * z ** 2 - np.log(sigmas[None, :] * np.sqrt(2 * np.pi))
+        peak = log_pdf.max(axis=1, keepdims=True)
+        return (peak + np.log(np.exp(log_pdf - peak).mean(axis=1, keepdims=True)))[:, 0]
+
+
+def optimize_ultra(df, budget=100, workers=None, history_path=DEFAULT_HISTORY_PATH, seed=42,
+                   min_trades=20, base_params=None, space=None, run_kwargs=None):
+    """
+    Search UltraBacktester parameters with TPE and a process pool
+
+    Parameters:
+    - df: DataFrame with OHLCV data
+    - budget: Total number of trials, including ones loaded from history_path
+    - workers: Number of worker processes (default: CPU count); this many
+      trials are in flight at any time
+    - history_path: Trial history file (None = keep trials in memory only)
+    - seed: Random seed for the optimizer
+    - min_trades: Trials with fewer trades score -inf
+    - base_params: Constructor kwargs that are not searched
+    - space: Search space (default: ULTRA_SEARCH_SPACE)
+    - run_kwargs: Extra run_backtest arguments (e.g. start_idx)
+
+    Returns:
+    - The TPEOptimizer, holding every trial (see its best property)
+    """
+    base_params = dict(base_params or {'initial_balance': 10000, 'lot_size': 0.01,
+                                       'max_daily_trades': 5})
+    optimizer = TPEOptimizer(space or ULTRA_SEARCH_SPACE, seed=seed, history_path=history_path)
+
+    if optimizer.trials:
+        print(f"📂 Resuming with {len(optimizer.trials)} trials from {history_path}")
+
+    remaining = budget - len(optimizer.trials)
+    in_flight = {}
+
+    with BacktestPool(UltraBacktester, df, workers) as pool:
+        while remaining > 0 or in_flight:
+            while remaining > 0 and len(in_flight) < pool.workers:
+                trial_id, params = optimizer.ask()
+                in_flight[pool.submit({**base_params, **params}, run_kwargs)] = trial_id
+                remaining -= 1
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                trial_id = in_flight.pop(future)
+                try:
+                    results = future.result()
+                except Exception as e:
+                    # A failed trial scores -inf instead of ending the search
+                    optimizer.tell(trial_id, -float('inf'))
+                    print(f"[{len(optimizer.trials)}/{budget}] trial {trial_id}: ❌ failed ({e!r})")
+                    broken = broken or isinstance(e, BrokenProcessPool)
+                    continue
+
+                score = default_score(results, min_trades)
+                optimizer.tell(trial_id, score, results)
+
+                best = optimizer.best
+                print(f"[{len(optimizer.trials)}/{budget}] trial {trial_id}: "
+                      f"{results['total_trades']} trades, WinRate: {results['win_rate']:.1f}%, "
+                      f"Return: {results['return_pct']:.1f}%, Score: {score:.2f} "
+                      f"(best {best['score']:.2f})")
+
+            # A dead worker breaks the whole pool: fail what was in flight
+            # and carry on with fresh workers
+            if broken:
+                for trial_id in in_flight.values():
+                    optimizer.tell(trial_id, -float('inf'))
+                    print(f"[{len(optimizer.trials)}/{budget}] trial {trial_id}: ❌ lost with the worker pool")
+                in_flight.clear()
+                pool.restart()
+
+    return optimizer
+
+
+def print_best(optimizer):
+    """Print the best trial of a search"""
+    best = optimizer.best
+
+    print()
+    print("=" * 90)
+    print("🏆 TPE SEARCH RESULTS")
+    print("=" * 90)
+
+    if best is None or best['score'] == -float('inf'):
+        print("❌ No trial had enough trades")
+        print("=" * 90)
+        return
+
+    print(f"\nBest of {len(optimizer.trials)} trials (trial {best['trial']}, score {best['score']:.2f}):\n")
+    for name, value in best['params'].items():
+        if isinstance(value, float):
+            value = f"{value:.4g}"
+        print(f"  {name:<28} {value}")
+
+    if best['results']:
+        results = best['results']
+        print()
+        print(f"  Win Rate:                    {results['win_rate']:.2f}%")
+        print(f"  Return:                      {results['return_pct']:.2f}%")
+        print(f"  Total Trades:                {results['total_trades']}")
+        print(f"  Profit Factor:               {results['profit_factor']:.2f}")
+    print("=" * 90)
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="TPE parameter search for UltraBacktester")
+    parser.add_argument('--budget', type=int, default=100, help="Total trials (including resumed ones)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--history', default=DEFAULT_HISTORY_PATH, help="Trial history file")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--min-trades', type=int, default=20)
+    args = parser.parse_args()
+
+    print("=" * 90)
+    print(" " * 25 + "🔬 ULTRA STRATEGY TPE SEARCH")
+    print("=" * 90)
+
+    fetcher = DataFetcher()
+    df = fetcher.load_data("NAS100_synthetic_30days.csv")
+    if df is None:
+        df = fetcher.generate_sample_data(days=30)
+
+    optimizer = optimize_ultra(df, budget=args.budget, workers=args.workers,
+                               history_path=args.history, seed=args.seed,
+                               min_trades=args.min_trades)
+    print_best(optimizer)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Trade Log for NAS100 Backtesters
+Closed trades in growable column arrays with array-based statistics
+
+close_trade() appends one row of scalars to the columns instead of building
+a dict per trade, and get_results() reduces the profit and win columns
+directly. The log still behaves like the list of trade dicts it replaces:
+len(), indexing (trades[-1]['win']), slicing, iteration and == against a
+list of dicts all work on records built on demand. A DataFrame is only
+built when trades are exported.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Record keys, in the order trades have always been saved and exported
+FIELDS = ('entry_time', 'exit_time', 'type', 'entry_price', 'exit_price',
+          'take_profit', 'stop_loss', 'points', 'profit', 'balance',
+          'exit_reason', 'win')
+
+PRICE_FIELDS = ('entry_price', 'exit_price', 'take_profit', 'stop_loss',
+                'points', 'profit', 'balance')
+
+TIME_FIELDS = ('entry_time', 'exit_time')
+
+# Repeated strings, stored as codes into a per-log list of labels
+LABEL_FIELDS = ('type', 'exit_reason')
+
+INITIAL_CAPACITY = 64
+
+
+class TradeLog:
+    """Columnar list of closed trades"""
+
+    def __init__(self):
+        self.length = 0
+        self.capacity = INITIAL_CAPACITY
+
+        self._prices = {name: np.empty(self.capacity, dtype=np.float64) for name in PRICE_FIELDS}
+        self._times = {name: np.empty(self.capacity, dtype=np.int64) for name in TIME_FIELDS}
+        self._codes = {name: np.empty(self.capacity, dtype=np.int16) for name in LABEL_FIELDS}
+        self._win = np.empty(self.capacity, dtype=bool)
+
+        self._labels = {name: [] for name in LABEL_FIELDS}
+        self._label_codes = {name: {} for name in LABEL_FIELDS}
+
+        # Timezone of the bar times (None for naive times)
+        self.tz = None
+
+        # Fields beyond FIELDS (e.g. 'symbol'), one Python list each
+        self._extra = {}
+
+    def __len__(self):
+        return self.length
+
+    def _grow(self):
+        """Double the capacity of every column"""
+        self.capacity *= 2
+        for columns in (self._prices, self._times, self._codes):
+            for name, values in columns.items():
+                grown = np.empty(self.capacity, dtype=values.dtype)
+                grown[:self.length] = values[:self.length]
+                columns[name] = grown
+
+        win = np.empty(self.capacity, dtype=bool)
+        win[:self.length] = self._win[:self.length]
+        self._win = win
+
+    def _code(self, name, label):
+        """Code of a type/exit_reason label, registering new labels"""
+        codes = self._label_codes[name]
+        code = codes.get(label)
+        if code is None:
+            code = len(self._labels[name])
+            self._labels[name].append(label)
+            codes[label] = code
+        return code
+
+    def _time_value(self, time):
+        """Bar time as int64 nanoseconds (UTC for timezone-aware times)"""
+        time = pd.Timestamp(time)
+        if self.length == 0:
+            self.tz = time.tz
+        return time.as_unit('ns').value
+
+    def _time(self, value):
+        """Inverse of _time_value"""
+        if self.tz is None:
+            return pd.Timestamp(value)
+        return pd.Timestamp(value, tz='UTC').tz_convert(self.tz)
+
+    def add(self, entry_time, exit_time, trade_type, entry_price, exit_price,
+            take_profit, stop_loss, points, profit, balance, exit_reason):
+        """Record a closed trade; win is profit > 0"""
+        if self.length == self.capacity:
+            self._grow()
+
+        i = self.length
+        self._times['entry_time'][i] = self._time_value(entry_time)
+        self._times['exit_time'][i] = self._time_value(exit_time)
+        self._codes['type'][i] = self._code('type', trade_type)
+        self._codes['exit_reason'][i] = self._code('exit_reason', exit_reason)
+
+        prices = self._prices
+        prices['entry_price'][i] = entry_price
+        prices['exit_price'][i] = exit_price
+        prices['take_profit'][i] = take_profit
+        prices['stop_loss'][i] = stop_loss
+        prices['points'][i] = points
+        prices['profit'][i] = profit
+        prices['balance'][i] = balance
+        self._win[i] = profit > 0
+
+        for values in self._extra.values():
+            values.append(None)
+        self.length += 1
+
+    def append(self, record):
+        """Record a trade given as a dict (as list.append did)"""
+        self.add(*(record[name] for name in FIELDS[:-1]))
+        for name, value in record.items():
+            if name not in FIELDS:
+                self.set(-1, name, value)
+
+    def extend(self, records):
+        """Append several trade dicts (or another TradeLog)"""
+        for record in records:
+            self.append(record)
+
+    def set(self, index, name, value):
+        """Set an extra field (not one of FIELDS) of one trade, e.g. its symbol"""
+        if name in FIELDS:
+            raise ValueError(f"{name!r} is a core trade field and cannot be changed")
+
+        if name not in self._extra:
+            self._extra[name] = [None] * self.length
+        self._extra[name][index] = value
+
+    def column(self, name):
+        """
+        One field of every trade as a NumPy array
+
+        Price and win columns are read-only views; the rest are copies.
+        """
+        n = self.length
+
+        if name in self._prices:
+            values = self._prices[name][:n]
+        elif name == 'win':
+            values = self._win[:n]
+        elif name in self._times:
+            times = pd.to_datetime(self._times[name][:n], utc=self.tz is not None)
+            return (times.tz_convert(self.tz) if self.tz is not None else times).to_numpy()
+        elif name in self._codes:
+            return np.array(self._labels[name], dtype=object)[self._codes[name][:n]]
+        elif name in self._extra:
+            return np.array(self._extra[name], dtype=object)
+        else:
+            raise KeyError(name)
+
+        values = values.view()
+        values.flags.writeable = False
+        return values
+
+    def record(self, index):
+        """One trade as a dict"""
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("trade index out of range")
+
+        record = {
+            'entry_time': self._time(self._times['entry_time'][index]),
+            'exit_time': self._time(self._times['exit_time'][index]),
+            'type': self._labels['type'][self._codes['type'][index]],
+        }
+        for name in PRICE_FIELDS:
+            record[name] = float(self._prices[name][index])
+        record['exit_reason'] = self._labels['exit_reason'][self._codes['exit_reason'][index]]
+        record['win'] = bool(self._win[index])
+
+        for name, values in self._extra.items():
+            record[name] = values[index]
+
+        return {name: record[name] for name in self._keys()}
+
+    def _keys(self):
+        """Record keys: FIELDS, then any extra fields"""
+        return FIELDS + tuple(self._extra)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.record(i) for i in range(*index.indices(self.length))]
+        return self.record(index)
+
+    def __iter__(self):
+        for i in range(self.length):
+            yield self.record(i)
+
+    def __eq__(self, other):
+        if isinstance(other, (TradeLog, list, tuple)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"TradeLog({self.length} trades)"
+
+    def to_records(self):
+        """Every trade as a list of dicts (for JSON output)"""
+        return list(self)
+
+    def to_frame(self):
+        """Every trade as a DataFrame, one row per trade"""
+        return pd.DataFrame({name: self.column(name) for name in self._keys()})
+
+    def summary(self):
+        """
+        Win/loss statistics of get_results()
+
+        Returns: Dict with winning_trades, losing_trades, total_profit,
+        total_loss, avg_win, avg_loss, largest_win and largest_loss
+        """
+        profit = self._prices['profit'][:self.length]
+        win = self._win[:self.length]
+        wins = profit[win]
+        losses = profit[~win]
+
+        return {
+            'winning_trades': len(wins),
+            'losing_trades': len(losses),
+            'total_profit': wins.sum() if len(wins) > 0 else 0,
+            'total_loss': abs(losses.sum()) if len(losses) > 0 else 0,
+            'avg_win': wins.mean() if len(wins) > 0 else 0,
+            'avg_loss': losses.mean() if len(losses) > 0 else 0,
+            'largest_win': wins.max() if len(wins) > 0 else 0,
+            'largest_loss': losses.min() if len(losses) > 0 else 0
+        }
@@ -11,15 +11,24 @@ New Features Beyond Enhanced Version:
 12. Multi-Timeframe Confirmation - Higher TF trend alignment
 """
 
-import pandas as pd
-import numpy as np
-from datetime import datetime, time as dt_time
 import json
+import time
+
+from equity_tracker import EquityTracker
+from indicator_cache import IndicatorCache
+from shared_dataset import as_frame
+from trade_log import TradeLog
 
 
 class UltraBacktester:
     """Ultra-enhanced backtest engine for maximum win rate"""
 
+    # Default short-circuit order of the detect_breakout filters
+    FILTER_ORDER = ('volume', 'trend', 'strength', 'rsi', 'quality', 'time', 'false_breakout', 'mtf')
+
+    # Breakout signals between re-rankings when filter_order='adaptive'
+    ADAPTIVE_REORDER_INTERVAL = 32
+
     def __init__(self, initial_balance=10000, lot_size=0.01,
                  risk_reward_ratio=2.0, consolidation_periods=20,
                  breakout_threshold=0.0015, max_daily_trades=5,
@@ -34,7 +43,9 @@ class UltraBacktester:
                  use_time_filter=True, trading_start_hour=2, trading_end_hour=20,
                  use_trailing_stop=False, trailing_stop_pct=0.5,
                  use_false_breakout_filter=True, confirmation_bars=1,
-                 use_mtf_confirmation=True, higher_tf_period=200):
+                 use_mtf_confirmation=True, higher_tf_period=200,
+                 profile=False, filter_order=None, intrabar=None,
+                 use_wilder_smoothing=False):
         """
         Initialize ultra backtester with maximum filters
 
@@ -54,6 +65,16 @@ class UltraBacktester:
         - confirmation_bars: Number of bars to confirm breakout
         - use_mtf_confirmation: Check higher timeframe
         - higher_tf_period: Higher TF MA period for trend
+        - profile: Record wall time and call counts per filter, for
+          consolidation detection and for exit checks (see get_results)
+        - filter_order: None for FILTER_ORDER, a permutation of FILTER_ORDER,
+          or 'adaptive' to re-rank filters by measured cost per rejection.
+          Trades are the same for any order; only the rejected_by_* split
+          between filters changes.
+        - intrabar: Optional IntrabarResolver (intrabar.py) deciding whether
+          TP or the stop came first on bars that touch both
+        - use_wilder_smoothing: Wilder-smoothed RSI and ATR (indicators.py,
+          as in MT5) instead of simple averages over the last period bars
         """
         # Basic parameters
         self.initial_balance = initial_balance
@@ -91,6 +112,17 @@ class UltraBacktester:
         self.confirmation_bars = confirmation_bars
         self.use_mtf_confirmation = use_mtf_confirmation
         self.higher_tf_period = higher_tf_period
+        self.profile = profile
+        self.intrabar = intrabar
+        self.use_wilder_smoothing = use_wilder_smoothing
+
+        if filter_order is not None and filter_order != 'adaptive':
+            filter_order = tuple(filter_order)
+            if sorted(filter_order) != sorted(self.FILTER_ORDER):
+                raise ValueError(f"filter_order must be 'adaptive' or a permutation of {self.FILTER_ORDER}")
+        self.filter_order = filter_order
+        self._active_filter_order = self._initial_filter_order()
+        self._breakout_signals = 0
 
         # Trading state
         self.in_position = False
@@ -99,54 +131,87 @@ class UltraBacktester:
         self.lowest_price_in_trade = None
 
         # Performance tracking
-        self.trades = []
-        self.equity_curve = []
+        self.trades = TradeLog()
+        self.equity = None  # EquityTracker of the last run
         self.daily_trades_count = {}
         self.rejected_trades = {
             'trend': 0, 'strength': 0, 'volume': 0,
             'rsi': 0, 'quality': 0, 'time': 0, 'false_breakout': 0, 'mtf': 0
         }
+        self.profile_stats = {}
 
-    def calculate_rsi(self, df, period, idx):
-        """Calculate RSI at given index"""
-        if idx < period + 1:
-            return None
+    def _initial_filter_order(self):
+        """Filter order at the start of a run"""
+        if self.filter_order is None or self.filter_order == 'adaptive':
+            return list(self.FILTER_ORDER)
+        return list(self.filter_order)
+
+    def _rerank_filters(self):
+        """
+        Sort filters by average cost per rejection (cheapest first)
+
+        For a conjunction of independent checks this order minimizes the
+        expected evaluation cost. Filters not yet measured go first so they
+        get sampled.
+        """
+        def cost_per_rejection(name):
+            stats = self.profile_stats.get(name)
+            if stats is None or stats['calls'] == 0:
+                return 0.0
+            avg_cost = stats['seconds'] / stats['calls']
+            rejection_rate = stats['rejections'] / stats['calls']
+            return avg_cost / max(rejection_rate, 1e-6)
 
-        prices = df.iloc[idx-period:idx]['close']
-        deltas = prices.diff()
+        self._active_filter_order.sort(key=cost_per_rejection)
 
-        gain = deltas.where(deltas > 0, 0).mean()
-        loss = -deltas.where(deltas < 0, 0).mean()
+    def _timed(self, name, check, *args):
+        """
+        Call check(*args), recording its wall time under name when profiling
+        (adaptive filter ordering uses the same measurements)
+
+        Returns: whatever check returns
+        """
+        if not self.profile and self.filter_order != 'adaptive':
+            return check(*args)
 
-        if loss == 0:
-            return 100
+        start = time.perf_counter()
+        result = check(*args)
+        elapsed = time.perf_counter() - start
 
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
+        stats = self.profile_stats.get(name)
+        if stats is None:
+            stats = self.profile_stats[name] = {'calls': 0, 'seconds': 0.0, 'rejections': 0}
+        stats['calls'] += 1
+        stats['seconds'] += elapsed
 
-        return rsi
+        # Tuple results (consolidation, exit check) pass on their first element
+        passed = result[0] if isinstance(result, tuple) else result
+        if not passed:
+            stats['rejections'] += 1
+
+        return result
+
+    def calculate_rsi(self, df, period, idx):
+        """Calculate RSI at given index"""
+        if idx < period + 1:
+            return None
+        if self.use_wilder_smoothing:
+            return IndicatorCache.for_frame(df).wilder_rsi(period)[idx]
+        return IndicatorCache.for_frame(df).rsi(period)[idx]
 
     def calculate_sma(self, df, period, idx):
         """Calculate Simple Moving Average at given index"""
         if idx < period:
             return None
-        return df.iloc[idx-period:idx]['close'].mean()
+        return IndicatorCache.for_frame(df).sma(period)[idx]
 
     def calculate_atr(self, df, period, idx):
         """Calculate Average True Range at given index"""
         if idx < period + 1:
             return None
-
-        recent_data = df.iloc[idx-period:idx]
-
-        high_low = recent_data['high'] - recent_data['low']
-        high_close = abs(recent_data['high'] - recent_data['close'].shift(1))
-        low_close = abs(recent_data['low'] - recent_data['close'].shift(1))
-
-        true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        atr = true_range.mean()
-
-        return atr
+        if self.use_wilder_smoothing:
+            return IndicatorCache.for_frame(df).wilder_atr(period)[idx]
+        return IndicatorCache.for_frame(df).atr(period)[idx]
 
     def check_rsi_filter(self, df, idx, signal):
         """Check RSI conditions"""
@@ -168,21 +233,17 @@ class UltraBacktester:
         return True
 
     def check_consolidation_quality(self, df, high_level, low_level, current_idx):
-        """Check if consolidation has quality touches"""
+        """
+        Check if consolidation has quality touches
+
+        high_level/low_level are the box identify_consolidation() found for
+        current_idx; touches within 10% of either edge are counted for all
+        bars at once by IndicatorCache.box_touches().
+        """
         if not self.use_consolidation_quality:
             return True
 
-        start_idx = max(0, current_idx - self.consolidation_periods)
-        recent_data = df.iloc[start_idx:current_idx]
-
-        box_range = high_level - low_level
-        touch_threshold = box_range * 0.1  # Within 10% of edge
-
-        # Count touches of upper and lower bounds
-        upper_touches = sum(abs(recent_data['high'] - high_level) < touch_threshold)
-        lower_touches = sum(abs(recent_data['low'] - low_level) < touch_threshold)
-
-        total_touches = upper_touches + lower_touches
+        total_touches = IndicatorCache.for_frame(df).box_touches(self.consolidation_periods)[current_idx]
 
         return total_touches >= self.min_touches
 
@@ -208,18 +269,18 @@ class UltraBacktester:
         if idx + self.confirmation_bars >= len(df):
             return False
 
-        # Check next bars confirm the breakout
-        for i in range(1, self.confirmation_bars + 1):
-            confirm_bar = df.iloc[idx + i]
+        if self.confirmation_bars < 1:
+            return True
+
+        # Closes of the next confirmation_bars bars, reduced to their min/max
+        lowest_close, highest_close = IndicatorCache.for_frame(df).forward_close_range(self.confirmation_bars)
 
-            if signal == 'BUY':
-                # Confirming bars should stay above breakout level
-                if confirm_bar['close'] < high_level:
-                    return False
-            elif signal == 'SELL':
-                # Confirming bars should stay below breakout level
-                if confirm_bar['close'] > low_level:
-                    return False
+        if signal == 'BUY':
+            # Confirming bars should stay above breakout level
+            return lowest_close[idx] >= high_level
+        elif signal == 'SELL':
+            # Confirming bars should stay below breakout level
+            return highest_close[idx] <= low_level
 
         return True
 
@@ -234,7 +295,7 @@ class UltraBacktester:
         if htf_ma is None:
             return True
 
-        current_price = df.iloc[idx]['close']
+        current_price = IndicatorCache.for_frame(df).close[idx]
 
         # Buy only if price above higher TF MA
         if signal == 'BUY':
@@ -257,7 +318,7 @@ class UltraBacktester:
         if fast_ma is None or slow_ma is None:
             return False
 
-        current_price = df.iloc[idx]['close']
+        current_price = IndicatorCache.for_frame(df).close[idx]
 
         if signal == 'BUY':
             return current_price > slow_ma and fast_ma > slow_ma
@@ -290,8 +351,9 @@ class UltraBacktester:
         if idx < 20:
             return True
 
-        current_volume = df.iloc[idx]['tick_volume']
-        avg_volume = df.iloc[idx-20:idx]['tick_volume'].mean()
+        indicators = IndicatorCache.for_frame(df)
+        current_volume = indicators.volume[idx]
+        avg_volume = indicators.volume_mean(20)[idx]
 
         return current_volume > (avg_volume * self.volume_multiplier)
 
@@ -300,19 +362,11 @@ class UltraBacktester:
         if current_idx < self.consolidation_periods:
             return False, None, None, None
 
-        start_idx = current_idx - self.consolidation_periods
-        recent_data = df.iloc[start_idx:current_idx]
-
-        high_level = recent_data['high'].max()
-        low_level = recent_data['low'].min()
-        box_range = high_level - low_level
-
-        avg_price = recent_data['close'].mean()
-        price_range_ratio = box_range / avg_price
-
-        is_consolidating = price_range_ratio < self.breakout_threshold
+        box_high, box_low, box_range, is_consolidating = IndicatorCache.for_frame(df).consolidation(
+            self.consolidation_periods, self.breakout_threshold)
 
-        return is_consolidating, high_level, low_level, box_range
+        return (is_consolidating[current_idx], box_high[current_idx],
+                box_low[current_idx], box_range[current_idx])
 
     def detect_breakout(self, df, current_idx, high_level, low_level):
         """Detect breakout with ALL filters"""
@@ -337,49 +391,44 @@ class UltraBacktester:
         if signal is None:
             return None
 
-        # Apply ALL filters in sequence
-        # 1. Volume filter
-        if not self.check_volume(df, current_idx):
-            self.rejected_trades['volume'] += 1
-            return None
+        self._note_breakout_signal()
 
-        # 2. Trend filter
-        if not self.check_trend(df, current_idx, signal):
-            self.rejected_trades['trend'] += 1
-            return None
-
-        # 3. Breakout strength filter
-        if not self.check_breakout_strength(current_price, high_level, low_level, signal):
-            self.rejected_trades['strength'] += 1
-            return None
-
-        # 4. RSI filter (NEW!)
-        if not self.check_rsi_filter(df, current_idx, signal):
-            self.rejected_trades['rsi'] += 1
-            return None
-
-        # 5. Consolidation quality filter (NEW!)
-        if not self.check_consolidation_quality(df, high_level, low_level, current_idx):
-            self.rejected_trades['quality'] += 1
-            return None
-
-        # 6. Time filter (NEW!)
-        if not self.check_time_filter(current_time):
-            self.rejected_trades['time'] += 1
-            return None
-
-        # 7. False breakout filter (NEW!)
-        if not self.check_false_breakout(df, current_idx, high_level, low_level, signal):
-            self.rejected_trades['false_breakout'] += 1
-            return None
-
-        # 8. Multi-timeframe confirmation (NEW!)
-        if not self.check_mtf_confirmation(df, current_idx, signal):
-            self.rejected_trades['mtf'] += 1
-            return None
+        # Apply ALL filters; they form a pure conjunction, so only the order
+        # in which rejections are attributed depends on _active_filter_order
+        for name in self._active_filter_order:
+            if not self._timed(name, self._apply_filter, name, df, current_idx, signal,
+                               current_price, high_level, low_level, current_time):
+                self.rejected_trades[name] += 1
+                return None
 
         return signal
 
+    def _note_breakout_signal(self):
+        """Count a raw breakout and periodically re-rank adaptive filters"""
+        self._breakout_signals += 1
+        if self.filter_order == 'adaptive' and self._breakout_signals % self.ADAPTIVE_REORDER_INTERVAL == 0:
+            self._rerank_filters()
+
+    def _apply_filter(self, name, df, idx, signal, current_price, high_level, low_level, current_time):
+        """Evaluate one detect_breakout filter by name"""
+        if name == 'volume':
+            return self.check_volume(df, idx)
+        if name == 'trend':
+            return self.check_trend(df, idx, signal)
+        if name == 'strength':
+            return self.check_breakout_strength(current_price, high_level, low_level, signal)
+        if name == 'rsi':
+            return self.check_rsi_filter(df, idx, signal)
+        if name == 'quality':
+            return self.check_consolidation_quality(df, high_level, low_level, idx)
+        if name == 'time':
+            return self.check_time_filter(current_time)
+        if name == 'false_breakout':
+            return self.check_false_breakout(df, idx, high_level, low_level, signal)
+        if name == 'mtf':
+            return self.check_mtf_confirmation(df, idx, signal)
+        raise ValueError(f"Unknown filter: {name}")
+
     def calculate_tp_sl(self, df, idx, entry_price, signal_type, box_range):
         """Calculate TP and SL using ATR or box range"""
 
@@ -459,8 +508,8 @@ class UltraBacktester:
                 if new_stop < self.current_trade['trailing_stop']:
                     self.current_trade['trailing_stop'] = new_stop
 
-    def check_trade_exit(self, current_bar):
-        """Check if current trade should be closed"""
+    def check_trade_exit(self, current_bar, idx=None):
+        """Check if current trade should be closed (idx: bar index, for self.intrabar)"""
         if not self.in_position or self.current_trade is None:
             return False, None, None
 
@@ -472,17 +521,21 @@ class UltraBacktester:
 
         tp = self.current_trade['take_profit']
         sl = self.current_trade['trailing_stop'] if self.use_trailing_stop else self.current_trade['stop_loss']
+        is_buy = self.current_trade['type'] == 'BUY'
 
-        if self.current_trade['type'] == 'BUY':
-            if high >= tp:
-                return True, tp, 'TP'
-            if low <= sl:
-                return True, sl, 'TSL' if self.use_trailing_stop else 'SL'
+        if is_buy:
+            tp_hit, sl_hit = high >= tp, low <= sl
         else:
-            if low <= tp:
-                return True, tp, 'TP'
-            if high >= sl:
-                return True, sl, 'TSL' if self.use_trailing_stop else 'SL'
+            tp_hit, sl_hit = low <= tp, high >= sl
+
+        # Both touched: TP counts first unless lower-timeframe bars say otherwise
+        if tp_hit and sl_hit and self.intrabar is not None and idx is not None:
+            tp_hit = self.intrabar.first_touch(idx, is_buy, tp, sl) != 'SL'
+
+        if tp_hit:
+            return True, tp, 'TP'
+        if sl_hit:
+            return True, sl, 'TSL' if self.use_trailing_stop else 'SL'
 
         return False, None, None
 
@@ -502,22 +555,9 @@ class UltraBacktester:
 
         self.balance += profit
 
-        trade_record = {
-            'entry_time': trade['entry_time'],
-            'exit_time': exit_time,
-            'type': trade['type'],
-            'entry_price': trade['entry_price'],
-            'exit_price': exit_price,
-            'take_profit': trade['take_profit'],
-            'stop_loss': trade['stop_loss'],
-            'points': points,
-            'profit': profit,
-            'balance': self.balance,
-            'exit_reason': exit_reason,
-            'win': profit > 0
-        }
-
-        self.trades.append(trade_record)
+        self.trades.add(trade['entry_time'], exit_time, trade['type'], trade['entry_price'],
+                        exit_price, trade['take_profit'], trade['stop_loss'], points, profit,
+                        self.balance, exit_reason)
         self.in_position = False
         self.current_trade = None
         self.highest_price_in_trade = None
@@ -534,8 +574,48 @@ class UltraBacktester:
         date_str = current_time.strftime('%Y-%m-%d')
         self.daily_trades_count[date_str] = self.daily_trades_count.get(date_str, 0) + 1
 
-    def run_backtest(self, df, start_idx=None, end_idx=None, verbose=True):
-        """Run backtest on historical data"""
+    def warmup_bars(self):
+        """Bars before a signal bar that the indicators look back at"""
+        return max(self.consolidation_periods, self.trend_period, self.higher_tf_period,
+                   self.atr_period + 1, self.rsi_period + 1, 20)
+
+    def lookahead_bars(self):
+        """Bars after a signal bar that the false breakout filter looks ahead at"""
+        return self.confirmation_bars if self.use_false_breakout_filter else 0
+
+    def carried_indicators(self):
+        """
+        IndicatorCache series that depend on every earlier bar
+
+        Wilder-smoothed RSI and ATR never forget a bar, so a chunked run
+        (streaming_backtest.py) carries their state from chunk to chunk
+        instead of restarting them from the lookback window.
+
+        Returns: List of (name, period) keys of IndicatorCache.STATEFUL_SERIES
+        """
+        if not self.use_wilder_smoothing:
+            return []
+
+        keys = []
+        if self.use_rsi_filter:
+            keys.append(('wilder_rsi', self.rsi_period))
+        if self.use_atr_stops:
+            keys.append(('wilder_atr', self.atr_period))
+        return keys
+
+    def run_backtest(self, df, start_idx=None, end_idx=None, verbose=True, resume=False,
+                     close_open_trade=True):
+        """
+        Run backtest on historical data (df may also be a SharedDataset)
+
+        resume=True continues from the balance, trades and open position of
+        the previous call, and close_open_trade=False leaves a trade open at
+        end_idx; streaming_backtest.py uses both to run a file in chunks.
+        """
+        df = as_frame(df)
+        if self.intrabar is not None:
+            self.intrabar.prepare(df)
+
         if verbose:
             print("=" * 70)
             print("🚀 STARTING ULTRA-ENHANCED BACKTEST")
@@ -565,20 +645,27 @@ class UltraBacktester:
             print(f"   Trailing Stop: {'ON' if self.use_trailing_stop else 'OFF'}")
             print(f"   False Breakout Filter: {'ON' if self.use_false_breakout_filter else 'OFF'} ({self.confirmation_bars} bars)")
             print(f"   MTF Confirmation: {'ON' if self.use_mtf_confirmation else 'OFF'} (MA{self.higher_tf_period})")
+            if self.filter_order is not None:
+                order = 'adaptive' if self.filter_order == 'adaptive' else ' → '.join(self.filter_order)
+                print(f"   Filter Order: {order}")
             print(f"\nBacktesting {total_bars} bars from {df.iloc[start_idx]['time']} to {df.iloc[end_idx-1]['time']}")
             print("-" * 70)
 
-        # Reset state
-        self.balance = self.initial_balance
-        self.in_position = False
-        self.current_trade = None
-        self.trades = []
-        self.equity_curve = []
-        self.daily_trades_count = {}
-        self.rejected_trades = {
-            'trend': 0, 'strength': 0, 'volume': 0,
-            'rsi': 0, 'quality': 0, 'time': 0, 'false_breakout': 0, 'mtf': 0
-        }
+        # Reset state (the equity tracker always covers just this call)
+        self.equity = EquityTracker(df['time'].iloc[start_idx:end_idx])
+        if not resume:
+            self.balance = self.initial_balance
+            self.in_position = False
+            self.current_trade = None
+            self.trades = TradeLog()
+            self.daily_trades_count = {}
+            self.rejected_trades = {
+                'trend': 0, 'strength': 0, 'volume': 0,
+                'rsi': 0, 'quality': 0, 'time': 0, 'false_breakout': 0, 'mtf': 0
+            }
+            self.profile_stats = {}
+            self._active_filter_order = self._initial_filter_order()
+            self._breakout_signals = 0
 
         # Main backtest loop
         for i in range(start_idx, end_idx):
@@ -588,7 +675,8 @@ class UltraBacktester:
 
             # Check if we need to close existing trade
             if self.in_position:
-                should_close, exit_price, exit_reason = self.check_trade_exit(current_bar)
+                should_close, exit_price, exit_reason = self._timed(
+                    'exit_check', self.check_trade_exit, current_bar, i)
                 if should_close:
                     self.close_trade(exit_price, current_time, exit_reason)
 
@@ -603,11 +691,7 @@ class UltraBacktester:
                               f"Balance: ${self.balance:,.2f}")
 
             # Record equity
-            self.equity_curve.append({
-                'time': current_time,
-                'balance': self.balance,
-                'in_position': self.in_position
-            })
+            self.equity.record(self.balance, self.in_position)
 
             if self.in_position:
                 continue
@@ -616,7 +700,8 @@ class UltraBacktester:
                 continue
 
             # Look for new trades
-            is_consolidating, high_level, low_level, box_range = self.identify_consolidation(df, i)
+            is_consolidating, high_level, low_level, box_range = self._timed(
+                'consolidation', self.identify_consolidation, df, i)
 
             if is_consolidating:
                 signal = self.detect_breakout(df, i, high_level, low_level)
@@ -632,7 +717,7 @@ class UltraBacktester:
                               f"TP: {tp:.2f} | SL: {sl:.2f}")
 
         # Close any remaining trades
-        if self.in_position:
+        if self.in_position and close_open_trade:
             last_bar = df.iloc[end_idx - 1]
             self.close_trade(last_bar['close'], last_bar['time'], 'END_OF_DATA')
 
@@ -643,6 +728,11 @@ class UltraBacktester:
 
         return self.get_results()
 
+    @property
+    def equity_curve(self):
+        """Per-bar equity as a list of dicts (built on demand from self.equity)"""
+        return self.equity.to_records() if self.equity is not None else []
+
     def get_results(self):
         """Calculate and return backtest results"""
         if len(self.trades) == 0:
@@ -664,49 +754,63 @@ class UltraBacktester:
                 'largest_loss': 0,
                 'final_balance': self.balance,
                 'initial_balance': self.initial_balance,
-                **{f'rejected_by_{k}': v for k, v in self.rejected_trades.items()}
+                **{f'rejected_by_{k}': v for k, v in self.rejected_trades.items()},
+                **self._profile_results()
             }
 
-        trades_df = pd.DataFrame(self.trades)
-
-        winning_trades = trades_df[trades_df['win'] == True]
-        losing_trades = trades_df[trades_df['win'] == False]
-
-        total_profit = winning_trades['profit'].sum() if len(winning_trades) > 0 else 0
-        total_loss = abs(losing_trades['profit'].sum()) if len(losing_trades) > 0 else 0
+        # Win/loss aggregates are reductions over the trade log's columns
+        summary = self.trades.summary()
+        total_profit = summary['total_profit']
+        total_loss = summary['total_loss']
 
-        # Calculate drawdown
-        equity_df = pd.DataFrame(self.equity_curve)
-        equity_df['peak'] = equity_df['balance'].cummax()
-        equity_df['drawdown'] = equity_df['peak'] - equity_df['balance']
-        equity_df['drawdown_pct'] = (equity_df['drawdown'] / equity_df['peak']) * 100
-
-        max_drawdown = equity_df['drawdown'].max()
-        max_drawdown_pct = equity_df['drawdown_pct'].max()
+        # Drawdown is tracked online while the equity curve is recorded
+        max_drawdown = self.equity.max_drawdown
+        max_drawdown_pct = self.equity.max_drawdown_pct
 
         results = {
             'total_trades': len(self.trades),
-            'winning_trades': len(winning_trades),
-            'losing_trades': len(losing_trades),
-            'win_rate': (len(winning_trades) / len(self.trades) * 100) if len(self.trades) > 0 else 0,
+            'winning_trades': summary['winning_trades'],
+            'losing_trades': summary['losing_trades'],
+            'win_rate': (summary['winning_trades'] / len(self.trades) * 100) if len(self.trades) > 0 else 0,
             'total_profit': total_profit,
             'total_loss': total_loss,
             'net_profit': total_profit - total_loss,
             'return_pct': ((self.balance - self.initial_balance) / self.initial_balance) * 100,
             'max_drawdown': max_drawdown,
             'max_drawdown_pct': max_drawdown_pct,
-            'avg_win': winning_trades['profit'].mean() if len(winning_trades) > 0 else 0,
-            'avg_loss': losing_trades['profit'].mean() if len(losing_trades) > 0 else 0,
+            'avg_win': summary['avg_win'],
+            'avg_loss': summary['avg_loss'],
             'profit_factor': total_profit / total_loss if total_loss > 0 else float('inf'),
-            'largest_win': winning_trades['profit'].max() if len(winning_trades) > 0 else 0,
-            'largest_loss': losing_trades['profit'].min() if len(losing_trades) > 0 else 0,
+            'largest_win': summary['largest_win'],
+            'largest_loss': summary['largest_loss'],
             'final_balance': self.balance,
             'initial_balance': self.initial_balance,
-            **{f'rejected_by_{k}': v for k, v in self.rejected_trades.items()}
+            **{f'rejected_by_{k}': v for k, v in self.rejected_trades.items()},
+            **self._profile_results()
         }
 
         return results
 
+    def _profile_results(self):
+        """Profiler/filter order section of get_results (empty by default)"""
+        extra = {}
+        if self.filter_order is not None:
+            extra['filter_order'] = list(self._active_filter_order)
+
+        if not self.profile:
+            return extra
+
+        profile = {}
+        for name, stats in self.profile_stats.items():
+            calls = stats['calls']
+            profile[name] = {
+                **stats,
+                'avg_us': stats['seconds'] / calls * 1e6 if calls else 0,
+                'rejection_rate': stats['rejections'] / calls if calls else 0
+            }
+
+        return {**extra, 'profile': profile}
+
     def print_results(self):
         """Print formatted backtest results"""
         results = self.get_results()
@@ -755,6 +859,14 @@ class UltraBacktester:
         total_rejected = sum([results[f'rejected_by_{k}'] for k in self.rejected_trades.keys()])
         print(f"   Total Rejected:         {total_rejected:>6}")
 
+        if results.get('profile'):
+            print(f"\n⏱️  PROFILE (slowest first):")
+            print(f"     {'Stage':<16} {'Calls':>8} {'Total s':>9} {'Avg µs':>9} {'Reject %':>9}")
+            ranked = sorted(results['profile'].items(), key=lambda item: item[1]['seconds'], reverse=True)
+            for name, stats in ranked:
+                print(f"     {name:<16} {stats['calls']:>8} {stats['seconds']:>9.3f} "
+                      f"{stats['avg_us']:>9.1f} {stats['rejection_rate']*100:>8.1f}%")
+
         print("\n" + "=" * 70)
 
         # Verdict
@@ -779,7 +891,7 @@ class UltraBacktester:
     def save_results(self, filename='ultra_backtest_results.json'):
         """Save backtest results to file"""
         results = self.get_results()
-        results['trades'] = self.trades
+        results['trades'] = self.trades.to_records()
         results['equity_curve'] = self.equity_curve
 
         with open(filename, 'w') as f:
@@ -793,6 +905,6 @@ class UltraBacktester:
             print("No trades to export")
             return
 
-        trades_df = pd.DataFrame(self.trades)
+        trades_df = self.trades.to_frame()
         trades_df.to_csv(filename, index=False)
         print(f"💾 Trades exported to: {filename}")
@@ -0,0 +1,202 @@
+"""
+Walk-Forward Optimization for NAS100 Backtesters
+Optimize on a rolling in-sample window, then trade the next unseen window
+
+Every fold runs on the full dataset with start_idx/end_idx limits, so the
+indicator arrays (IndicatorCache) are computed once over the whole series
+and shared by all folds and parameter sets; each fold only re-runs the
+trade simulation. The in-sample sweeps of all folds go to one process pool.
+"""
+
+import numpy as np
+import pandas as pd
+
+from equity_tracker import EquityTracker
+from parameter_sweep import expand_grid, run_quiet, run_tasks
+from shared_dataset import as_frame
+
+
+def default_score(results):
+    """Same ranking as optimize_enhanced: win rate counts double"""
+    return results['win_rate'] * 2 + results['return_pct']
+
+
+def walk_forward_windows(n_bars, in_sample_bars, out_of_sample_bars, step_bars=None, start_idx=0):
+    """
+    Split bar indices into rolling in-sample/out-of-sample folds
+
+    Parameters:
+    - n_bars: Number of bars in the dataset
+    - in_sample_bars: Bars used to pick the parameters of a fold
+    - out_of_sample_bars: Bars traded with those parameters afterwards
+    - step_bars: Shift between folds (default: out_of_sample_bars, so the
+      out-of-sample windows line up back to back)
+    - start_idx: First bar of the first in-sample window
+
+    Returns:
+    - List of (is_start, is_end, oos_start, oos_end) index tuples; the last
+      out-of-sample window may be shorter
+    """
+    step_bars = step_bars or out_of_sample_bars
+    windows = []
+
+    is_start = start_idx
+    while is_start + in_sample_bars < n_bars:
+        is_end = is_start + in_sample_bars
+        oos_end = min(is_end + out_of_sample_bars, n_bars)
+        windows.append((is_start, is_end, is_end, oos_end))
+        is_start += step_bars
+
+    return windows
+
+
+def walk_forward(engine_cls, df, param_grid, in_sample_bars, out_of_sample_bars, step_bars=None,
+                 base_params=None, workers=None, min_trades=5, score=default_score,
+                 cache=None, start_idx=0):
+    """
+    Run a walk-forward optimization
+
+    Parameters:
+    - engine_cls: Backtester, EnhancedBacktester or UltraBacktester
+    - df: DataFrame with OHLCV data, or a SharedDataset
+    - param_grid: Dict of name -> values, or list of parameter dicts
+    - in_sample_bars, out_of_sample_bars, step_bars, start_idx: Fold layout
+      (see walk_forward_windows)
+    - base_params: Constructor kwargs shared by every combination
+    - workers: Worker processes for the in-sample sweeps (default: CPU count)
+    - min_trades: In-sample trades a combination needs to be selected
+    - score: Function of a results dict; the highest score wins a fold
+    - cache: Optional ResultCache for the in-sample runs
+
+    Returns:
+    - Dictionary with per-fold details, the stitched out-of-sample equity
+      curve and overall out-of-sample statistics
+    """
+    data = df
+    df = as_frame(df)
+
+    combos = expand_grid(param_grid)
+    base_params = dict(base_params or {})
+    full_params = [{**base_params, **params} for params in combos]
+    windows = walk_forward_windows(len(df), in_sample_bars, out_of_sample_bars, step_bars, start_idx)
+
+    if not windows:
+        raise ValueError("Not enough bars for one in-sample plus out-of-sample window")
+
+    # All folds x combinations in one pool
+    tasks = [
+        (params, {'start_idx': is_start, 'end_idx': is_end})
+        for is_start, is_end, _, _ in windows
+        for params in full_params
+    ]
+
+    in_sample = [[None] * len(combos) for _ in windows]
+    for index, results in run_tasks(engine_cls, data, tasks, workers=workers, cache=cache):
+        fold, combo = divmod(index, len(combos))
+        in_sample[fold][combo] = results
+
+    times = df['time']
+    initial_balance = engine_cls(**full_params[0]).initial_balance
+    equity = EquityTracker(pd.concat([times.iloc[s:e] for _, _, s, e in windows]))
+
+    folds = []
+    trades = []
+    balance = initial_balance
+
+    for fold, (is_start, is_end, oos_start, oos_end) in enumerate(windows):
+        # Grid order breaks ties, like a serial sweep
+        best = None
+        for combo, results in enumerate(in_sample[fold]):
+            if results['total_trades'] < min_trades:
+                continue
+            if best is None or score(results) > score(in_sample[fold][best]):
+                best = combo
+
+        fold_info = {
+            'fold': fold + 1,
+            'in_sample': (times.iat[is_start], times.iat[is_end - 1]),
+            'out_of_sample': (times.iat[oos_start], times.iat[oos_end - 1]),
+            'best_params': None,
+            'in_sample_score': None,
+            'in_sample_results': None,
+            'out_of_sample_results': None
+        }
+
+        if best is None:
+            # Nothing qualified: stay flat for this window
+            equity.record(balance, count=oos_end - oos_start)
+            folds.append(fold_info)
+            continue
+
+        backtester = engine_cls(**full_params[best])
+        oos_results = run_quiet(backtester, df, {'start_idx': oos_start, 'end_idx': oos_end})
+
+        # Fixed lot size, so fold P&L adds up rather than compounds
+        offset = balance - backtester.initial_balance
+        fold_equity = backtester.equity
+        equity.extend(fold_equity.balance[:len(fold_equity)] + offset,
+                      fold_equity.in_position[:len(fold_equity)])
+        balance = backtester.balance + offset
+        trades.extend(backtester.trades)
+
+        fold_info.update({
+            'best_params': combos[best],
+            'in_sample_score': score(in_sample[fold][best]),
+            'in_sample_results': in_sample[fold][best],
+            'out_of_sample_results': oos_results
+        })
+        folds.append(fold_info)
+
+    wins = sum(1 for trade in trades if trade['win'])
+    profits = np.array([trade['profit'] for trade in trades])
+    total_profit = profits[profits > 0].sum() if len(trades) else 0
+    total_loss = abs(profits[profits <= 0].sum()) if len(trades) else 0
+
+    return {
+        'folds': folds,
+        'equity': equity,
+        'equity_curve': equity.to_records(),
+        'trades': trades,
+        'initial_balance': initial_balance,
+        'final_balance': balance,
+        'net_profit': balance - initial_balance,
+        'return_pct': (balance - initial_balance) / initial_balance * 100,
+        'total_trades': len(trades),
+        'win_rate': wins / len(trades) * 100 if trades else 0,
+        'profit_factor': total_profit / total_loss if total_loss > 0 else float('inf'),
+        'max_drawdown': equity.max_drawdown,
+        'max_drawdown_pct': equity.max_drawdown_pct
+    }
+
+
+def print_walk_forward(report):
+    """Print per-fold parameters and the combined out-of-sample result"""
+    print("\n" + "=" * 90)
+    print("🚶 WALK-FORWARD RESULTS (out-of-sample only)")
+    print("=" * 90)
+
+    for fold in report['folds']:
+        oos_start, oos_end = fold['out_of_sample']
+        print(f"\nFold {fold['fold']}: trade {oos_start} → {oos_end}")
+
+        if fold['best_params'] is None:
+            print("   ⏸️  No parameter set had enough in-sample trades, stayed flat")
+            continue
+
+        params = ", ".join(f"{k}={v}" for k, v in fold['best_params'].items())
+        oos = fold['out_of_sample_results']
+        print(f"   Params:        {params}")
+        print(f"   In-sample:     score {fold['in_sample_score']:.2f}, "
+              f"win rate {fold['in_sample_results']['win_rate']:.1f}%, "
+              f"return {fold['in_sample_results']['return_pct']:.2f}%")
+        print(f"   Out-of-sample: {oos['total_trades']} trades, win rate {oos['win_rate']:.1f}%, "
+              f"return {oos['return_pct']:.2f}%")
+
+    print("\n" + "-" * 90)
+    print(f"   Total Trades:     {report['total_trades']:>12}")
+    print(f"   Win Rate:         {report['win_rate']:>12.2f}%")
+    print(f"   Net Profit:       ${report['net_profit']:>12,.2f}")
+    print(f"   Return:           {report['return_pct']:>12.2f}%")
+    print(f"   Profit Factor:    {report['profit_factor']:>12.2f}")
+    print(f"   Max Drawdown %:   {report['max_drawdown_pct']:>12.2f}%")
+    print("=" * 90 + "\n")